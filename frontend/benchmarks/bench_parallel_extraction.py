@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import numba
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.core.magi import build_band_table, calculate_chunk_energies, calculate_chunk_energies_parallel
+from src.core.extraction import extract_chunk_band_energies
+
+def run_benchmark(minutes: float, repeats: int):
+    """
+    Measures how the numba chunk-parallel extraction scales from 1 to N threads,
+    and checks that every thread count gives bit-identical results to the serial path.
+    """
+    fs = 44100
+    chunk_len = int(5.0 * fs)
+    rng = np.random.default_rng(0)
+    signal = rng.standard_normal(int(minutes * 60 * fs)).astype(np.float32)
+    bands = build_band_table([(535.0, 10.0), (60.0, 2.0), (120.0, 2.0), (180.0, 2.0)])
+
+    # JIT warm-up (excluded from timings)
+    calculate_chunk_energies(signal[:chunk_len], fs, chunk_len, bands)
+    calculate_chunk_energies_parallel(signal[:chunk_len], fs, chunk_len, bands)
+
+    def best_of(fn):
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            out = fn()
+            best = min(best, time.perf_counter() - start)
+        return best, out
+
+    print(f"Signal: {minutes:.1f} min @ {fs} Hz, {len(signal) // chunk_len} chunks, best of {repeats}")
+    serial_time, reference = best_of(lambda: calculate_chunk_energies(signal, fs, chunk_len, bands))
+    print(f"{'serial':>10} | {serial_time * 1000:9.1f} ms | 1.00x")
+
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    thread_counts = sorted({1, 2, 4, 8, 16, max_threads} & set(range(1, max_threads + 1)))
+    for n_threads in thread_counts:
+        elapsed, out = best_of(lambda: extract_chunk_band_energies(signal, fs, chunk_len, bands, backend="numba", workers=n_threads))
+        identical = np.array_equal(out, reference)
+        print(f"{n_threads:>7} th | {elapsed * 1000:9.1f} ms | {serial_time / elapsed:4.2f}x | identical={identical}")
+
+    elapsed, _ = best_of(lambda: extract_chunk_band_energies(signal, fs, chunk_len, bands, backend="blas"))
+    print(f"{'blas':>10} | {elapsed * 1000:9.1f} ms | {serial_time / elapsed:4.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunk extraction thread-scaling benchmark")
+    parser.add_argument("--minutes", type=float, default=30.0, help="Synthetic recording length")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.minutes, args.repeats)
@@ -1,5 +1,7 @@
 
 # SignalCraft Light-Lab Configuration
+import os
+import tempfile
 
 # Colors (Eye-friendly palette)
 COLOR_PRIMARY = "#4ECDC4"         # Soft Teal for Signal
@@ -14,7 +16,51 @@ DEFAULT_SAMPLE_RATE = 44100
 DEFAULT_TARGET_FREQ = 60.0  # Hz
 DEFAULT_BANDWIDTH = 1.0     # Hz
 DEFAULT_OTSU_MULTIPLIER = 1.0
+SENSITIVITY_RANGE = (0.5, 3.0)  # 민감도(Otsu 승수) 슬라이더 범위
+SENSITIVITY_STEP = 0.1
 DEFAULT_WINDOW_SIZE_SEC = 0.5 # Window size for analysis in seconds
+DEFAULT_HOP_SEC = 5.0       # Frame hop for file analysis (5.0 = non-overlapping 5s chunks)
 
 # Memory Safety
-MAX_FILE_SIZE_MB = 200
+STREAM_BLOCK_MIN_CHUNKS = 64  # 스트리밍 읽기 블록의 최소 청크 수 (BLAS 행렬곱 행 수, 워커 수 x 8이 더 크면 그 값)
+STREAM_BLOCK_MAX_MB = 128     # 블록 메모리 상한 (float64 모노 기준, 워커 수만큼의 청크보다 작게는 줄이지 않음)
+
+# Upload Spooling (core/spool.py)
+SPOOL_DIR = os.path.join(tempfile.gettempdir(), "soundlab-spool")
+SPOOL_THRESHOLD_MB = 50      # 이 크기 이상의 업로드는 디스크로 스풀 후 mmap으로 분석
+SPOOL_MAX_TOTAL_MB = 4096    # 스풀 디렉터리 전체 예산 (초과 시 LRU 삭제)
+SPOOL_MAX_AGE_HOURS = 24     # 마지막 사용 후 보관 시간
+
+# Persistent Feature Cache (core/feature_cache.py) - 재시작 후에도 유지되도록 볼륨 경로 지정 권장
+FEATURE_CACHE_ENABLED = True
+FEATURE_CACHE_DIR = os.environ.get("SOUNDLAB_FEATURE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "soundlab", "features"))
+FEATURE_CACHE_MAX_MB = 1024  # 캐시 디렉터리 예산 (초과 시 LRU 삭제)
+
+# Feature Extraction
+EXTRACTION_BACKEND = "blas"  # "blas": 행렬곱 일괄 처리 / "numba": 청크 병렬 커널 (prange)
+ANALYSIS_WORKERS = 0         # numba 병렬 스레드 수 (0 = 모든 코어, 1 = 순차 처리)
+DECIMATE_BEFORE_EXTRACTION = True  # 대역 추출 전 anti-alias 저역통과 + 데시메이션 (core/multirate.py)
+FREQ_GRID_RANGE = (20.0, 1000.0)   # 주파수 그리드 모드 범위 (Hz, core/freq_grid.py)
+FREQ_GRID_STEP = 0.5               # 그리드 간격 (Hz, 대역 스캔 간격과 동일)
+FREQ_GRID_DTYPE = "float32"        # 저장 정밀도 ("float32" 또는 "float16")
+FREQ_GRID_MAX_MB = 256             # 격자 예상 크기 상한 (초과하면 격자 대신 대역 직접 추출, 예: 24시간 @ 0.5초 hop ~ 1.3GB)
+TRACK_PEAK_FREQUENCY = True        # 청크별 대역 피크 주파수/크기 추적 (core/peak_tracking.py)
+TRACK_SPAN_HZ = 1.0                # 추적 범위: 대역 중심 ± min(이 값, 대역폭)
+TRACK_STEP_HZ = 0.1                # 추적 스캔 간격 (5초 윈도우의 DFT bin 0.2Hz의 절반)
+WARMUP_KERNELS_ON_STARTUP = True   # 앱 시작 시 백그라운드에서 numba 커널 미리 컴파일 (core/warmup.py)
+
+# Live Stream (core/stream_processor.py)
+STREAM_HISTORY_SIZE = 30            # 동적 임계값 윈도우 (레코드 수, 10초 간격 기준 2880 = 8시간 교대 근무)
+STREAM_OTSU_BINS = 2048             # 증분 히스토그램 bin 수 (로그 간격, 갱신 비용 O(bins))
+STREAM_OTSU_RANGE = (1e-6, 1e4)     # 히스토그램 범위 (범위 밖 값은 양 끝 bin)
+LIVE_POLL_INTERVAL_SEC = 2          # 실시간 폴링 주기 (초)
+LIVE_POLL_BATCH_ROWS = 500          # 폴링 1회 요청당 최대 행 수 (커서 이후 행만 조회)
+LIVE_POLL_MAX_BATCHES = 20          # 지연 후 따라잡기: 폴링 1회에 최대 요청 수
+LIVE_HISTORY_MAX_POINTS = 500       # 실시간 차트에 유지하는 포인트 수
+LIVE_RANGE_PAGE_ROWS = 1000         # 기간 조회 페이지 크기 (PostgREST max-rows 기본값 이하)
+LIVE_RANGE_SLICE_HOURS = 1.0        # 기간 조회를 나누는 시간 구간 (구간별로 병렬 keyset 페이지 조회)
+LIVE_RANGE_WORKERS = 4              # 동시 요청 수 (하나의 클라이언트/커넥션 풀 공유)
+LOG_STORE_ENABLED = True            # 기간 조회를 로컬 저장소에서 답하고 빠진 구간만 원격 동기화 (core/log_store.py)
+LOG_STORE_PATH = os.environ.get("SOUNDLAB_LOG_STORE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "soundlab", "sound_logs.sqlite"))
+LOG_STORE_DTYPE = "float32"         # 특징값 저장 정밀도 ("float32" 또는 "float16")
+LOG_STORE_SETTLE_SEC = 60           # 최근 이 시간(초) 이내 구간은 완료로 기록하지 않음 (늦게 도착하는 행 대비)
@@ -1,11 +1,20 @@
 import numpy as np
 import streamlit as st
-from typing import Tuple, List, Dict, Any, Optional
-from src.core.magi import robust_goertzel_magi, calculate_band_energy
-from src.config import DEFAULT_WINDOW_SIZE_SEC
+from math import gcd
+from typing import Tuple, List, Dict, Any, Callable, Iterable, Optional, Sequence, Union
+from src.core.magi import robust_goertzel_magi, build_band_table
+from src.core.extraction import stream_band_features, align_hop_length, resolve_worker_count
+from src.core.multirate import choose_decimation_factor, decimate_blocks
+from src.core.spectrum import zoom_spectrum, WelchAccumulator
+from src.config import DEFAULT_WINDOW_SIZE_SEC, DECIMATE_BEFORE_EXTRACTION, STREAM_BLOCK_MIN_CHUNKS, STREAM_BLOCK_MAX_MB, FREQ_GRID_RANGE, FREQ_GRID_STEP, FREQ_GRID_DTYPE, FREQ_GRID_MAX_MB, SENSITIVITY_RANGE, SENSITIVITY_STEP, TRACK_PEAK_FREQUENCY, TRACK_SPAN_HZ, TRACK_STEP_HZ
 from skimage.filters import threshold_otsu
-from src.core.audio import load_audio
-from scipy.signal import welch, find_peaks
+from src.core.audio import read_wav_info, iter_wav_blocks, to_mono_float
+from src.core.freq_grid import grid_frequencies, stream_freq_grid, snap_bands_to_grid, grid_covers, band_energies_from_grid
+from src.core.sensitivity import SensitivityIndex
+from src.core.peak_tracking import tracking_freqs, interpolate_peaks
+from src.core.feature_cache import source_fingerprint, feature_key, load_features, save_features
+from src.core.state_machine import NOTE_LABELS, NOTE_NONE, NOTE_ID_START, NOTE_SURGE_START, NOTE_ID_SUSTAIN, NOTE_HYSTERESIS, NOTE_GAP_FILLED, NOTE_TRIMMED, NOTE_NOISE, hysteresis_states, fill_gaps, dropoff_trim_mask, short_run_mask, ChunkStates
+from scipy.signal import find_peaks
 
 # --- V5.7 Configuration ---
 CHUNK_DURATION_SEC = 5.0
@@ -14,6 +23,8 @@ CONF_SURGE_60 = {'freq': 60.0, 'bw': 2.0}
 CONF_SURGE_120 = {'freq': 120.0, 'bw': 2.0}
 CONF_DIAG = {'freq': 180.0, 'bw': 2.0}
 
+WELCH_NPERSEG = 65536  # 전체 스펙트럼(Welch) 세그먼트 길이
+
 def calculate_otsu_threshold(data: np.ndarray, sensitivity: float = 1.0) -> float:
     """
     Calculates the Otsu threshold for a given 1D array.
@@ -26,78 +37,357 @@ def calculate_otsu_threshold(data: np.ndarray, sensitivity: float = 1.0) -> floa
         otsu_val = 0.0
     return otsu_val * sensitivity
 
-@st.cache_data(show_spinner="Smart Analyzer V5.7 분석 중...")
-def process_signal_heavy(uploaded_file: Any, target_freq: float, bandwidth: float, smart_mode: bool = True) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+def v57_band_table(target_freq: float, bandwidth: float) -> np.ndarray:
     """
-    SMART UNIVERSAL ANALYZER V5.7 (SAFE TRIMMING) Implementation.
+    V5.7 분석 대역 테이블: [ID(타겟), 60Hz 서지, 120Hz 서지, 180Hz 진단].
     """
-    # 1. Load File
-    sample_rate, signal = load_audio(uploaded_file)
-    
-    # Mono Conversion
-    if len(signal.shape) > 1:
-        signal = signal.mean(axis=1)
+    return v57_multi_band_table((target_freq,), bandwidth)
 
-    # Convert settings
+def v57_multi_band_table(target_freqs: Sequence[float], bandwidth: float) -> np.ndarray:
+    """
+    다중 타겟 대역 테이블: [ID_1, ..., ID_N, 60Hz 서지, 120Hz 서지, 180Hz 진단].
+    서지/진단 대역은 모든 타겟이 공유하므로 한 번만 추출합니다.
+    """
     # User might want to override CONF_ID freq with their target_freq input
     # If target_freq is significantly different from default 60Hz (e.g., user set 535 manually), use it.
     # OR strictly follow V5.7 spec (535Hz).
     # Generically, we use target_freq if provided, else 535.
     # However, standard V5.7 is hardcoded to 535. 
     # Let's use target_freq as the "ID" Frequency.
-    ID_FREQ = target_freq if target_freq > 0 else CONF_ID['freq']
     ID_BW = bandwidth if bandwidth > 0 else CONF_ID['bw']
-    
+    return build_band_table(
+        [(f if f > 0 else CONF_ID['freq'], ID_BW) for f in target_freqs] + [
+            (CONF_SURGE_60['freq'], CONF_SURGE_60['bw']),
+            (CONF_SURGE_120['freq'], CONF_SURGE_120['bw']),
+            (CONF_DIAG['freq'], CONF_DIAG['bw']),
+        ]
+    )
+
+def target_band_energies(band_energies: np.ndarray, target_index: int) -> np.ndarray:
+    """
+    다중 타겟 에너지 행렬에서 한 타겟의 V5.7 4열 행렬 (ID, 60Hz, 120Hz, 180Hz)을 만듭니다.
+    """
+    return np.column_stack([band_energies[:, target_index], band_energies[:, -3:]])
+
+def _extraction_plan(wav_info: Any, hop_sec: Optional[float], max_freq: float, stride: int = 8) -> Dict[str, Any]:
+    """
+    프레임 길이/hop과 멀티레이트 프론트엔드(데시메이션 비율, 추출 샘플레이트)를 결정합니다.
+    """
+    sample_rate = wav_info.sample_rate
     chunk_bytes = int(CHUNK_DURATION_SEC * sample_rate)
-    n_samples = len(signal)
-    num_chunks = n_samples // chunk_bytes
-    
-    results = []
-    
-    # --- Step 1: Feature Extraction ---
-    # Progress Bar context is managed by Streamlit in the caller usually, but we can print logs or fast loop
-    
-    energies_id = []
-    energies_60 = []
-    energies_120 = []
-    energies_180 = []
-    
-    # Normalize signal to -1.0 ~ 1.0 if not already (WAV read might be int)
-    # wavfile.read returns int16 usually.
-    if signal.dtype != np.float32 and signal.dtype != np.float64:
-        if signal.dtype == np.int16:
-            signal = signal.astype(np.float32) / 32768.0
-        elif signal.dtype == np.uint8:
-            signal = (signal.astype(np.float32) - 128) / 128.0
-
-    for i in range(num_chunks):
-        start = i * chunk_bytes
-        end = start + chunk_bytes
-        chunk = signal[start:end]
-        
-        # Calculate Energies
-        e_id = calculate_band_energy(chunk, sample_rate, ID_FREQ, ID_BW)
-        e_60 = calculate_band_energy(chunk, sample_rate, CONF_SURGE_60['freq'], CONF_SURGE_60['bw'])
-        e_120 = calculate_band_energy(chunk, sample_rate, CONF_SURGE_120['freq'], CONF_SURGE_120['bw'])
-        e_180 = calculate_band_energy(chunk, sample_rate, CONF_DIAG['freq'], CONF_DIAG['bw'])
-        
-        energies_id.append(e_id)
-        energies_60.append(e_60)
-        energies_120.append(e_120)
-        energies_180.append(e_180)
-        
-        results.append({
-            'id': i,
-            'time_min': (i * CHUNK_DURATION_SEC) / 60.0,
-            'time_sec': i * CHUNK_DURATION_SEC,
-            'state': 'OFF',
-            'note': '',
-            'diag': 'NORMAL'
-        })
+    
+    # Overlap mode: window stays CHUNK_DURATION_SEC, frames advance by hop
+    sliding = hop_sec is not None and 0 < hop_sec < CHUNK_DURATION_SEC
+    hop_len = int(hop_sec * sample_rate) if sliding else chunk_bytes
+    
+    # Multirate front end: anti-alias low-pass + decimate once to a rate set by the highest band,
+    # then correlate every sample of the decimated stream (no bare stride)
+    factor = 1
+    ext_rate = sample_rate
+    if DECIMATE_BEFORE_EXTRACTION:
+        factor = choose_decimation_factor(sample_rate, max_freq, gcd(chunk_bytes, hop_len))
+        ext_rate = sample_rate // factor
+        stride = 1
+    ext_chunk_len = chunk_bytes // factor
+    ext_hop_len = align_hop_length(hop_len // factor, stride) if sliding else ext_chunk_len
+    return {
+        'chunk_len': chunk_bytes, 'sliding': sliding, 'factor': factor, 'stride': stride,
+        'rate': ext_rate, 'window_len': ext_chunk_len, 'hop_len': ext_hop_len,
+        'step_sec': ext_hop_len / ext_rate, 'max_freq': max_freq,
+    }
+
+def _block_chunks(plan: Dict[str, Any]) -> int:
+    """
+    스트리밍 읽기 블록당 청크 수. BLAS 행렬곱과 병렬 커널이 한 번에 충분한 청크를 받도록 max(STREAM_BLOCK_MIN_CHUNKS, 워커 수 x 8)개로 하되,
+    블록(float64 모노 기준)이 STREAM_BLOCK_MAX_MB를 넘으면 줄입니다. 워커 수보다 적게는 줄이지 않습니다.
+    """
+    workers = resolve_worker_count()
+    by_memory = int(STREAM_BLOCK_MAX_MB * 1024 * 1024) // (plan['chunk_len'] * 8)
+    return max(1, workers, min(max(STREAM_BLOCK_MIN_CHUNKS, workers * 8), by_memory))
 
-    energies_id = np.array(energies_id)
-    energies_60 = np.array(energies_60)
-    energies_120 = np.array(energies_120)
+def _plan_blocks(uploaded_file: Any, wav_info: Any, plan: Dict[str, Any]):
+    """
+    계획에 맞는 블록 스트림 (청크 정렬 읽기 -> 필요 시 데시메이션).
+    """
+    blocks = iter_wav_blocks(uploaded_file, plan['chunk_len'] * _block_chunks(plan))
+    if plan['factor'] > 1:
+        # n_out drops the zero-padded flush tail so chunk count matches the original
+        blocks = decimate_blocks(blocks, wav_info.sample_rate, plan['factor'], plan['max_freq'], n_out=wav_info.n_frames // plan['factor'])
+    return blocks
+
+def extract_band_features(uploaded_file: Any, target_freq: float, bandwidth: float, hop_sec: Optional[float] = None) -> Tuple[np.ndarray, float]:
+    """
+    V5.7 추출 단계: 파일 전체를 읽어 프레임별 대역 에너지 (ID, 60Hz, 120Hz, 180Hz)를 계산합니다.
+    O(samples) 비용이 드는 유일한 단계이므로 파일/대역/hop 파라미터로 캐시됩니다 (메모리 + 디스크).
+    
+    hop_sec가 CHUNK_DURATION_SEC보다 짧으면 겹치는 윈도우(Sliding DFT) 모드로 동작하여
+    ON/OFF 경계를 hop 단위(예: 0.5초)로 찾습니다. None이면 기존 5초 비겹침 청크를 사용합니다.
+    
+    반환값:
+        band_energies (np.ndarray): (num_frames, 4) 크기 행렬.
+        step_sec (float): 프레임 간격(초).
+    """
+    band_energies, step_sec, _ = extract_multi_band_features(uploaded_file, (target_freq,), bandwidth, hop_sec)
+    return band_energies, step_sec
+
+def _band_feature_key(fingerprint: str, bands: np.ndarray, plan: Dict[str, Any]) -> str:
+    """
+    대역 에너지의 디스크 캐시 키 (파일 fingerprint + 대역 + 프레임/데시메이션 파라미터).
+    """
+    return feature_key(
+        fingerprint,
+        bands=bands.tolist(), chunk_len=plan['chunk_len'], hop_len=plan['hop_len'] * plan['factor'], sliding=plan['sliding'],
+        decimate=DECIMATE_BEFORE_EXTRACTION
+    )
+
+def _peak_track_key(band_key: str) -> str:
+    """
+    피크 추적 결과의 디스크 캐시 키 (같은 추출의 대역 에너지 키 + 추적 파라미터).
+    """
+    return feature_key(band_key, kind='peak_tracks', span_hz=TRACK_SPAN_HZ, step_hz=TRACK_STEP_HZ)
+
+def _load_band_features(band_key: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    캐시된 (대역 에너지, 피크 추적)을 읽습니다. 추적이 켜져 있는데 한쪽이라도 없으면 둘 다 None (함께 다시 추출).
+    """
+    band_energies = load_features(band_key)
+    if not TRACK_PEAK_FREQUENCY:
+        return band_energies, None
+    peak_tracks = load_features(_peak_track_key(band_key))
+    if band_energies is None or peak_tracks is None:
+        return None, None
+    return band_energies, peak_tracks
+
+def _stream_band_features(blocks: Iterable[np.ndarray], plan: Dict[str, Any], bands: np.ndarray, band_key: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    블록 스트림에서 대역 에너지와 (TRACK_PEAK_FREQUENCY이면) 대역별 피크 추적을 함께 계산해 캐시에 저장합니다.
+    
+    반환값:
+        band_energies (np.ndarray): (num_frames, n_bands) 크기 행렬.
+        peak_tracks (np.ndarray 또는 None): (2, num_frames, n_bands) = (피크 주파수 Hz, 피크 크기).
+    """
+    # Sliding mode: recursive sliding-DFT update, O(hop) per frame
+    # Chunk mode: all chunks of a block at once (BLAS matrix product or parallel numba kernel, see config)
+    track_freqs, track_band_of = tracking_freqs(bands, TRACK_SPAN_HZ, TRACK_STEP_HZ) if TRACK_PEAK_FREQUENCY else (None, None)
+    band_energies, track_mags = stream_band_features(
+        blocks, plan['rate'], plan['window_len'], plan['hop_len'], bands, plan['stride'], plan['sliding'], track_freqs
+    )
+    save_features(band_key, band_energies)
+    peak_tracks = None
+    if track_mags is not None:
+        peak_tracks = np.stack(interpolate_peaks(track_mags, track_freqs, track_band_of, len(bands)))
+        save_features(_peak_track_key(band_key), peak_tracks)
+    return band_energies, peak_tracks
+
+@st.cache_data(show_spinner="Smart Analyzer V5.7 특징 추출 중...")
+def extract_multi_band_features(uploaded_file: Any, target_freqs: Tuple[float, ...], bandwidth: float, hop_sec: Optional[float] = None, _precomputed: Optional[Tuple] = None) -> Tuple[np.ndarray, float, Optional[np.ndarray]]:
+    """
+    N개 타겟의 ID 대역과 공유 서지/진단 대역을 파일 한 번 읽기로 추출합니다.
+    모든 대역이 같은 필터뱅크 행렬/커널 호출에 들어가므로 비용은 타겟 수와 거의 무관합니다.
+    
+    Args:
+        _precomputed: 다른 단계(extract_spectrum_and_bands)가 같은 읽기에서 이미 계산한 반환값.
+            주어지면 추출 없이 그대로 캐시합니다 (캐시 키에서 제외).
+    
+    반환값:
+        band_energies (np.ndarray): (num_frames, N + 3) 크기 행렬 (v57_multi_band_table 순서).
+        step_sec (float): 프레임 간격(초).
+        peak_tracks (np.ndarray 또는 None): (2, num_frames, N + 3) 대역별 피크 주파수/크기 (TRACK_PEAK_FREQUENCY가 꺼져 있으면 None).
+    """
+    if _precomputed is not None:
+        return _precomputed
+    
+    # Samples are streamed in chunk-aligned blocks of native PCM dtype/channels: downmix and
+    # scaling happen block-wise in the decimator or inside the extraction kernels
+    wav_info = read_wav_info(uploaded_file)
+    bands = v57_multi_band_table(target_freqs, bandwidth)
+    plan = _extraction_plan(wav_info, hop_sec, float(np.max(bands[:, 0] + bands[:, 1])))
+    
+    # Persistent feature cache: keyed by a sampled file fingerprint + extraction parameters
+    band_key = _band_feature_key(source_fingerprint(uploaded_file), bands, plan)
+    band_energies, peak_tracks = _load_band_features(band_key)
+    if band_energies is None:
+        band_energies, peak_tracks = _stream_band_features(_plan_blocks(uploaded_file, wav_info, plan), plan, bands, band_key)
+    return np.asarray(band_energies), plan['step_sec'], (np.asarray(peak_tracks) if peak_tracks is not None else None)
+
+def _welch_nperseg(n_frames: int) -> int:
+    # 2^16 = 65536 (약 0.67Hz 해상도 @ 44.1kHz), 짧은 파일은 전체 길이
+    return min(WELCH_NPERSEG, n_frames)
+
+def _tap_welch(blocks: Iterable[np.ndarray], welch_acc: WelchAccumulator, on_progress: Optional[Callable] = None, total_samples: int = 0):
+    """
+    블록을 그대로 흘려보내면서 Welch 누적기에도 넣습니다 (채널 평균 모노, 원본 PCM 단위).
+    on_progress(진행률, freqs, 중간 psd)는 블록마다 호출됩니다.
+    """
+    for block in blocks:
+        welch_acc.update(block.mean(axis=1, dtype=welch_acc.dtype) if block.ndim > 1 else block)
+        if on_progress is not None:
+            on_progress(min(1.0, welch_acc.n_samples / max(total_samples, 1)), *welch_acc.finalize())
+        yield block
+
+# --- Progress-reporting stages ---
+# st.cache_data는 함수 실행 중에 호출된 Streamlit 요소를 결과와 함께 기록했다가 캐시 적중 시 다시 그립니다.
+# 진행 콜백이 함수 밖에서 만든 placeholder(st.empty)에 그리면 그 재생이 실패하므로(CacheReplayClosureError),
+# 진행 상황을 알리는 스트리밍 단계는 캐시되지 않은 함수에서 콜백과 함께 실행하고 숫자 결과만 캐시에 넣습니다.
+
+class _CacheMiss(Exception):
+    pass
+
+def _cached_result(cached_fn: Callable, compute: Callable[[], Any], *args: Any) -> Any:
+    """
+    저장 전용 캐시 함수 cached_fn(*args)의 값을 반환합니다. 캐시에 없으면 compute()를 캐시 밖에서 실행하고
+    결과를 cached_fn(*args, _result=...)으로 저장합니다 (cached_fn은 _result 없이 불리면 _CacheMiss를 발생).
+    """
+    try:
+        return cached_fn(*args)
+    except _CacheMiss:
+        return cached_fn(*args, _result=compute())
+
+@st.cache_data(show_spinner=False)
+def _spectrum_and_bands_cache(uploaded_file: Any, target_freqs: Tuple[float, ...], bandwidth: float, hop_sec: Optional[float], _result: Optional[Tuple] = None) -> Tuple:
+    if _result is None:
+        raise _CacheMiss
+    return _result
+
+def extract_spectrum_and_bands(uploaded_file: Any, target_freqs: Sequence[float], bandwidth: float, hop_sec: Optional[float] = None, on_progress: Optional[Callable] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, Optional[np.ndarray]]:
+    """
+    파일을 한 번만 읽어 Welch PSD(calculate_spectral_stats)와 V5.7 대역 에너지(extract_multi_band_features)를 함께 계산합니다.
+    읽은 블록이 Welch 누적기와 대역 추출기(데시메이션 포함)에 동시에 공급됩니다.
+    대역 에너지는 디스크 피처 캐시와 extract_multi_band_features의 캐시에 함께 넣으므로,
+    이후 분석 시작 시 대역 추출은 (디스크 캐시가 꺼져 있어도) 오디오를 다시 읽지 않습니다.
+    
+    Args:
+        on_progress: 블록마다 (진행률, freqs, 중간 psd)로 호출되는 콜백. 캐시 밖에서 호출되므로 Streamlit 요소를 그려도 되며,
+            캐시 적중 시에는 호출되지 않습니다.
+    
+    반환값:
+        freqs, psd (np.ndarray): Welch 스펙트럼.
+        band_energies (np.ndarray): (num_frames, N + 3) 크기 행렬.
+        step_sec (float): 프레임 간격(초).
+        peak_tracks (np.ndarray 또는 None): extract_multi_band_features와 동일.
+    """
+    target_freqs = tuple(float(f) for f in target_freqs)
+    return _cached_result(
+        _spectrum_and_bands_cache, lambda: _stream_spectrum_and_bands(uploaded_file, target_freqs, bandwidth, hop_sec, on_progress),
+        uploaded_file, target_freqs, bandwidth, hop_sec
+    )
+
+def _stream_spectrum_and_bands(uploaded_file: Any, target_freqs: Tuple[float, ...], bandwidth: float, hop_sec: Optional[float], on_progress: Optional[Callable]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, Optional[np.ndarray]]:
+    wav_info = read_wav_info(uploaded_file)
+    nperseg = _welch_nperseg(wav_info.n_frames)
+    bands = v57_multi_band_table(target_freqs, bandwidth)
+    plan = _extraction_plan(wav_info, hop_sec, float(np.max(bands[:, 0] + bands[:, 1])))
+    
+    fingerprint = source_fingerprint(uploaded_file)
+    band_key = _band_feature_key(fingerprint, bands, plan)
+    psd_key = feature_key(fingerprint, kind='welch_psd', nperseg=nperseg)
+    band_energies, peak_tracks = _load_band_features(band_key)
+    psd = load_features(psd_key)
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / wav_info.sample_rate) if nperseg > 0 else np.array([])
+    
+    if nperseg > 0 and (band_energies is None or psd is None):
+        welch_acc = WelchAccumulator(wav_info.sample_rate, nperseg, dtype=np.float32) if psd is None else None
+        if band_energies is None:
+            raw_blocks = iter_wav_blocks(uploaded_file, plan['chunk_len'] * _block_chunks(plan))
+            if welch_acc is not None:
+                raw_blocks = _tap_welch(raw_blocks, welch_acc, on_progress, wav_info.n_frames)
+            blocks = raw_blocks
+            if plan['factor'] > 1:
+                blocks = decimate_blocks(raw_blocks, wav_info.sample_rate, plan['factor'], plan['max_freq'], n_out=wav_info.n_frames // plan['factor'])
+            band_energies, peak_tracks = _stream_band_features(blocks, plan, bands, band_key)
+            for _ in raw_blocks:  # 추출이 먼저 끝나도 Welch는 파일 끝까지 누적
+                pass
+        else:
+            for _ in _tap_welch(iter_wav_blocks(uploaded_file, nperseg * 16), welch_acc, on_progress, wav_info.n_frames):
+                pass
+        if welch_acc is not None:
+            freqs, psd = welch_acc.finalize()
+            save_features(psd_key, psd)
+    
+    if band_energies is None:
+        band_energies = np.zeros((0, len(bands)))
+    else:
+        # 디스크 캐시가 꺼져 있어도 이어지는 분석(process_multi_target)이 같은 키로 이 결과를 받도록 전달
+        extract_multi_band_features(uploaded_file, target_freqs, bandwidth, hop_sec, _precomputed=(
+            np.asarray(band_energies), plan['step_sec'], np.asarray(peak_tracks) if peak_tracks is not None else None
+        ))
+    return (
+        freqs, np.asarray(psd) if psd is not None else np.array([]), np.asarray(band_energies), plan['step_sec'],
+        np.asarray(peak_tracks) if peak_tracks is not None else None
+    )
+
+def _freq_grid_plan(wav_info: Any, hop_sec: Optional[float]) -> Tuple[np.ndarray, Dict[str, Any]]:
+    freqs = grid_frequencies(*FREQ_GRID_RANGE, FREQ_GRID_STEP)
+    return freqs, _extraction_plan(wav_info, hop_sec, float(freqs[-1]), stride=1)
+
+def _freq_grid_nbytes(wav_info: Any, freqs: np.ndarray, plan: Dict[str, Any]) -> int:
+    # 격자 예상 크기 = 추출 프레임 수 x 격자 주파수 수 x dtype 크기
+    n_samples = wav_info.n_frames // plan['factor']
+    n_frames = max(0, (n_samples - plan['window_len']) // plan['hop_len'] + 1)
+    return n_frames * len(freqs) * np.dtype(FREQ_GRID_DTYPE).itemsize
+
+def freq_grid_fits(uploaded_file: Any, hop_sec: Optional[float] = None) -> bool:
+    """
+    파일/hop의 주파수 격자가 FREQ_GRID_MAX_MB 이하인지 확인합니다 (헤더만 읽음).
+    """
+    wav_info = read_wav_info(uploaded_file)
+    return _freq_grid_nbytes(wav_info, *_freq_grid_plan(wav_info, hop_sec)) <= FREQ_GRID_MAX_MB * 1024 * 1024
+
+@st.cache_data(show_spinner="주파수 그리드 계산 중 (파일당 1회)...")
+def extract_freq_grid(uploaded_file: Any, hop_sec: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    파일마다 한 번, FREQ_GRID_RANGE 전체의 프레임 x 주파수(FREQ_GRID_STEP 간격) 크기 격자를 계산합니다.
+    타겟/대역폭을 바꿔도 격자를 잘라 더하기만 하면 되므로 오디오를 다시 읽지 않습니다.
+    
+    반환값:
+        grid (np.ndarray): (num_frames, num_freqs) 크기 행렬 (FREQ_GRID_DTYPE).
+        freqs (np.ndarray): 격자 주파수.
+        step_sec (float): 프레임 간격(초).
+    
+    예상 크기가 FREQ_GRID_MAX_MB를 넘으면(긴 파일 + 짧은 hop) 읽기 전에 ValueError를 발생시킵니다.
+    """
+    wav_info = read_wav_info(uploaded_file)
+    freqs, plan = _freq_grid_plan(wav_info, hop_sec)
+    nbytes = _freq_grid_nbytes(wav_info, freqs, plan)
+    if nbytes > FREQ_GRID_MAX_MB * 1024 * 1024:
+        raise ValueError(f"Frequency grid would take {nbytes / 2 ** 20:.0f} MB (FREQ_GRID_MAX_MB = {FREQ_GRID_MAX_MB})")
+    
+    cache_key = feature_key(
+        source_fingerprint(uploaded_file),
+        kind='freq_grid', f_min=float(freqs[0]), f_max=float(freqs[-1]), step=FREQ_GRID_STEP, dtype=FREQ_GRID_DTYPE,
+        chunk_len=plan['chunk_len'], hop_len=plan['hop_len'] * plan['factor'], sliding=plan['sliding'],
+        decimate=DECIMATE_BEFORE_EXTRACTION
+    )
+    grid = load_features(cache_key)
+    if grid is None:
+        blocks = _plan_blocks(uploaded_file, wav_info, plan)
+        if plan['factor'] == 1:
+            blocks = (to_mono_float(block) for block in blocks)
+        grid = stream_freq_grid(blocks, plan['rate'], plan['window_len'], plan['hop_len'], freqs, FREQ_GRID_STEP, FREQ_GRID_DTYPE)
+        save_features(cache_key, grid)
+    return np.asarray(grid), freqs, plan['step_sec']
+
+def decide_states(band_energies: np.ndarray, step_sec: float, smart_mode: bool = True, decision_params: Optional[Dict[str, float]] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    V5.7 판단 단계: 대역 에너지 배열만으로 Otsu 임계값, 상태 머신, 갭 병합, 스마트 트리밍, 노이즈 제거를 수행합니다.
+    오디오를 다시 읽지 않으므로 smart_mode나 갭/최소 가동 시간 변경은 밀리초 단위로 끝납니다.
+    
+    Args:
+        decision_params: CONF_ID의 'gap_min', 'min_dur_min' 덮어쓰기 (분 단위).
+    """
+    conf = {**CONF_ID, **(decision_params or {})}
+    
+    num_chunks = len(band_energies)
+    
+    energies_id = band_energies[:, 0]
+    energies_60 = band_energies[:, 1]
+    energies_120 = band_energies[:, 2]
+    energies_180 = band_energies[:, 3]
+    
+    # Frame time = start of the hop-long cell centered in its window (chunk start when not overlapping)
+    frame_offset = (CHUNK_DURATION_SEC - step_sec) / 2
+    times_sec = np.arange(num_chunks) * step_sec + frame_offset
+    times_min = times_sec / 60.0
     
     # --- Step 2: Threshold Calculation (Otsu) ---
     try:
@@ -115,104 +405,39 @@ def process_signal_heavy(uploaded_file: Any, target_freq: float, bandwidth: floa
     SURGE_THRES_120 = median_120 * 2.0
     
     # --- Step 3: Logic Application (State Machine) ---
-    current_state = 'OFF'
+    # OFF -> ON on ID activity or startup surge, ON -> OFF only below 80% of the threshold (hysteresis)
+    is_id_active = energies_id > THRESHOLD_ID
+    is_surge = (energies_60 > SURGE_THRES_60) & (energies_120 > SURGE_THRES_120)
+    on = hysteresis_states(is_id_active | is_surge, ~is_id_active & (energies_id < THRESHOLD_ID * 0.8))
     
-    for i, r in enumerate(results):
-        val_id = energies_id[i]
-        val_60 = energies_60[i]
-        val_120 = energies_120[i]
-        
-        is_id_active = val_id > THRESHOLD_ID
-        is_surge = (val_60 > SURGE_THRES_60) and (val_120 > SURGE_THRES_120)
-        
-        if current_state == 'OFF':
-            if is_id_active:
-                current_state = 'ON'
-                r['state'] = 'ON'
-                r['note'] = 'ID_Wide_Start'
-            elif is_surge:
-                current_state = 'ON'
-                r['state'] = 'ON'
-                r['note'] = 'Startup_Surge_Start'
-            else:
-                r['state'] = 'OFF'
-        else:
-            # Current ON
-            if is_id_active:
-                r['state'] = 'ON' # Sustain
-                r['note'] = 'ID_Wide_Sustain'
-            else:
-                if val_id < THRESHOLD_ID * 0.8:
-                    current_state = 'OFF'
-                    r['state'] = 'OFF'
-                else:
-                    r['state'] = 'ON' # Hysteresis Sustain
-                    r['note'] = 'Hysteresis_Sustain'
+    was_on = np.concatenate(([False], on[:-1]))
+    notes = np.full(num_chunks, NOTE_NONE, dtype=np.uint8)
+    notes[on & ~was_on] = np.where(is_id_active, NOTE_ID_START, NOTE_SURGE_START)[on & ~was_on]
+    notes[on & was_on] = np.where(is_id_active, NOTE_ID_SUSTAIN, NOTE_HYSTERESIS)[on & was_on]
 
     # --- Step 4: Post-Processing 1 (Gap Filling) ---
-    last_on = -1
-    for i, r in enumerate(results):
-        if r['state'] == 'ON':
-            if last_on != -1:
-                gap_min = r['time_min'] - results[last_on]['time_min'] - (CHUNK_DURATION_SEC/60.0)
-                if 0 < gap_min <= CONF_ID['gap_min']:
-                    # Fill Gap
-                    for k in range(last_on + 1, i):
-                        results[k]['state'] = 'ON'
-                        results[k]['note'] = 'Gap_Filled'
-            last_on = i
+    gaps = fill_gaps(on, times_min, step_sec / 60.0, conf['gap_min'])
+    on[gaps] = True
+    notes[gaps] = NOTE_GAP_FILLED
             
     # --- Step 5: Post-Processing 2 (Smart Trimming - SAFE MODE) ---
     if smart_mode:
-        seg_start = -1
-        for i in range(len(results)):
-            r = results[i]
-            if r['state'] == 'ON':
-                if seg_start == -1: seg_start = i
-                
-                # Safety Buffer: Ignore first 1 minute (12 chunks)
-                # 1 min / 5 sec = 12 chunks
-                chunks_1min = int(60 / CHUNK_DURATION_SEC)
-                
-                if i > seg_start + chunks_1min:
-                    prev_val = energies_id[i-1]
-                    curr_val = energies_id[i]
-                    
-                    ratio = (curr_val / prev_val) if prev_val > 0 else 1.0
-                    
-                    # Stricter Cutoff
-                    if ratio < 0.5 and curr_val < THRESHOLD_ID * 0.5:
-                        # Cut remaining
-                        for k in range(i, len(results)):
-                            if results[k]['state'] == 'OFF': break
-                            results[k]['state'] = 'OFF'
-                            results[k]['note'] = 'Trimmed_DropOff'
-                        seg_start = -1 # Reset segment
-            else:
-                seg_start = -1
+        # Safety Buffer: Ignore first 1 minute (12 chunks)
+        # 1 min / 5 sec = 12 chunks
+        chunks_1min = int(60 / step_sec)
+        # Drop-off is judged against the previous non-overlapping window
+        lag = max(1, int(round(CHUNK_DURATION_SEC / step_sec)))
+        
+        trimmed = dropoff_trim_mask(on, energies_id, THRESHOLD_ID, chunks_1min, lag)
+        on[trimmed] = False
+        notes[trimmed] = NOTE_TRIMMED
 
     # --- Step 6: Post-Processing 3 (Noise Removal) ---
-    on_start = -1
-    for i, r in enumerate(results):
-        if r['state'] == 'ON':
-            if on_start == -1: on_start = i
-        else:
-            if on_start != -1:
-                duration_min = r['time_min'] - results[on_start]['time_min']
-                if duration_min < CONF_ID['min_dur_min']:
-                    # Remove Noise
-                    for k in range(on_start, i):
-                        results[k]['state'] = 'OFF'
-                        results[k]['note'] = 'Noise_Removed'
-                on_start = -1
-                
-    # Check last segment
-    if on_start != -1:
-        duration_min = results[-1]['time_min'] - results[on_start]['time_min']
-        if duration_min < CONF_ID['min_dur_min']:
-            for k in range(on_start, len(results)):
-                results[k]['state'] = 'OFF'
-                results[k]['note'] = 'Noise_Removed'
+    noise = short_run_mask(on, times_min, conf['min_dur_min'])
+    on[noise] = False
+    notes[noise] = NOTE_NOISE
+
+    results = ChunkStates(on, notes, step_sec, frame_offset)
 
     # --- Step 7: Final Formatting for UI ---
     # UI expects (timestamps, magnitudes, info)
@@ -224,7 +449,7 @@ def process_signal_heavy(uploaded_file: Any, target_freq: float, bandwidth: floa
     # But we can pass the Threshold in 'info' so Light Analysis can use it.
     
     # Actually, we should map the raw 5s chunks back to a timestamps array
-    final_timestamps = np.array([r['time_sec'] for r in results])
+    final_timestamps = times_sec
     final_magnitudes = energies_id # Already array
     
     # We can also inject the specific "ON" state as a mask into info?
@@ -232,10 +457,7 @@ def process_signal_heavy(uploaded_file: Any, target_freq: float, bandwidth: floa
     # User's JS Summary: "ON: ... - ..."
     # If we zero out OFF sections, the chart will show the trimming result visually.
     
-    final_magnitudes_processed = np.copy(final_magnitudes)
-    for i, r in enumerate(results):
-        if r['state'] == 'OFF':
-            final_magnitudes_processed[i] = 0.0 # Or low value? 0.0 effectively hides it in linear plot logic if we want.
+    final_magnitudes_processed = np.where(on, final_magnitudes, 0.0)
             
     # Normalize for UI (0-100%)
     if len(final_magnitudes_processed) > 0 and final_magnitudes_processed.max() > 0:
@@ -249,21 +471,97 @@ def process_signal_heavy(uploaded_file: Any, target_freq: float, bandwidth: floa
     analysis_info = {
         "active_threshold": THRESHOLD_ID,
         "threshold_pct": threshold_pct,
-        "detected_bandwidth": ID_BW,
         "smart_mode": smart_mode,
-        "v5_results": results, # Store full results for advanced usage
+        "hop_sec": step_sec,
+        "v5_results": results, # Columnar ChunkStates (iterates as the legacy per-chunk dicts)
         "otsu_val": otsu_val
     }
     
     return final_timestamps, final_magnitudes_processed, analysis_info
 
+def process_signal_heavy(uploaded_file: Any, target_freq: float, bandwidth: float, smart_mode: bool = True, hop_sec: Optional[float] = None, decision_params: Optional[Dict[str, float]] = None, use_freq_grid: bool = False) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    SMART UNIVERSAL ANALYZER V5.7 (SAFE TRIMMING) Implementation.
+    
+    캐시되는 추출 단계(extract_band_features)와 가벼운 판단 단계(decide_states)를 순서대로 실행합니다.
+    use_freq_grid이면 파일당 한 번 계산한 주파수 격자(extract_freq_grid)에서 대역 에너지를 잘라 더하며,
+    대역이 격자 범위를 벗어나면 직접 추출로 대체합니다.
+    """
+    timestamps, per_target = process_multi_target(uploaded_file, [target_freq], bandwidth, smart_mode, hop_sec, decision_params, use_freq_grid)
+    magnitudes, analysis_info = per_target[0]
+    return timestamps, magnitudes, analysis_info
+
+def process_multi_target(uploaded_file: Any, target_freqs: Sequence[float], bandwidth: float, smart_mode: bool = True, hop_sec: Optional[float] = None, decision_params: Optional[Dict[str, float]] = None, use_freq_grid: bool = False) -> Tuple[np.ndarray, List[Tuple[np.ndarray, Dict[str, Any]]]]:
+    """
+    여러 타겟 주파수(예: 기계마다 다른 ID 톤)를 파일 한 번 읽기로 추출하고,
+    타겟마다 독립적으로 V5.7 판단(decide_states)을 실행합니다.
+    
+    반환값:
+        timestamps (np.ndarray): 모든 타겟이 공유하는 프레임 시각.
+        per_target (List[Tuple]): target_freqs 순서의 (magnitudes, analysis_info) 목록.
+    """
+    target_freqs = tuple(float(f) for f in target_freqs)
+    if not target_freqs:
+        raise ValueError("At least one target frequency is required")
+    ID_BW = bandwidth if bandwidth > 0 else CONF_ID['bw']
+    grid_bands = snap_bands_to_grid(v57_multi_band_table(target_freqs, bandwidth), FREQ_GRID_STEP)
+    # 격자 범위를 벗어난 타겟이나 상한(FREQ_GRID_MAX_MB)을 넘는 격자는 대역 직접 추출로 대체
+    from_grid = use_freq_grid and grid_covers(grid_frequencies(*FREQ_GRID_RANGE, FREQ_GRID_STEP), grid_bands) and freq_grid_fits(uploaded_file, hop_sec)
+    if from_grid:
+        grid, grid_freqs, step_sec = extract_freq_grid(uploaded_file, hop_sec)
+        band_energies = band_energies_from_grid(grid, grid_freqs, grid_bands)
+        peak_tracks = None  # 0.5Hz 격자는 5초 윈도우의 0.2Hz 분해능보다 성겨 추적에 쓰지 않음
+    else:
+        band_energies, step_sec, peak_tracks = extract_multi_band_features(uploaded_file, target_freqs, bandwidth, hop_sec)
+    
+    timestamps = None
+    per_target = []
+    for i, target_freq in enumerate(target_freqs):
+        timestamps, magnitudes, analysis_info = decide_states(target_band_energies(band_energies, i), step_sec, smart_mode, decision_params)
+        analysis_info["target_freq"] = target_freq
+        analysis_info["detected_bandwidth"] = ID_BW
+        analysis_info["from_freq_grid"] = from_grid
+        if from_grid:
+            analysis_info["grid_target_freq"] = float(grid_bands[i, 0])
+        # Per-chunk peak frequency / amplitude of each V5.7 band (ID, 60Hz, 120Hz, 180Hz)
+        analysis_info["peak_freqs"] = target_band_energies(peak_tracks[0], i) if peak_tracks is not None else None
+        analysis_info["peak_amps"] = target_band_energies(peak_tracks[1], i) if peak_tracks is not None else None
+        per_target.append((magnitudes, analysis_info))
+    return timestamps, per_target
+
 # --- 레벨 2: 가벼운 연산 (판단 로직) ---
 # 슬라이더가 변경될 때 빠르게 재실행됩니다.
+@st.cache_data(show_spinner=False)
+def build_sensitivity_index(magnitudes: np.ndarray, v5_results: Optional[Union[ChunkStates, List[Dict[str, Any]]]] = None) -> SensitivityIndex:
+    """
+    분석 결과마다 한 번: 크기 정렬 + Otsu 기준값을 계산해 둡니다.
+    v5_results가 제공되면 'ON' 상태 청크만 이상징후 후보가 됩니다. (Single Source of Truth)
+    """
+    on_mask = None
+    if v5_results is not None and len(v5_results) == len(magnitudes):
+        # Assuming v5_results matches timestamps 1:1
+        if isinstance(v5_results, ChunkStates):
+            on_mask = v5_results.on_mask
+        else:
+            on_mask = np.array([r['state'] == 'ON' for r in v5_results])
+    return SensitivityIndex(magnitudes, on_mask)
+
+@st.cache_data(show_spinner=False)
+def sensitivity_curve(magnitudes: np.ndarray, v5_results: Optional[ChunkStates] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    민감도 슬라이더 전체 범위(SENSITIVITY_RANGE)의 (승수, 임계값, 이상징후 수) 곡선.
+    """
+    lo, hi = SENSITIVITY_RANGE
+    multipliers = np.round(np.arange(lo, hi + SENSITIVITY_STEP / 2, SENSITIVITY_STEP), 6)
+    thresholds, counts = build_sensitivity_index(magnitudes, v5_results).curve(multipliers)
+    return multipliers, thresholds, counts
+
 @st.cache_data(show_spinner="임계값 적용 중 (Light)...")
-def detect_anomalies_light(timestamps: np.ndarray, magnitudes: np.ndarray, otsu_multiplier: float, manual_threshold: Optional[float] = None, v5_results: Optional[List[Dict[str, Any]]] = None) -> Tuple[np.ndarray, float, List[Dict[str, float]]]:
+def detect_anomalies_light(timestamps: np.ndarray, magnitudes: np.ndarray, otsu_multiplier: float, manual_threshold: Optional[float] = None, v5_results: Optional[Union[ChunkStates, List[Dict[str, Any]]]] = None) -> Tuple[np.ndarray, float, List[Dict[str, float]]]:
     """
     Otsu 임계값과 승수를 적용하여 이상징후를 감지합니다.
     단, v5_results가 제공되면 'ON' 상태인 구간에서만 감지합니다. (Single Source of Truth)
+    정렬/Otsu는 build_sensitivity_index에 캐시되므로 승수 변경은 이진 탐색 한 번입니다.
     
     반환값:
         anomalies (np.ndarray): 이상징후 불리언 마스크.
@@ -273,72 +571,31 @@ def detect_anomalies_light(timestamps: np.ndarray, magnitudes: np.ndarray, otsu_
     if len(magnitudes) == 0:
         return np.array([]), 0.0, []
 
+    index = build_sensitivity_index(magnitudes, v5_results)
     if manual_threshold is not None:
         final_thresh = manual_threshold
     else:
-        try:
-            otsu_val = threshold_otsu(magnitudes)
-        except:
-            otsu_val = 0.0 # 빈 데이터 또는 균일한 데이터 처리
-        final_thresh = otsu_val * otsu_multiplier
-    
-    # 1. Base Anomaly Detection (Threshold crossing)
-    anomalies = magnitudes > final_thresh
-    
-    # 2. Filter by Machine State (If v5_results provided)
-    if v5_results is not None and len(v5_results) == len(anomalies):
-        # Create a boolean mask for 'ON' state
-        # Assuming v5_results matches timestamps 1:1
-        on_mask = np.array([r['state'] == 'ON' for r in v5_results])
-        anomalies = anomalies & on_mask
+        final_thresh = index.threshold(otsu_multiplier)
+    
+    # Threshold crossing within ON chunks (binary search over the sorted candidates)
+    hits = index.indices_above(final_thresh)
+    anomalies = np.zeros(len(magnitudes), dtype=bool)
+    anomalies[hits] = True
     
     # UI용 결과 포맷팅
-    results = []
-    for t, mag, is_anomaly in zip(timestamps, magnitudes, anomalies):
-        if is_anomaly:
-            results.append({
-                "timestamp": t,
-                "magnitude": mag,
-                "threshold": final_thresh
-            })
+    results = [
+        {"timestamp": t, "magnitude": mag, "threshold": final_thresh}
+        for t, mag in zip(np.asarray(timestamps)[hits].tolist(), np.asarray(magnitudes)[hits].tolist())
+    ]
             
     return anomalies, final_thresh, results
 
-@st.cache_data(show_spinner="전체 스펙트럼 분석 중 (Spectrum Analysis)...")
-def calculate_spectral_stats(uploaded_file: Any, top_n: int = 5) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, float]]]:
+def find_spectral_peaks(freqs: np.ndarray, psd: np.ndarray, resolution_hz: float, top_n: int = 5) -> List[Dict[str, float]]:
     """
-    Welch 방법을 사용하여 PSD(Power Spectral Density)를 계산하고 주요 피크를 찾습니다.
-    대용량 파일도 효율적으로 처리합니다.
+    PSD에서 높이 순 상위 top_n개 피크를 찾습니다 (중간 스펙트럼에도 사용).
     """
-    # 1. Load Audio
-    # mmap 모드로 로드되더라도 welch 함수는 잘 처리합니다.
-    sample_rate, signal = load_audio(uploaded_file)
-    
-    # Mono Conversion using mean effectively
-    if len(signal.shape) > 1:
-        signal = signal.mean(axis=1)
-        
-    # 데이터가 비어있는 경우 처리
-    if len(signal) == 0:
-        return np.array([]), np.array([]), []
-
-    # 2. Welch's Method Optimization
-    # nperseg를 조절하여 주파수 해상도를 결정합니다.
-    # 목표: 60Hz 대역에서 0.5Hz~1Hz 정도의 해상도를 확보하려면
-    # delta_f = fs / nperseg
-    # 1.0 Hz = 44100 / nperseg  => nperseg ~= 44100
-    # 2^15 = 32768 (약 1.3Hz 해상도 @ 44.1kHz)
-    # 2^16 = 65536 (약 0.67Hz 해상도 @ 44.1kHz) -> 정밀도 위해 선택
-    
-    nperseg = 65536
-    if len(signal) < nperseg:
-        nperseg = len(signal)
-    
-    # 메모리 절약을 위해 float32로 변환 후 처리 (선택사항이나 numpy가 알아서 함)
-    # welch는 평균화된 FFT 결과를 주므로 전체 FFT보다 메모리 효율적입니다.
-    freqs, psd = welch(signal, fs=sample_rate, nperseg=nperseg)
-    
-    # 3. Find Peaks
+    if len(psd) == 0:
+        return []
     # height: 잡음 바닥보다 높은 것만 (최대값의 1% 이상)
     # prominence: 주변보다 뚜렷하게 솟은 것 (최대값의 5% 이상)
     # distance: 10Hz 이상 떨어진 피크만 (해상도 0.67Hz 기준 약 15칸)
@@ -348,7 +605,7 @@ def calculate_spectral_stats(uploaded_file: Any, top_n: int = 5) -> Tuple[np.nda
         psd, 
         height=max_power * 0.01, 
         prominence=max_power * 0.05, 
-        distance=int(10 / (sample_rate / nperseg)) # 최소 10Hz 간격
+        distance=int(10 / resolution_hz) # 최소 10Hz 간격
     )
     
     peak_freqs = freqs[peaks]
@@ -370,4 +627,89 @@ def calculate_spectral_stats(uploaded_file: Any, top_n: int = 5) -> Tuple[np.nda
             'power': p_val
         })
         
-    return freqs, psd, top_peaks
+    return top_peaks
+
+@st.cache_data(show_spinner=False)
+def _spectral_stats_cache(uploaded_file: Any, top_n: int, prefetch_targets: Optional[Tuple[float, ...]], bandwidth: float, hop_sec: Optional[float], _result: Optional[Tuple] = None) -> Tuple:
+    if _result is None:
+        raise _CacheMiss
+    return _result
+
+def calculate_spectral_stats(uploaded_file: Any, top_n: int = 5, prefetch_targets: Optional[Sequence[float]] = None, bandwidth: float = 0.0, hop_sec: Optional[float] = None, on_progress: Optional[Callable] = None) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, float]]]:
+    """
+    Welch 방법을 사용하여 PSD(Power Spectral Density)를 계산하고 주요 피크를 찾습니다.
+    대용량 파일도 효율적으로 처리합니다.
+    
+    Args:
+        prefetch_targets: 주어지면 같은 읽기에서 이 타겟들의 V5.7 대역 에너지도 추출해 캐시합니다
+            (extract_spectrum_and_bands). 이어지는 분석이 파일을 다시 읽지 않습니다.
+        on_progress: 블록마다 (진행률, freqs, 중간 psd)로 호출되는 콜백. 캐시 밖에서 호출되므로 Streamlit 요소를 그려도 되며,
+            캐시 적중 시에는 호출되지 않습니다.
+    """
+    prefetch_targets = tuple(float(f) for f in prefetch_targets) if prefetch_targets else None
+    return _cached_result(
+        _spectral_stats_cache, lambda: _spectral_stats(uploaded_file, top_n, prefetch_targets, bandwidth, hop_sec, on_progress),
+        uploaded_file, top_n, prefetch_targets, bandwidth, hop_sec
+    )
+
+def _spectral_stats(uploaded_file: Any, top_n: int, prefetch_targets: Optional[Tuple[float, ...]], bandwidth: float, hop_sec: Optional[float], on_progress: Optional[Callable]) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, float]]]:
+    # 1. Open Audio (header only)
+    # 샘플은 블록 단위로 읽으므로 녹음 길이와 무관하게 메모리 사용량이 일정합니다.
+    wav_info = read_wav_info(uploaded_file)
+    sample_rate = wav_info.sample_rate
+        
+    # 데이터가 비어있는 경우 처리
+    if wav_info.n_frames == 0:
+        return np.array([]), np.array([]), []
+
+    # 2. Welch's Method Optimization
+    # nperseg를 조절하여 주파수 해상도를 결정합니다.
+    # 목표: 60Hz 대역에서 0.5Hz~1Hz 정도의 해상도를 확보하려면
+    # delta_f = fs / nperseg
+    # 1.0 Hz = 44100 / nperseg  => nperseg ~= 44100
+    # 2^15 = 32768 (약 1.3Hz 해상도 @ 44.1kHz)
+    # 2^16 = 65536 (약 0.67Hz 해상도 @ 44.1kHz) -> 정밀도 위해 선택
+    
+    nperseg = _welch_nperseg(wav_info.n_frames)
+    
+    if prefetch_targets:
+        # Fused read: the same blocks also feed the band-energy extractor
+        freqs, psd, _, _, _ = extract_spectrum_and_bands(uploaded_file, prefetch_targets, bandwidth, hop_sec, on_progress)
+    else:
+        # welch(signal, fs, nperseg)와 동일한 결과를 블록 단위로 누적 (세그먼트 겹침분은 다음 블록으로 이월)
+        # float32 연산 + 누적 합만 보관하므로 수 GB 파일도 메모리가 일정합니다
+        welch_acc = WelchAccumulator(sample_rate, nperseg, dtype=np.float32)
+        for _ in _tap_welch(iter_wav_blocks(uploaded_file, nperseg * 16), welch_acc, on_progress, wav_info.n_frames):
+            pass
+        freqs, psd = welch_acc.finalize()
+    
+    return freqs, psd, find_spectral_peaks(freqs, psd, sample_rate / nperseg, top_n)
+
+@st.cache_data(show_spinner="정밀 줌 스펙트럼 분석 중 (Zoom Spectrum)...")
+def calculate_zoom_spectrum(uploaded_file: Any, f_start: float, f_stop: float, resolution: float = 0.01, top_n: int = 3) -> Tuple[np.ndarray, np.ndarray, List[Dict[str, float]], float]:
+    """
+    선택한 대역(f_start~f_stop)만 chirp-z(ZoomFFT)로 고해상도 PSD를 계산합니다.
+    파일을 블록 단위로 순회하며 세그먼트 평균을 누적하므로, 59.8Hz vs 60.1Hz 같은 미세 드리프트를 구분할 수 있습니다.
+    
+    반환값:
+        freqs, psd, top_peaks (주파수 순 아님, 파워 내림차순), 실제 해상도(Hz)
+    """
+    wav_info = read_wav_info(uploaded_file)
+    if wav_info.n_frames == 0:
+        return np.array([]), np.array([]), [], resolution
+    
+    # Mono conversion one block at a time while streaming the file
+    blocks = iter_wav_blocks(uploaded_file, 2 ** 20, mono=True)
+    freqs, psd, actual_res = zoom_spectrum(blocks, wav_info.sample_rate, f_start, f_stop, resolution, wav_info.n_frames)
+    
+    # Peaks: at least ~0.1Hz apart, above 5% prominence of the band maximum
+    max_power = np.max(psd)
+    peaks, properties = find_peaks(
+        psd,
+        prominence=max_power * 0.05,
+        distance=max(1, int(0.1 / (freqs[1] - freqs[0]))) if len(freqs) > 1 else 1
+    )
+    order = np.argsort(psd[peaks])[::-1][:top_n]
+    top_peaks = [{'freq': float(freqs[peaks[i]]), 'power': float(psd[peaks[i]])} for i in order]
+    
+    return freqs, psd, top_peaks, actual_res
@@ -1,35 +1,170 @@
 import numpy as np
-from scipy.io import wavfile
 import os
-import warnings
-from typing import Tuple, Union, Any
-from src.config import MAX_FILE_SIZE_MB
+import struct
+from contextlib import contextmanager
+from typing import Tuple, Union, Any, Iterator, NamedTuple
 
-def load_audio(file_path_or_buffer: Union[str, Any]) -> Tuple[int, np.ndarray]:
+def pcm_scale(dtype: np.dtype) -> Tuple[float, float]:
     """
-    메모리 안전성 검사와 함께 오디오 파일을 로드합니다.
+    원본 PCM dtype을 -1.0 ~ 1.0 범위로 정규화하기 위한 (offset, scale)을 반환합니다.
+    정규화 값 = (sample - offset) * scale.
     
-    Args:
-        file_path_or_buffer: 파일 경로 또는 Streamlit UploadedFile 객체.
-    
-    Returns:
-        Tuple[int, np.ndarray]: 샘플 레이트와 오디오 데이터.
+    참고: scipy의 wavfile.read는 24비트 PCM을 상위 비트 정렬(left-justified) int32로 반환하므로
+    int32와 동일한 배율을 사용합니다.
     """
-    size_mb = 0
-    
-    # 파일 경로인 경우 크기 확인
-    if isinstance(file_path_or_buffer, str):
-        if os.path.exists(file_path_or_buffer):
-            size_mb = os.path.getsize(file_path_or_buffer) / (1024 * 1024)
-    # Streamlit UploadedFile인 경우 크기 확인
-    elif hasattr(file_path_or_buffer, 'size'):
-         size_mb = file_path_or_buffer.size / (1024 * 1024)
-            
-    if size_mb > MAX_FILE_SIZE_MB:
-        warnings.warn(f"파일 크기 ({size_mb:.1f}MB)가 안전 한도인 {MAX_FILE_SIZE_MB}MB를 초과했습니다. 메모리 매핑(mmap)을 사용합니다.")
-        # 참고: mmap=True를 사용한 wavfile.read는 읽기 전용이며 대용량 파일에 더 빠릅니다.
-        sample_rate, data = wavfile.read(file_path_or_buffer, mmap=True)
+    dtype = np.dtype(dtype)
+    if dtype == np.uint8:
+        return 128.0, 1.0 / 128.0
+    if dtype == np.int16:
+        return 0.0, 1.0 / 32768.0
+    if dtype == np.int32:
+        return 0.0, 1.0 / 2147483648.0
+    return 0.0, 1.0
+
+def to_mono_float(block: np.ndarray, dtype: Any = np.float64) -> np.ndarray:
+    """
+    원본 dtype의 샘플 블록(1D 또는 (n, channels))을 정규화된 모노 float 배열로 변환합니다.
+    블록 단위로만 변환하므로 전체 녹음을 float로 복사하지 않습니다.
+    """
+    offset, scale = pcm_scale(block.dtype)
+    if block.ndim > 1:
+        mono = block.mean(axis=1, dtype=np.float64)
+    else:
+        mono = block.astype(np.float64)
+    if offset:
+        mono -= offset
+    mono *= scale
+    return mono.astype(dtype, copy=False)
+
+# --- Streaming WAV Reader ---
+# wavfile.read는 업로드 버퍼(UploadedFile)를 항상 통째로 메모리에 올립니다 (mmap은 실제 경로만 가능).
+# 아래 리더는 RIFF 헤더만 직접 파싱한 뒤 data 청크를 고정 크기 블록으로 나눠 읽으므로,
+# 녹음 길이와 무관하게 블록 1개 분량의 메모리만 사용합니다.
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    n_channels: int
+    n_frames: int
+    dtype: np.dtype      # 블록으로 반환되는 샘플 dtype (24비트는 상위 정렬 int32, wavfile.read와 동일)
+    sample_width: int    # 파일 내 샘플 1개의 바이트 수
+    data_offset: int
+
+@contextmanager
+def _open_source(file_path_or_buffer: Union[str, Any]):
+    if isinstance(file_path_or_buffer, (str, os.PathLike)):
+        with open(file_path_or_buffer, 'rb') as fp:
+            yield fp
     else:
-        sample_rate, data = wavfile.read(file_path_or_buffer)
-        
-    return sample_rate, data
+        file_path_or_buffer.seek(0)
+        yield file_path_or_buffer
+
+def _sample_dtype(format_tag: int, width: int) -> np.dtype:
+    if format_tag == WAVE_FORMAT_PCM:
+        if width == 1:
+            return np.dtype(np.uint8)
+        if width == 2:
+            return np.dtype('<i2')
+        if width in (3, 4):
+            return np.dtype('<i4')
+    elif format_tag == WAVE_FORMAT_IEEE_FLOAT:
+        if width == 4:
+            return np.dtype('<f4')
+        if width == 8:
+            return np.dtype('<f8')
+    raise ValueError(f"지원하지 않는 WAV 포맷입니다 (format tag 0x{format_tag:04X}, {width * 8}비트).")
+
+def _parse_wav_header(fp) -> WavInfo:
+    riff = fp.read(12)
+    if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+        raise ValueError("RIFF/WAVE 파일이 아닙니다.")
+
+    fmt = None
+    while True:
+        header = fp.read(8)
+        if len(header) < 8:
+            raise ValueError("WAV 파일에 data 청크가 없습니다.")
+        chunk_id, size = header[:4], struct.unpack('<I', header[4:])[0]
+
+        if chunk_id == b'fmt ':
+            body = fp.read(size + (size & 1))
+            format_tag, n_channels, sample_rate, _, block_align, _ = struct.unpack('<HHIIHH', body[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                format_tag = struct.unpack('<H', body[24:26])[0]  # SubFormat GUID의 앞 2바이트
+            if n_channels == 0 or block_align % n_channels:
+                raise ValueError("WAV fmt 청크가 손상되었습니다.")
+            width = block_align // n_channels
+            fmt = (sample_rate, n_channels, _sample_dtype(format_tag, width), width)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data 청크가 fmt 청크보다 앞에 있습니다.")
+            sample_rate, n_channels, dtype, width = fmt
+            data_offset = fp.tell()
+            # 녹음 중단 등으로 헤더 크기가 실제보다 크면 파일 끝까지만 사용
+            fp.seek(0, os.SEEK_END)
+            size = min(size, fp.tell() - data_offset)
+            fp.seek(data_offset)
+            return WavInfo(sample_rate, n_channels, size // (width * n_channels), dtype, width, data_offset)
+        else:
+            fp.seek(size + (size & 1), os.SEEK_CUR)
+
+def read_wav_info(file_path_or_buffer: Union[str, Any]) -> WavInfo:
+    """
+    샘플을 읽지 않고 WAV 헤더 정보(샘플레이트, 채널, 길이, dtype)만 반환합니다.
+    """
+    with _open_source(file_path_or_buffer) as fp:
+        return _parse_wav_header(fp)
+
+def _read_block(fp, info: WavInfo, n_frames: int) -> np.ndarray:
+    n_values = n_frames * info.n_channels
+    if info.sample_width == 3:
+        raw = np.empty(n_values * 3, dtype=np.uint8)
+        got = fp.readinto(memoryview(raw)) or 0
+        raw = raw[:got - got % (3 * info.n_channels)].reshape(-1, 3)
+        # 24비트 -> 상위 정렬 int32 (wavfile.read와 동일한 표현)
+        block = np.zeros((len(raw), 4), dtype=np.uint8)
+        block[:, 1:] = raw
+        block = block.view('<i4').reshape(-1)
+    else:
+        block = np.empty(n_values, dtype=info.dtype)
+        got = fp.readinto(memoryview(block).cast('B')) or 0
+        block = block[:got // (info.sample_width * info.n_channels) * info.n_channels]
+
+    if info.n_channels > 1:
+        return block.reshape(-1, info.n_channels)
+    return block
+
+def iter_wav_blocks(file_path_or_buffer: Union[str, Any], block_frames: int, mono: bool = False, dtype: Any = np.float64) -> Iterator[np.ndarray]:
+    """
+    WAV 파일을 block_frames 프레임 단위로 순서대로 읽어 반환하는 제너레이터입니다 (마지막 블록은 더 짧을 수 있음).
+    경로와 버퍼(UploadedFile) 모두 지원합니다. 경로는 mmap 뷰를, 버퍼는 블록마다 새 배열을 반환하므로
+    어느 쪽이든 소비 측에서 블록을 보관해도 안전합니다.
+
+    Args:
+        block_frames: 블록당 프레임 수. 청크 길이의 배수로 주면 블록 경계가 청크 경계와 일치합니다.
+        mono: True이면 블록마다 to_mono_float로 다운믹스/정규화한 dtype 배열을,
+              False이면 원본 dtype의 1D 또는 (n, channels) 배열을 반환합니다.
+    """
+    if isinstance(file_path_or_buffer, (str, os.PathLike)):
+        info = read_wav_info(file_path_or_buffer)
+        if info.sample_width != 3 and info.n_frames > 0:
+            # 실제 파일은 mmap (copy-on-write: 블록은 쓰기 가능한 뷰, 원본 파일은 변경되지 않음)
+            shape = (info.n_frames, info.n_channels) if info.n_channels > 1 else (info.n_frames,)
+            data = np.memmap(file_path_or_buffer, dtype=info.dtype, mode='c', offset=info.data_offset, shape=shape)
+            for start in range(0, info.n_frames, block_frames):
+                block = np.asarray(data[start:start + block_frames])
+                yield to_mono_float(block, dtype) if mono else block
+            return
+
+    with _open_source(file_path_or_buffer) as fp:
+        info = _parse_wav_header(fp)
+        remaining = info.n_frames
+        while remaining > 0:
+            block = _read_block(fp, info, min(block_frames, remaining))
+            if len(block) == 0:
+                break
+            remaining -= len(block)
+            yield to_mono_float(block, dtype) if mono else block
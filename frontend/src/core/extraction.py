@@ -0,0 +1,144 @@
+import numpy as np
+import numba
+from typing import Iterable, Iterator, Optional, Tuple
+from src.config import EXTRACTION_BACKEND, ANALYSIS_WORKERS
+from src.core.magi import band_scan_freqs, calculate_chunk_energies, calculate_chunk_energies_parallel, sliding_band_magnitudes, SLIDING_RESYNC_FRAMES
+from src.core.zoom_dft import chunk_magnitude_matrix, band_energies_from_matrix
+from src.core.audio import pcm_scale
+
+# --- Feature Extraction Dispatch ---
+# 청크별 대역 에너지 추출을 설정된 백엔드(BLAS 행렬곱 / numba 병렬 커널)로 위임합니다.
+
+def resolve_worker_count(workers: Optional[int] = None) -> int:
+    """
+    설정값을 실제 스레드 수로 변환합니다. 0 이하이면 numba가 허용하는 최대 코어 수를 사용합니다.
+    """
+    if workers is None:
+        workers = ANALYSIS_WORKERS
+    if workers <= 0:
+        return numba.config.NUMBA_NUM_THREADS
+    return min(int(workers), numba.config.NUMBA_NUM_THREADS)
+
+def extract_chunk_band_energies(signal: np.ndarray, sample_rate: int, chunk_len: int, bands: np.ndarray, stride: int = 8, backend: Optional[str] = None, workers: Optional[int] = None) -> np.ndarray:
+    """
+    청크별 대역 에너지를 계산합니다.
+    signal은 원본 PCM dtype(1D 또는 (n, channels))을 그대로 받으며, 정규화 배율은 결과에 적용합니다.
+
+    Args:
+        bands: build_band_table로 만든 (n, 3) 대역 배열.
+        backend: "blas" 또는 "numba" (None이면 EXTRACTION_BACKEND).
+        workers: numba 스레드 수 (None이면 ANALYSIS_WORKERS).
+
+    Returns:
+        np.ndarray: (num_chunks, n_bands) 크기 행렬.
+    """
+    backend = backend or EXTRACTION_BACKEND
+    offset, scale = pcm_scale(signal.dtype)
+
+    if backend == "blas":
+        freqs, band_of = band_scan_freqs(bands)
+        mags = chunk_magnitude_matrix(signal, sample_rate, chunk_len, freqs, stride, offset)
+        return band_energies_from_matrix(mags, band_of, len(bands)) * scale
+
+    if backend == "numba":
+        n_threads = resolve_worker_count(workers)
+        if n_threads == 1:
+            return calculate_chunk_energies(signal, sample_rate, chunk_len, bands, stride, offset) * scale
+        prev_threads = numba.get_num_threads()
+        numba.set_num_threads(n_threads)
+        try:
+            return calculate_chunk_energies_parallel(signal, sample_rate, chunk_len, bands, stride, offset) * scale
+        finally:
+            numba.set_num_threads(prev_threads)
+
+    raise ValueError(f"Unknown extraction backend: {backend}")
+
+def align_hop_length(hop_len: int, stride: int = 8) -> int:
+    """
+    hop 길이를 stride의 배수로 맞춥니다 (슬라이딩 갱신 시 샘플 격자 정렬).
+    """
+    return max(stride, int(round(hop_len / stride)) * stride)
+
+def extract_sliding_band_energies(signal: np.ndarray, sample_rate: int, window_len: int, hop_len: int, bands: np.ndarray, stride: int = 8) -> np.ndarray:
+    """
+    겹치는 윈도우(window_len)를 hop_len 간격으로 이동하며 프레임별 대역 에너지를 계산합니다.
+    hop_len은 align_hop_length로 정렬된 값이어야 합니다.
+
+    Returns:
+        np.ndarray: (num_frames, n_bands) 크기 행렬.
+    """
+    offset, scale = pcm_scale(signal.dtype)
+    freqs, band_of = band_scan_freqs(bands)
+    mags = sliding_band_magnitudes(signal, sample_rate, window_len, hop_len, freqs, stride, offset, SLIDING_RESYNC_FRAMES)
+    return band_energies_from_matrix(mags, band_of, len(bands)) * scale
+
+def frame_span_length(window_len: int, stride: int = 8, sliding: bool = False) -> int:
+    """
+    프레임 하나를 계산하는 데 필요한 샘플 수 (슬라이딩 커널은 stride 격자의 마지막 탭까지만 읽음).
+    """
+    return ((window_len + stride - 1) // stride - 1) * stride + 1 if sliding else window_len
+
+def iter_frame_spans(blocks: Iterable[np.ndarray], need: int, hop_len: int) -> Iterator[Tuple[np.ndarray, int]]:
+    """
+    샘플 블록 스트림을 완성된 프레임 묶음으로 바꿉니다.
+    (span, n_frames)를 반환하며, span은 hop_len 간격 n_frames개 프레임(각 need 샘플)을 정확히 덮습니다.
+    다음 프레임 시작점 이후 샘플은 다음 블록으로 이월되므로, 전체 신호를 한 번에 프레임으로 나눈 것과 같은 프레임이 나옵니다.
+    """
+    pending = None
+    for block in blocks:
+        pending = block if pending is None or len(pending) == 0 else np.concatenate([pending, block])
+        if len(pending) < need:
+            continue
+        n_frames = (len(pending) - need) // hop_len + 1
+        yield pending[:(n_frames - 1) * hop_len + need], n_frames
+        pending = pending[n_frames * hop_len:]
+
+def extract_frame_magnitudes(signal: np.ndarray, sample_rate: int, window_len: int, hop_len: int, freqs: np.ndarray, stride: int = 8, sliding: bool = False) -> np.ndarray:
+    """
+    프레임 x 임의 주파수 크기 행렬 (대역 합산 전 단계, PCM 정규화 배율 적용).
+    피크 추적처럼 스캔 주파수별 크기가 필요할 때 사용합니다.
+
+    Returns:
+        np.ndarray: (num_frames, len(freqs)) 크기 행렬.
+    """
+    offset, scale = pcm_scale(signal.dtype)
+    if sliding:
+        mags = sliding_band_magnitudes(signal, sample_rate, window_len, hop_len, freqs, stride, offset, SLIDING_RESYNC_FRAMES)
+    else:
+        mags = chunk_magnitude_matrix(signal, sample_rate, window_len, freqs, stride, offset)
+    return mags * scale
+
+def stream_band_energies(blocks: Iterable[np.ndarray], sample_rate: int, window_len: int, hop_len: int, bands: np.ndarray, stride: int = 8, sliding: bool = False) -> np.ndarray:
+    """
+    샘플 블록 스트림에서 프레임별 대역 에너지를 계산합니다 (전체 신호를 메모리에 올리지 않음).
+    전체 신호에 extract_chunk_band_energies / extract_sliding_band_energies를 적용한 것과 같은 프레임을 냅니다.
+
+    Args:
+        sliding: False이면 비겹침 청크(hop_len == window_len), True이면 겹치는 윈도우(Sliding DFT).
+
+    Returns:
+        np.ndarray: (num_frames, n_bands) 크기 행렬.
+    """
+    return stream_band_features(blocks, sample_rate, window_len, hop_len, bands, stride, sliding)[0]
+
+def stream_band_features(blocks: Iterable[np.ndarray], sample_rate: int, window_len: int, hop_len: int, bands: np.ndarray, stride: int = 8, sliding: bool = False, track_freqs: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    stream_band_energies와 같은 대역 에너지에 더해, track_freqs가 주어지면 같은 블록에서
+    추적 주파수별 크기 행렬도 계산합니다 (오디오를 한 번만 읽음).
+
+    Returns:
+        band_energies (np.ndarray): (num_frames, n_bands) 크기 행렬.
+        track_mags (np.ndarray 또는 None): (num_frames, len(track_freqs)) 크기 행렬.
+    """
+    parts, track_parts = [], []
+    for span, _ in iter_frame_spans(blocks, frame_span_length(window_len, stride, sliding), hop_len):
+        if sliding:
+            parts.append(extract_sliding_band_energies(span, sample_rate, window_len, hop_len, bands, stride))
+        else:
+            parts.append(extract_chunk_band_energies(span, sample_rate, window_len, bands, stride))
+        if track_freqs is not None:
+            track_parts.append(extract_frame_magnitudes(span, sample_rate, window_len, hop_len, track_freqs, stride, sliding))
+
+    if not parts:
+        return np.zeros((0, len(bands))), (np.zeros((0, len(track_freqs))) if track_freqs is not None else None)
+    return np.concatenate(parts), (np.concatenate(track_parts) if track_freqs is not None else None)
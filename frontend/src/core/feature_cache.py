@@ -0,0 +1,95 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from typing import Any, Optional, Union
+from src.config import FEATURE_CACHE_ENABLED, FEATURE_CACHE_DIR, FEATURE_CACHE_MAX_MB
+from src.core.spool import prune_files
+
+# --- Persistent Feature Cache ---
+# 추출 결과(청크별 대역 에너지 등)를 디스크에 .npy로 저장하여 재시작/재배포 후에도 재사용합니다.
+# 키 = 파일 fingerprint(크기 + 샘플링한 블록 해시) + 추출 파라미터.
+# 전체 내용을 해시하지 않으므로 수 GB 녹음도 키 계산은 1MB 남짓만 읽습니다.
+
+FEATURE_SUFFIX = ".npy"
+FEATURE_CACHE_VERSION = 1   # 추출 알고리즘이 바뀌어 기존 결과가 무효해지면 올림
+
+FINGERPRINT_BLOCKS = 16
+FINGERPRINT_BLOCK_BYTES = 64 * 1024
+
+def source_fingerprint(file_path_or_buffer: Union[str, Any]) -> str:
+    """
+    파일 크기와 앞/뒤 및 균등 간격으로 샘플링한 블록들의 해시로 fingerprint를 만듭니다.
+    첫 블록에 WAV 헤더(포맷/샘플레이트/길이)가 포함됩니다.
+    """
+    h = hashlib.blake2b(digest_size=20)
+    if isinstance(file_path_or_buffer, (str, os.PathLike)):
+        size = os.path.getsize(file_path_or_buffer)
+        fp = open(file_path_or_buffer, 'rb')
+    else:
+        fp = file_path_or_buffer
+        fp.seek(0, os.SEEK_END)
+        size = fp.tell()
+
+    try:
+        h.update(str(size).encode())
+        last = max(0, size - FINGERPRINT_BLOCK_BYTES)
+        for i in range(FINGERPRINT_BLOCKS):
+            fp.seek(last * i // (FINGERPRINT_BLOCKS - 1))
+            h.update(fp.read(FINGERPRINT_BLOCK_BYTES))
+    finally:
+        if fp is not file_path_or_buffer:
+            fp.close()
+        else:
+            fp.seek(0)
+    return h.hexdigest()
+
+def feature_key(fingerprint: str, **params: Any) -> str:
+    """
+    fingerprint와 추출 파라미터(JSON 직렬화 가능 값)로 캐시 키를 만듭니다.
+    """
+    payload = json.dumps({"v": FEATURE_CACHE_VERSION, "src": fingerprint, **params}, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+def _feature_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, key + FEATURE_SUFFIX)
+
+def load_features(key: str, cache_dir: str = FEATURE_CACHE_DIR) -> Optional[np.ndarray]:
+    """
+    캐시된 배열을 읽기 전용 mmap으로 반환합니다. 없거나 손상되었으면 None.
+    """
+    if not FEATURE_CACHE_ENABLED:
+        return None
+    path = _feature_path(key, cache_dir)
+    try:
+        features = np.load(path, mmap_mode='r')
+        os.utime(path)  # LRU 갱신
+        return features
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+
+def save_features(key: str, features: np.ndarray, cache_dir: str = FEATURE_CACHE_DIR) -> Optional[str]:
+    """
+    배열을 캐시에 저장하고 예산(FEATURE_CACHE_MAX_MB)을 넘으면 LRU로 정리합니다.
+    디스크 오류는 분석을 막지 않도록 무시합니다 (None 반환).
+    """
+    if not FEATURE_CACHE_ENABLED:
+        return None
+    path = _feature_path(key, cache_dir)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                np.save(fp, np.ascontiguousarray(features))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    except OSError:
+        return None
+
+    prune_files(cache_dir, FEATURE_SUFFIX, FEATURE_CACHE_MAX_MB, keep=path)
+    return path
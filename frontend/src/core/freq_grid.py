@@ -0,0 +1,104 @@
+import numpy as np
+from typing import Iterable
+from src.core.magi import band_scan_freqs
+from src.core.extraction import frame_span_length, iter_frame_spans
+
+# --- Frequency x Time Magnitude Grid ---
+# 파일마다 한 번, 고정 주파수 격자(예: 20~1000Hz, 0.5Hz 간격)의 프레임별 크기를 모두 계산해 둡니다.
+# 이후 어떤 타겟/대역폭이든 격자 열을 골라 더하기만 하면 되므로 오디오를 다시 읽지 않습니다.
+#
+# 계산: 프레임(window_len)을 n_fft = sample_rate / step 길이로 접어(fold) 더한 뒤 rfft 하면,
+# k번째 bin은 원래 프레임의 DTFT를 정확히 k * step Hz에서 샘플링한 값이 됩니다.
+# (주파수별 DFT 기저 행렬을 만들 필요가 없어 격자 크기와 무관하게 메모리가 작습니다.)
+
+FOLD_BATCH_SAMPLES = 2 ** 22  # 접기용 임시 행렬 상한 (float64 약 32MB)
+
+def grid_frequencies(f_min: float, f_max: float, step: float = 0.5) -> np.ndarray:
+    """
+    step의 정수배로 정렬된 격자 주파수 (f_min ~ f_max 포함).
+    """
+    return np.arange(int(round(f_min / step)), int(round(f_max / step)) + 1) * step
+
+def frame_grid_magnitudes(span: np.ndarray, n_frames: int, sample_rate: int, window_len: int, hop_len: int, freqs: np.ndarray, step: float = 0.5) -> np.ndarray:
+    """
+    span을 hop_len 간격 n_frames개 프레임으로 나눠 격자 주파수별 크기를 계산합니다.
+    정규화는 calculate_band_energy와 동일합니다 (stride 1 기준).
+
+    Args:
+        span: 정규화된 모노 float 신호.
+        freqs: grid_frequencies로 만든 격자 (sample_rate / step은 정수여야 함).
+
+    Returns:
+        np.ndarray: (n_frames, len(freqs)) 크기 행렬.
+    """
+    n_fft = int(round(sample_rate / step))
+    if abs(n_fft * step - sample_rate) > 1e-6:
+        raise ValueError(f"sample_rate {sample_rate} Hz is not a multiple of the grid step {step} Hz")
+    bins = np.rint(freqs / step).astype(np.int64)
+    if bins[-1] > n_fft // 2:
+        raise ValueError(f"Grid upper edge {freqs[-1]} Hz exceeds Nyquist ({sample_rate / 2} Hz)")
+
+    n_fold = -(-window_len // n_fft)
+    frames = np.lib.stride_tricks.sliding_window_view(span, window_len)[::hop_len][:n_frames]
+    out = np.empty((n_frames, len(freqs)), dtype=np.float64)
+
+    batch = max(1, FOLD_BATCH_SAMPLES // (n_fold * n_fft))
+    for start in range(0, n_frames, batch):
+        chunk = frames[start:start + batch]
+        folded = np.zeros((len(chunk), n_fold * n_fft), dtype=np.float64)
+        folded[:, :window_len] = chunk
+        spec = np.fft.rfft(folded.reshape(len(chunk), n_fold, n_fft).sum(axis=1), axis=1)
+        out[start:start + len(chunk)] = np.abs(spec[:, bins])
+
+    return out / (window_len / 2)
+
+def stream_freq_grid(blocks: Iterable[np.ndarray], sample_rate: int, window_len: int, hop_len: int, freqs: np.ndarray, step: float = 0.5, dtype=np.float32) -> np.ndarray:
+    """
+    정규화된 모노 float 블록 스트림에서 (num_frames, len(freqs)) 격자를 계산합니다.
+    블록마다 dtype(float32/float16)으로 줄여 저장하므로 결과 외에 큰 임시 배열이 남지 않습니다.
+    """
+    parts = []
+    for span, n_frames in iter_frame_spans(blocks, frame_span_length(window_len, 1), hop_len):
+        parts.append(frame_grid_magnitudes(span, n_frames, sample_rate, window_len, hop_len, freqs, step).astype(dtype))
+    if not parts:
+        return np.zeros((0, len(freqs)), dtype=dtype)
+    return np.concatenate(parts)
+
+def snap_bands_to_grid(bands: np.ndarray, step: float = 0.5) -> np.ndarray:
+    """
+    대역 중심/폭을 격자(step의 정수배)에 맞춥니다. 5초 윈도우의 주파수 분해능(0.2Hz)이 격자보다 촘촘하므로
+    격자 사이 주파수를 근사하는 대신, 격자 모드에서는 타겟 자체를 가장 가까운 격자 주파수로 옮깁니다.
+    """
+    snapped = bands.copy()
+    snapped[:, 0] = np.round(bands[:, 0] / step) * step
+    snapped[:, 1] = np.maximum(np.round(bands[:, 1] / step), 1) * step
+    snapped[:, 2] = step
+    return snapped
+
+def grid_covers(freqs: np.ndarray, bands: np.ndarray) -> bool:
+    """
+    모든 대역의 스캔 범위(center ± bw)가 격자 안에 있는지 확인합니다.
+    """
+    lo = bands[:, 0] - bands[:, 1]
+    hi = bands[:, 0] + bands[:, 1]
+    step = freqs[1] - freqs[0] if len(freqs) > 1 else 0.0
+    return len(freqs) > 0 and bool(np.all(lo >= freqs[0] - step / 2) and np.all(hi <= freqs[-1] + step / 2))
+
+def band_energies_from_grid(grid: np.ndarray, freqs: np.ndarray, bands: np.ndarray) -> np.ndarray:
+    """
+    격자에서 대역별 에너지(스캔 주파수 크기의 합)를 구합니다.
+    스캔 주파수가 격자 위에 있어야 직접 추출과 같은 값이 됩니다 (snap_bands_to_grid 참고).
+
+    Returns:
+        np.ndarray: (num_frames, n_bands) 크기 행렬.
+    """
+    scan, band_of = band_scan_freqs(bands)
+    step = freqs[1] - freqs[0]
+    idx = np.rint((scan - freqs[0]) / step).astype(np.int64)
+    if len(idx) and (idx.min() < 0 or idx.max() >= len(freqs)):
+        raise ValueError("Band scan range is outside the frequency grid")
+
+    energies = np.zeros((len(grid), len(bands)), dtype=np.float64)
+    for b in range(len(bands)):
+        energies[:, b] = np.sum(grid[:, idx[band_of == b]], axis=1, dtype=np.float64)
+    return energies
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.config import LOG_STORE_PATH, LOG_STORE_DTYPE, LOG_STORE_SETTLE_SEC
+from src.core.stream_processor import N_FEATURES
+
+# --- Local sound_logs Store ---
+# 원격(Supabase)에서 가져온 sound_logs를 로컬 SQLite 파일에 보관하고, 기간 조회는 로컬에서 답합니다.
+# 특징값(82개)은 JSON 대신 float32(또는 float16) 바이트로 저장하여 행당 328(164)바이트입니다.
+# 이미 받아 둔 시간 구간(coverage)을 기록해 두고, 조회 범위 중 빠진 구간(보통 최근 꼬리)만 원격에서 가져옵니다.
+# 서버 프로세스 전체가 하나의 파일을 공유하므로 여러 대시보드 탭/세션이 같은 구간을 다시 요청하지 않습니다.
+#
+# 방금 올라온 행은 장치 지연으로 뒤늦게 도착할 수 있으므로 현재 시각 - LOG_STORE_SETTLE_SEC까지만 완료로 기록합니다
+# (그 이후 구간은 다음 동기화 때 다시 조회, 중복은 id로 무시).
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    created_at TEXT NOT NULL,
+    features BLOB
+);
+CREATE INDEX IF NOT EXISTS logs_ts ON logs (ts, id);
+CREATE TABLE IF NOT EXISTS coverage (start_ts REAL NOT NULL, end_ts REAL NOT NULL);
+"""
+
+def to_epochs(isos: Iterable[str]) -> np.ndarray:
+    """
+    ISO 8601 문자열들 -> UTC epoch 초 (시간대가 없으면 UTC로 간주).
+    저장(insert)과 조회 경계가 같은 변환을 거쳐야 경계 행이 정확히 포함/제외됩니다.
+    """
+    t = pd.to_datetime(list(isos), utc=True, format="ISO8601")
+    return np.asarray((t - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1), dtype=np.float64)
+
+def to_epoch(iso: str) -> float:
+    return float(to_epochs([iso])[0])
+
+def to_iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+def merge_intervals(intervals: Iterable[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """
+    겹치거나 맞닿은 구간을 합칩니다.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def missing_intervals(covered: List[Tuple[float, float]], start: float, end: float) -> List[Tuple[float, float]]:
+    """
+    [start, end] 중 covered(정렬/병합된 구간)에 포함되지 않은 구간들.
+    """
+    gaps = []
+    cursor = start
+    for c_start, c_end in covered:
+        if c_end < cursor:
+            continue
+        if c_start > end:
+            break
+        if c_start > cursor:
+            gaps.append((cursor, c_start))
+        cursor = max(cursor, c_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+class LogStore:
+    """
+    Attributes:
+        path (str): SQLite 파일 경로.
+        dtype (np.dtype): 특징값 저장 정밀도.
+    """
+
+    def __init__(self, path: str = LOG_STORE_PATH, dtype: str = LOG_STORE_DTYPE, fetch_range: Optional[Callable[..., Iterable[List[Dict[str, Any]]]]] = None, settle_sec: float = LOG_STORE_SETTLE_SEC):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.settle_sec = settle_sec
+        if fetch_range is None:
+            from src.core.supabase_client import iter_logs_by_range as fetch_range
+        self._fetch_range = fetch_range
+        self._lock = threading.Lock()  # 같은 구간을 여러 세션이 동시에 동기화하지 않도록
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # 호출마다 새 연결 (Streamlit 세션 스레드 간 공유 없음): 성공 시 commit, 항상 close
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def insert(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        원격 행(id, created_at, features)을 저장합니다. 이미 있는 id는 무시. 새로 저장한 행 수를 반환합니다.
+        """
+        if not rows:
+            return 0
+        ts = to_epochs(r["created_at"] for r in rows)
+        records = []
+        for r, t in zip(rows, ts):
+            feat = r.get("features") or []
+            blob = np.asarray(feat[:N_FEATURES], dtype=self.dtype).tobytes() if len(feat) >= N_FEATURES else None
+            records.append((r["id"], float(t), r["created_at"], blob))
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO logs (id, ts, created_at, features) VALUES (?, ?, ?, ?)", records)
+            return conn.total_changes - before
+
+    def covered(self) -> List[Tuple[float, float]]:
+        with self._connect() as conn:
+            return merge_intervals(conn.execute("SELECT start_ts, end_ts FROM coverage").fetchall())
+
+    def mark_covered(self, start_ts: float, end_ts: float) -> None:
+        """
+        [start_ts, end_ts]의 모든 행이 저장되었음을 기록합니다 (기존 구간과 병합).
+        """
+        if end_ts <= start_ts:
+            return
+        with self._connect() as conn:
+            intervals = merge_intervals(conn.execute("SELECT start_ts, end_ts FROM coverage").fetchall() + [(start_ts, end_ts)])
+            conn.execute("DELETE FROM coverage")
+            conn.executemany("INSERT INTO coverage (start_ts, end_ts) VALUES (?, ?)", intervals)
+
+    def polled_until(self, created_at: str) -> float:
+        """
+        폴링 커서 위치(created_at)까지 받은 행 기준으로 완료로 기록할 수 있는 끝 시각 (epoch 초).
+        폴링은 LIVE_POLL_MAX_BATCHES에서 멈출 수 있으므로 커서가 전달한 마지막 행 시각을 넘지 않으며,
+        뒤늦게 도착하는 행을 위해 현재 시각 - settle_sec도 넘지 않습니다.
+        """
+        return min(to_epoch(created_at), time.time() - self.settle_sec)
+
+    def sync(self, start_iso: str, end_iso: Optional[str] = None) -> int:
+        """
+        [start, end] 중 아직 받지 않은 구간만 원격에서 가져와 저장합니다. end_iso=None이면 현재까지.
+        가져온 행 수를 반환합니다.
+        """
+        start = to_epoch(start_iso)
+        now = time.time()
+        end = min(to_epoch(end_iso), now) if end_iso else now
+        fetched = 0
+        with self._lock:
+            for gap_start, gap_end in missing_intervals(self.covered(), start, end):
+                open_ended = gap_end >= now
+                for page in self._fetch_range(to_iso(gap_start), None if open_ended else to_iso(gap_end)):
+                    self.insert(page)
+                    fetched += len(page)
+                self.mark_covered(gap_start, min(gap_end, now - self.settle_sec))
+        return fetched
+
+    def query(self, start_iso: str, end_iso: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        저장된 행을 시간 순으로 읽습니다 (원격 요청 없음).
+
+        Returns:
+            features (np.ndarray): (N, 82) float64, 특징값이 없던 행은 NaN (logs_to_batch와 동일).
+            times (np.ndarray): datetime64[ns] (UTC).
+            ids (np.ndarray): 원격 id.
+            created_at (np.ndarray): 원격 created_at 문자열 (폴링 커서용).
+        """
+        start = to_epoch(start_iso)
+        end = to_epoch(end_iso) if end_iso else np.inf
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, ts, created_at, features FROM logs WHERE ts >= ? AND ts <= ? ORDER BY ts, id", (start, end)
+            ).fetchall()
+
+        n = len(rows)
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+        ts = np.fromiter((r[1] for r in rows), dtype=np.float64, count=n)
+        created_at = np.array([r[2] for r in rows], dtype=object)
+        blobs = [r[3] for r in rows]
+        valid = np.fromiter((b is not None for b in blobs), dtype=bool, count=n)
+
+        features = np.full((n, N_FEATURES), np.nan)
+        if valid.any():
+            features[valid] = np.frombuffer(b"".join(b for b in blobs if b is not None), dtype=self.dtype).reshape(-1, N_FEATURES)
+        times = (np.round(ts * 1e6).astype(np.int64) * 1000).astype("datetime64[ns]")
+        return features, times, ids, created_at
@@ -1,5 +1,8 @@
 import numpy as np
-from numba import jit
+from numba import jit, prange
+from numba.extending import overload
+
+SLIDING_RESYNC_FRAMES = 256  # sliding_band_magnitudes 전체 재계산 주기 (프레임)
 
 @jit(nopython=True, cache=True)
 def robust_goertzel_magi(samples: np.ndarray, sample_rate: int, target_freq: float, bandwidth: float = 1.0) -> float:
@@ -92,3 +95,249 @@ def calculate_band_energy(samples: np.ndarray, sample_rate: int, center_freq: fl
         
     return total_energy
 
+
+def _mono_sample(samples, j):
+    """
+    samples[j]를 모노 float 값으로 읽습니다 (numba 커널 전용, 아래 overload 참조).
+    """
+    raise NotImplementedError
+
+@overload(_mono_sample, inline='always')
+def _ol_mono_sample(samples, j):
+    # 1D: 원본 dtype 그대로 읽기 / 2D (n, channels): 커널 안에서 채널 평균 (다운믹스)
+    if samples.ndim == 1:
+        return lambda samples, j: float(samples[j])
+    def impl(samples, j):
+        acc = 0.0
+        n_ch = samples.shape[1]
+        for c in range(n_ch):
+            acc += samples[j, c]
+        return acc / n_ch
+    return impl
+
+def build_band_table(bands) -> np.ndarray:
+    """
+    (center, bandwidth[, step]) 튜플 목록을 커널 입력용 (n, 3) float64 배열로 변환합니다.
+    step이 생략되면 calculate_band_energy와 동일하게 0.5Hz를 사용합니다.
+    """
+    table = np.empty((len(bands), 3), dtype=np.float64)
+    for i, band in enumerate(bands):
+        table[i, 0] = band[0]
+        table[i, 1] = band[1]
+        table[i, 2] = band[2] if len(band) > 2 else 0.5
+    return table
+
+@jit(nopython=True, cache=True)
+def band_scan_freqs(bands: np.ndarray):
+    """
+    각 대역의 스캔 주파수를 calculate_band_energy와 동일한 순서/누적 방식으로 생성합니다.
+    
+    Returns:
+        freqs (np.ndarray): 모든 대역의 스캔 주파수를 이어붙인 배열.
+        band_of (np.ndarray): freqs[i]가 속한 대역 인덱스.
+    """
+    n_bands = bands.shape[0]
+    
+    # 1차: 대역별 스캔 개수 계산 (while 루프와 동일한 부동소수점 누적)
+    counts = np.zeros(n_bands, dtype=np.int64)
+    for b in range(n_bands):
+        end_f = bands[b, 0] + bands[b, 1]
+        current_f = bands[b, 0] - bands[b, 1]
+        while current_f <= end_f + 1e-9:
+            counts[b] += 1
+            current_f += bands[b, 2]
+    
+    freqs = np.empty(counts.sum(), dtype=np.float64)
+    band_of = np.empty(counts.sum(), dtype=np.int64)
+    
+    # 2차: 실제 주파수 채우기
+    idx = 0
+    for b in range(n_bands):
+        current_f = bands[b, 0] - bands[b, 1]
+        for _ in range(counts[b]):
+            freqs[idx] = current_f
+            band_of[idx] = b
+            idx += 1
+            current_f += bands[b, 2]
+    
+    return freqs, band_of
+
+@jit(nopython=True, cache=True)
+def calculate_band_energies(samples: np.ndarray, sample_rate: int, bands: np.ndarray, stride: int = 8, offset: float = 0.0) -> np.ndarray:
+    """
+    여러 대역의 에너지를 샘플 1회 순회로 동시에 계산합니다 (Single-pass Filterbank).
+    calculate_band_energy를 대역마다 호출한 결과와 같은 값을 반환합니다.
+    
+    각 스캔 주파수의 위상은 샘플마다 cos/sin을 다시 구하지 않고
+    회전 페이저(phasor) 곱으로 갱신하며, 누적 오차를 막기 위해
+    일정 간격마다 정확한 위상으로 재동기화합니다.
+    
+    samples는 int16/int32/float32 등 원본 dtype의 1D 또는 (n, channels) 배열을 그대로 받습니다.
+    다운믹스는 커널 안에서 수행하며, PCM 정규화 배율은 호출 측에서 결과에 곱합니다 (선형 연산).
+    
+    Args:
+        bands: build_band_table로 만든 (n, 3) 배열 [center, bandwidth, step].
+        offset: 부호 없는 PCM(uint8)의 DC 오프셋 (샘플에서 뺌).
+    
+    Returns:
+        np.ndarray: 대역별 에너지 (n,).
+    """
+    freqs, band_of = band_scan_freqs(bands)
+    n_freqs = len(freqs)
+    n_range = len(samples)
+    
+    # 위상 회전자: stride 샘플당 회전량
+    omegas = np.empty(n_freqs)
+    rot_c = np.empty(n_freqs)
+    rot_s = np.empty(n_freqs)
+    for f in range(n_freqs):
+        omegas[f] = (2 * np.pi * freqs[f]) / sample_rate
+        rot_c[f] = np.cos(omegas[f] * stride)
+        rot_s[f] = np.sin(omegas[f] * stride)
+    
+    ph_c = np.empty(n_freqs)
+    ph_s = np.empty(n_freqs)
+    real = np.zeros(n_freqs)
+    imag = np.zeros(n_freqs)
+    
+    resync_every = 4096 # 페이저 재동기화 주기 (stride 샘플 단위)
+    step_count = 0
+    
+    for j in range(0, n_range, stride):
+        if step_count % resync_every == 0:
+            for f in range(n_freqs):
+                angle = omegas[f] * j
+                ph_c[f] = np.cos(angle)
+                ph_s[f] = np.sin(angle)
+        step_count += 1
+        
+        val = _mono_sample(samples, j) - offset
+        for f in range(n_freqs):
+            c = ph_c[f]
+            s = ph_s[f]
+            real[f] += val * c
+            imag[f] += val * s
+            # 다음 샘플 위상으로 회전
+            ph_c[f] = c * rot_c[f] - s * rot_s[f]
+            ph_s[f] = s * rot_c[f] + c * rot_s[f]
+    
+    norm = n_range / stride / 2 # calculate_band_energy와 동일한 정규화
+    energies = np.zeros(bands.shape[0])
+    for f in range(n_freqs):
+        mag = np.sqrt(real[f]*real[f] + imag[f]*imag[f]) / norm
+        energies[band_of[f]] += mag
+    
+    return energies
+
+@jit(nopython=True, cache=True)
+def calculate_chunk_energies(signal: np.ndarray, sample_rate: int, chunk_len: int, bands: np.ndarray, stride: int = 8, offset: float = 0.0) -> np.ndarray:
+    """
+    신호를 chunk_len 단위로 나누어 청크별 대역 에너지를 순차 계산합니다 (단일 코어).
+    
+    Returns:
+        np.ndarray: (num_chunks, n_bands) 크기 행렬.
+    """
+    num_chunks = len(signal) // chunk_len
+    out = np.zeros((num_chunks, bands.shape[0]))
+    for i in range(num_chunks):
+        out[i] = calculate_band_energies(signal[i * chunk_len:(i + 1) * chunk_len], sample_rate, bands, stride, offset)
+    return out
+
+@jit(nopython=True, parallel=True, cache=True)
+def calculate_chunk_energies_parallel(signal: np.ndarray, sample_rate: int, chunk_len: int, bands: np.ndarray, stride: int = 8, offset: float = 0.0) -> np.ndarray:
+    """
+    calculate_chunk_energies의 멀티코어 버전. 청크를 prange로 스레드에 분배합니다.
+    청크마다 동일한 커널을 독립적으로 실행하므로 결과는 순차 버전과 비트 단위로 같습니다.
+    스레드 수는 호출 전에 numba.set_num_threads로 지정합니다.
+    """
+    num_chunks = len(signal) // chunk_len
+    out = np.zeros((num_chunks, bands.shape[0]))
+    for i in prange(num_chunks):
+        out[i] = calculate_band_energies(signal[i * chunk_len:(i + 1) * chunk_len], sample_rate, bands, stride, offset)
+    return out
+
+@jit(nopython=True, cache=True)
+def _accumulate_span(samples: np.ndarray, start: int, count: int, stride: int, omegas: np.ndarray, rot_c: np.ndarray, rot_s: np.ndarray, real: np.ndarray, imag: np.ndarray, sign: float, offset: float):
+    """
+    samples[start::stride]의 count개 샘플을 절대 위상 기준 상관값(real, imag)에 더하거나(sign=1) 뺍니다(sign=-1).
+    구간 시작 위상을 정확히 구한 뒤 회전 페이저로 진행합니다.
+    """
+    n_freqs = len(omegas)
+    ph_c = np.empty(n_freqs)
+    ph_s = np.empty(n_freqs)
+    acc_r = np.zeros(n_freqs)
+    acc_i = np.zeros(n_freqs)
+    for f in range(n_freqs):
+        angle = omegas[f] * start
+        ph_c[f] = np.cos(angle)
+        ph_s[f] = np.sin(angle)
+    
+    j = start
+    for _ in range(count):
+        val = _mono_sample(samples, j) - offset
+        for f in range(n_freqs):
+            c = ph_c[f]
+            s = ph_s[f]
+            acc_r[f] += val * c
+            acc_i[f] += val * s
+            ph_c[f] = c * rot_c[f] - s * rot_s[f]
+            ph_s[f] = s * rot_c[f] + c * rot_s[f]
+        j += stride
+    
+    for f in range(n_freqs):
+        real[f] += sign * acc_r[f]
+        imag[f] += sign * acc_i[f]
+
+@jit(nopython=True, cache=True)
+def sliding_band_magnitudes(samples: np.ndarray, sample_rate: int, window_len: int, hop_len: int, freqs: np.ndarray, stride: int = 8, offset: float = 0.0, resync_frames: int = SLIDING_RESYNC_FRAMES) -> np.ndarray:
+    """
+    겹치는 윈도우(window_len)를 hop_len 간격으로 이동하며 스캔 주파수별 크기를 계산합니다 (Sliding DFT).
+    
+    각 프레임의 상관값은 이전 프레임 값에 새로 들어온 hop 구간을 더하고
+    빠져나간 hop 구간을 빼는 재귀 갱신으로 구하므로, 프레임당 비용은 O(window)가 아닌 O(hop)입니다.
+    부동소수점 누적 오차를 막기 위해 resync_frames마다 윈도우 전체를 다시 계산합니다.
+    
+    Args:
+        hop_len: stride의 배수여야 합니다 (샘플 격자 정렬).
+    
+    Returns:
+        np.ndarray: (num_frames, num_freqs) 크기 행렬. 정규화는 calculate_band_energy와 동일합니다.
+    """
+    n_freqs = len(freqs)
+    n_taps = (window_len + stride - 1) // stride
+    hop_taps = hop_len // stride
+    n_grid = (len(samples) + stride - 1) // stride
+    
+    if n_grid < n_taps or hop_taps <= 0:
+        return np.zeros((0, n_freqs))
+    num_frames = (n_grid - n_taps) // hop_taps + 1
+    
+    omegas = np.empty(n_freqs)
+    rot_c = np.empty(n_freqs)
+    rot_s = np.empty(n_freqs)
+    for f in range(n_freqs):
+        omegas[f] = (2 * np.pi * freqs[f]) / sample_rate
+        rot_c[f] = np.cos(omegas[f] * stride)
+        rot_s[f] = np.sin(omegas[f] * stride)
+    
+    real = np.zeros(n_freqs)
+    imag = np.zeros(n_freqs)
+    out = np.empty((num_frames, n_freqs))
+    norm = window_len / stride / 2
+    
+    for k in range(num_frames):
+        frame_start = k * hop_len
+        if k % resync_frames == 0:
+            # 전체 윈도우 재계산 (정확한 기준점)
+            real[:] = 0.0
+            imag[:] = 0.0
+            _accumulate_span(samples, frame_start, n_taps, stride, omegas, rot_c, rot_s, real, imag, 1.0, offset)
+        else:
+            # 재귀 갱신: 빠져나간 hop 제거, 새로 들어온 hop 추가
+            _accumulate_span(samples, frame_start - hop_len, hop_taps, stride, omegas, rot_c, rot_s, real, imag, -1.0, offset)
+            _accumulate_span(samples, frame_start - hop_len + n_taps * stride, hop_taps, stride, omegas, rot_c, rot_s, real, imag, 1.0, offset)
+        
+        for f in range(n_freqs):
+            out[k, f] = np.sqrt(real[f]*real[f] + imag[f]*imag[f]) / norm
+    
+    return out
@@ -0,0 +1,175 @@
+import numpy as np
+from math import gcd
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional
+from scipy.signal import firwin, kaiserord, upfirdn
+from src.core.audio import to_mono_float
+
+# --- Multirate Front End ---
+# 분석 대상 주파수(60/120/180Hz, 535Hz ID 대역)는 모두 1kHz 미만이므로,
+# 녹음을 한 번만 저역통과(anti-alias) 필터링 후 데시메이션하여 낮은 샘플레이트에서 추출합니다.
+# 처리할 샘플 수가 줄고, 고주파 성분이 분석 대역으로 접히는(aliasing) 문제도 사라집니다.
+
+MIN_OVERSAMPLE = 2.5      # 출력 샘플레이트 >= 최고 분석 주파수 x 2.5
+STOPBAND_ATTEN_DB = 80.0  # 저지대역 감쇠량
+MAX_STAGE_FACTOR = 8      # 단일 단계 최대 데시메이션 비율 (다단 구성으로 필터 길이 절약)
+
+def choose_decimation_factor(sample_rate: int, max_freq: float, align_len: int) -> int:
+    """
+    최고 분석 주파수를 보존하는 가장 큰 데시메이션 비율을 고릅니다.
+    비율은 sample_rate와 align_len(청크/hop 길이)의 약수로 제한하여,
+    출력 샘플레이트가 정수이고 청크 경계가 원본과 정확히 일치하도록 합니다.
+    """
+    q_max = int(sample_rate // (MIN_OVERSAMPLE * max_freq)) if max_freq > 0 else 1
+    common = gcd(int(sample_rate), int(align_len))
+    for q in range(max(1, q_max), 0, -1):
+        if common % q == 0:
+            return q
+    return 1
+
+def _split_stages(q: int) -> List[int]:
+    """
+    데시메이션 비율을 MAX_STAGE_FACTOR 이하의 단계들로 나눕니다 (큰 소인수부터).
+    """
+    factors = []
+    n = q
+    p = 2
+    while p * p <= n:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 1
+    if n > 1:
+        factors.append(n)
+
+    stages = []
+    for f in sorted(factors, reverse=True):
+        if stages and stages[-1] * f <= MAX_STAGE_FACTOR:
+            stages[-1] *= f
+        else:
+            stages.append(f)
+    return stages
+
+@lru_cache(maxsize=32)
+def design_antialias_filter(sample_rate: float, factor: int, max_freq: float) -> np.ndarray:
+    """
+    한 단계 데시메이션용 선형 위상 FIR 저역통과 필터를 설계합니다 (Kaiser 윈도우).
+    통과대역은 max_freq까지, 저지대역은 (출력 샘플레이트 - max_freq)부터입니다.
+    그 사이 성분은 max_freq 위쪽으로만 접히므로 분석 대역에 영향을 주지 않습니다.
+    """
+    nyq = sample_rate / 2
+    stop_edge = min(sample_rate / factor - max_freq, nyq)
+    width = (stop_edge - max_freq) / nyq
+    numtaps, beta = kaiserord(STOPBAND_ATTEN_DB, width)
+    numtaps |= 1  # 홀수 탭: 정수 군지연 (출력 시간 정렬)
+    taps = firwin(numtaps, (max_freq + stop_edge) / 2, window=('kaiser', beta), fs=sample_rate)
+    taps.setflags(write=False)
+    return taps
+
+class Decimator:
+    """
+    단일 단계 스트리밍 데시메이터 (polyphase FIR, upfirdn).
+    블록 단위로 입력해도 전체 신호를 한 번에 처리한 것과 같은 출력을 냅니다.
+    출력 y[m]은 입력 x[m * factor] 시점에 정렬됩니다 (군지연 보정).
+    """
+
+    def __init__(self, taps: np.ndarray, factor: int):
+        self.taps = taps
+        self.factor = factor
+        self.delay = (len(taps) - 1) // 2
+        # 과거 샘플 이력: 스트림 시작 이전은 0으로 간주
+        self._buf = np.zeros(len(taps) + factor, dtype=np.float64)
+        self._buf_start = -len(self._buf)
+        self._n_in = 0
+        self._next_out = 0
+
+    def _emit(self, n_out_total: int) -> np.ndarray:
+        m0 = self._next_out
+        if n_out_total <= m0:
+            return np.empty(0, dtype=np.float64)
+
+        # upfirdn 출력 j가 출력 인덱스 m = m0 - k_pre + j에 대응하도록 버퍼 시작점을 맞춤
+        k_pre = -(-(len(self.taps) - 1) // self.factor)
+        b0 = m0 * self.factor + self.delay - k_pre * self.factor
+        seg_end = (n_out_total - 1) * self.factor + self.delay + 1
+        seg = self._buf[b0 - self._buf_start:seg_end - self._buf_start]
+
+        out = upfirdn(self.taps, seg, up=1, down=self.factor)[k_pre:k_pre + n_out_total - m0]
+        self._next_out = n_out_total
+
+        # 다음 출력에 필요 없는 이력 제거
+        keep_from = self._next_out * self.factor + self.delay - k_pre * self.factor
+        drop = keep_from - self._buf_start
+        if drop > 0:
+            self._buf = self._buf[drop:]
+            self._buf_start = keep_from
+        return out
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        입력 블록을 받아 지금 계산 가능한 출력 샘플을 반환합니다.
+        """
+        self._buf = np.concatenate([self._buf, np.asarray(block, dtype=np.float64)])
+        self._n_in += len(block)
+        # 출력 m은 x[m*factor + delay]까지 필요
+        n_ready = max(0, (self._n_in - 1 - self.delay) // self.factor + 1)
+        return self._emit(n_ready)
+
+    def flush(self) -> np.ndarray:
+        """
+        스트림 끝: 이후 입력을 0으로 간주하여 남은 출력(총 ceil(n_in / factor)개)을 반환합니다.
+        """
+        self._buf = np.concatenate([self._buf, np.zeros(self.delay + 1)])
+        return self._emit(-(-self._n_in // self.factor))
+
+class MultistageDecimator:
+    """
+    여러 Decimator를 직렬 연결한 스트리밍 데시메이터.
+    """
+
+    def __init__(self, sample_rate: int, factor: int, max_freq: float):
+        self.factor = factor
+        self.sample_rate_out = sample_rate // factor
+        self.stages = []
+        rate = float(sample_rate)
+        for q in _split_stages(factor) if factor > 1 else []:
+            self.stages.append(Decimator(design_antialias_filter(rate, q, float(max_freq)), q))
+            rate /= q
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        out = np.asarray(block, dtype=np.float64)
+        for stage in self.stages:
+            out = stage.process(out)
+        return out
+
+    def flush(self) -> np.ndarray:
+        out = np.empty(0, dtype=np.float64)
+        for stage in self.stages:
+            out = np.concatenate([stage.process(out), stage.flush()])
+        return out
+
+def decimate_blocks(blocks: Iterable[np.ndarray], sample_rate: int, factor: int, max_freq: float, n_out: Optional[int] = None) -> Iterator[np.ndarray]:
+    """
+    원본 PCM 블록 스트림을 저역통과 + 데시메이션하여 float32 모노 블록 스트림으로 반환합니다.
+    다운믹스/정규화는 블록마다 수행하며, 마지막에 필터 지연분을 flush합니다.
+
+    Args:
+        n_out: 출력 샘플 수 상한 (예: n_samples // factor로 flush의 0-패딩 꼬리 제거). None이면 제한 없음.
+    """
+    decimator = MultistageDecimator(sample_rate, factor, max_freq)
+    emitted = 0
+
+    def _limited(out: np.ndarray) -> np.ndarray:
+        nonlocal emitted
+        if n_out is not None:
+            out = out[:max(0, n_out - emitted)]
+        emitted += len(out)
+        return out.astype(np.float32)
+
+    for block in blocks:
+        out = _limited(decimator.process(to_mono_float(block)))
+        if len(out):
+            yield out
+    out = _limited(decimator.flush())
+    if len(out):
+        yield out
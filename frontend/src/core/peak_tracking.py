@@ -0,0 +1,66 @@
+import numpy as np
+from typing import Tuple
+
+# --- Peak Frequency Tracking ---
+# 대역 에너지는 스캔 주파수 크기의 합만 남기므로 실제 피크 위치(예: 부하에 따른 모터 슬립 59.6~60.2Hz)가 사라집니다.
+# 대역 중심 주변을 DFT bin(1/5초 = 0.2Hz)보다 촘촘한 간격으로 스캔하고, 청크마다 최대 지점과 양옆 두 점에
+# 포물선을 맞춰(로그 크기 기준) bin 사이의 피크 주파수와 크기를 구합니다. 모든 청크를 한 번에 계산합니다.
+# 스캔 크기는 대역 추출과 같은 블록에서 계산되므로 오디오를 다시 읽지 않습니다 (core/extraction.py 참고).
+
+def tracking_freqs(bands: np.ndarray, span_hz: float = 1.0, step_hz: float = 0.1) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    대역마다 중심 ± min(span_hz, 대역폭)을 step_hz 간격으로 나눈 추적 주파수.
+    대역 스캔 범위를 넘지 않으므로 데시메이션 설정(최고 주파수)이 바뀌지 않습니다.
+
+    Returns:
+        freqs (np.ndarray): 모든 대역의 추적 주파수를 이어붙인 배열.
+        band_of (np.ndarray): freqs[i]가 속한 대역 인덱스.
+    """
+    freqs, band_of = [], []
+    for b, (center, bw, _) in enumerate(bands):
+        half = int(np.floor(min(span_hz, bw) / step_hz + 1e-9))
+        offsets = np.arange(-half, half + 1) * step_hz
+        freqs.append(center + offsets)
+        band_of.append(np.full(len(offsets), b, dtype=np.int64))
+    return np.concatenate(freqs), np.concatenate(band_of)
+
+def interpolate_peaks(mags: np.ndarray, freqs: np.ndarray, band_of: np.ndarray, n_bands: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (num_frames, len(freqs)) 크기 행렬에서 대역별 피크 주파수와 크기를 포물선 보간으로 구합니다.
+    최대 지점이 추적 범위 끝에 있으면 보간하지 않고 그 스캔 주파수를 사용합니다.
+
+    Returns:
+        peak_freqs (np.ndarray): (num_frames, n_bands) 피크 주파수 (Hz).
+        peak_amps (np.ndarray): (num_frames, n_bands) 보간된 피크 크기 (대역 에너지와 같은 정규화).
+    """
+    n_frames = mags.shape[0]
+    peak_freqs = np.zeros((n_frames, n_bands), dtype=np.float64)
+    peak_amps = np.zeros((n_frames, n_bands), dtype=np.float64)
+    rows = np.arange(n_frames)
+
+    for b in range(n_bands):
+        cols = np.flatnonzero(band_of == b)
+        band_mags = mags[:, cols]
+        band_freqs = freqs[cols]
+        k = np.argmax(band_mags, axis=1)
+        peak = band_mags[rows, k]
+        if len(cols) < 3:
+            peak_freqs[:, b] = band_freqs[k]
+            peak_amps[:, b] = peak
+            continue
+
+        # 로그 크기 3점(α, β, γ) 포물선: 꼭짓점 오프셋 p ∈ [-0.5, 0.5] (bin 단위)
+        inner = np.clip(k, 1, len(cols) - 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            alpha = np.log(band_mags[rows, inner - 1])
+            beta = np.log(band_mags[rows, inner])
+            gamma = np.log(band_mags[rows, inner + 1])
+            denom = alpha - 2 * beta + gamma
+            p = np.where(denom < 0, 0.5 * (alpha - gamma) / denom, 0.0)
+        interior = (k == inner) & np.isfinite(p) & (peak > 0)
+        p = np.where(interior, np.clip(p, -0.5, 0.5), 0.0)
+
+        step = band_freqs[1] - band_freqs[0]
+        peak_freqs[:, b] = band_freqs[k] + p * step
+        peak_amps[:, b] = np.where(interior, np.exp(beta - 0.25 * (alpha - gamma) * p), peak)
+    return peak_freqs, peak_amps
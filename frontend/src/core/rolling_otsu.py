@@ -0,0 +1,162 @@
+import numpy as np
+from typing import Tuple
+
+# --- Rolling Otsu Threshold ---
+# 실시간 스트림의 최근 N개 크기(링 버퍼)에 대한 Otsu 임계값을 레코드마다 갱신합니다.
+# 고정된 로그 간격 bin의 히스토그램을 유지하면서 새 값은 더하고 밀려난 값은 빼므로,
+# 분할 탐색 비용은 윈도우 크기와 무관하게 O(bins) 입니다 (윈도우 전체를 다시 정렬/히스토그램하지 않음).
+# 크기 단위를 모르는 입력도 다루도록 bin은 넓은 범위(기본 1e-6 ~ 1e4)를 로그 간격으로 나눕니다.
+#
+# 일괄 처리(extend): 추가/제거를 (값 x bin) ±1 행렬로 만들어 누적 합으로 모든 시점의 히스토그램을 얻고,
+# 값이 있는 bin 범위만 잘라 Otsu를 행 단위로 한 번에 계산합니다. 빈 bin은 분할 결과에 영향이 없으므로
+# 한 개씩 push한 결과와 정확히 같습니다. 임계값(배경 최댓값)은 윈도우 값 뷰에서 행 단위로 구합니다 (O(capacity)).
+
+EXTEND_BATCH_CELLS = 2 ** 16  # 일괄 처리 시 (시점 x bin) 임시 행렬 상한 (float64 512KB, 캐시에 맞는 크기가 가장 빠름)
+
+def log_bin_edges(value_range: Tuple[float, float], bins: int) -> np.ndarray:
+    """
+    value_range를 로그 간격으로 나눈 bins + 1개의 bin 경계.
+    """
+    lo, hi = value_range
+    return np.geomspace(lo, hi, bins + 1)
+
+def bin_index(edges: np.ndarray, values) -> np.ndarray:
+    """
+    edges[k] < v <= edges[k + 1]인 bin k (범위 밖 값은 양 끝 bin).
+    """
+    return np.clip(np.searchsorted(edges, values, side='left') - 1, 0, len(edges) - 2)
+
+def histogram_otsu(counts: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """
+    히스토그램(마지막 축이 bin)에서 클래스 간 분산이 최대인 배경 마지막 bin 인덱스를 구합니다.
+    계산식은 skimage.filters.threshold_otsu와 같고, 여러 히스토그램(행)을 한 번에 처리할 수 있습니다.
+    값이 한 bin에만 있으면(균일 데이터) 그 bin을 반환하여 모든 값이 배경이 됩니다.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    weight1 = np.cumsum(counts, axis=-1)
+    sum1 = np.cumsum(counts * centers, axis=-1)
+    total, sum_total = weight1[..., -1:], sum1[..., -1:]
+    weight1, sum1 = weight1[..., :-1], sum1[..., :-1]
+    # w1 * w2 * (mean1 - mean2)^2 = (S * w1 - N * s1)^2 / (N^2 * w1 * w2): 상수 N^2를 뺀 같은 argmax
+    # 한쪽 클래스가 비면 0 / 0 = NaN이 되므로 -1로 바꿔 후보에서 제외
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance12 = (sum_total * weight1 - total * sum1) ** 2 / (weight1 * (total - weight1))
+    variance12[np.isnan(variance12)] = -1.0
+
+    idx = np.argmax(variance12, axis=-1)
+    last_occupied = counts.shape[-1] - 1 - np.argmax(counts[..., ::-1] > 0, axis=-1)
+    return np.where(np.max(variance12, axis=-1) >= 0, idx, last_occupied)
+
+class RollingOtsu:
+    """
+    고정 용량 NumPy 링 버퍼 + 증분 히스토그램.
+
+    기존 레코드별 skimage threshold_otsu와의 차이 (ON/OFF 판단이 달라질 수 있음):
+        - 분할은 로그 bin(기본 2048개, 폭 약 1.1%) 단위로 찾으므로, 분할 지점 근처의 두 값이 같은 bin에 있으면
+          정확한 Otsu 분할과 한 값만큼 다를 수 있습니다.
+        - 임계값은 bin 경계/중심이 아니라 배경 클래스의 실제 최댓값입니다 (양자화 편향 없음).
+          skimage는 256개 선형 bin의 중심을 반환하고, 두 클래스 사이의 빈 구간에서는 분산이 같아 그 구간의
+          어느 bin이든 될 수 있으므로, sensitivity(승수)가 1이 아니면 skimage 결과와 값이 크게 다를 수 있습니다.
+        - 값이 한 bin에만 있는 (균일) 윈도우는 윈도우 최댓값을 반환합니다. 현재 skimage도 균일 입력에 그 값을 반환하지만,
+          calculate_otsu_threshold의 예외 시 0.0 대체값(구버전 skimage)으로 떨어지는 경우는 없습니다.
+
+    Attributes:
+        capacity (int): 윈도우 크기 (최근 값 개수).
+        edges (np.ndarray): 로그 간격 bin 경계, centers (np.ndarray): bin 중심 (기하 평균).
+        counts (np.ndarray): 현재 윈도우의 bin별 개수.
+    """
+
+    def __init__(self, capacity: int, bins: int = 2048, value_range: Tuple[float, float] = (1e-6, 1e4)):
+        self.capacity = int(capacity)
+        self.edges = log_bin_edges(value_range, bins)
+        self.centers = np.sqrt(self.edges[:-1] * self.edges[1:])
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self._values = np.zeros(self.capacity, dtype=np.float64)
+        self._bins = np.zeros(self.capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, value: float) -> None:
+        """
+        값을 추가합니다. 버퍼가 가득 차 있으면 가장 오래된 값을 히스토그램에서 뺍니다.
+        """
+        b = int(bin_index(self.edges, value))
+        if self._size == self.capacity:
+            self.counts[self._bins[self._head]] -= 1
+        else:
+            self._size += 1
+        self._values[self._head] = value
+        self._bins[self._head] = b
+        self.counts[b] += 1
+        self._head = (self._head + 1) % self.capacity
+
+    def extend(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        값들을 순서대로 push한 것과 같은 결과를 한 번에 계산합니다.
+
+        Returns:
+            sizes (np.ndarray): 각 값을 추가한 직후의 윈도우 크기.
+            thresholds (np.ndarray): 각 값을 추가한 직후의 threshold().
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        # 기존 윈도우 뒤에 새 값을 이어붙인 시퀀스에서 위치 p의 윈도우 = seq[p - capacity + 1 : p + 1]
+        prior = self.values()
+        seq = np.concatenate([prior, values])
+        seq_bins = bin_index(self.edges, seq)
+        pos = np.arange(len(prior), len(seq))
+        sizes = np.minimum(pos + 1, self.capacity)
+
+        lo = min(int(seq_bins.min()), len(self.counts) - 2)
+        hi = max(int(seq_bins.max()) + 1, lo + 2)
+        width = hi - lo
+        counts = self.counts[lo:hi].copy()
+        thresholds = np.empty(n, dtype=np.float64)
+        # 위치 p의 윈도우 값/bin 뷰 (앞을 -inf / bin -1로 채워 첫 윈도우들도 capacity 길이)
+        windows = np.lib.stride_tricks.sliding_window_view(np.concatenate([np.full(self.capacity - 1, -np.inf), seq]), self.capacity)
+        window_bins = np.lib.stride_tricks.sliding_window_view(np.concatenate([np.full(self.capacity - 1, -1), seq_bins]), self.capacity)
+        batch = max(1, EXTEND_BATCH_CELLS // max(width, self.capacity))
+        for start in range(0, n, batch):
+            p = pos[start:start + batch]
+            rows = np.arange(len(p))
+            delta = np.zeros((len(p), width), dtype=np.int64)
+            delta[rows, seq_bins[p] - lo] += 1
+            evict = p - self.capacity
+            has_evict = evict >= 0
+            np.add.at(delta, (rows[has_evict], seq_bins[evict[has_evict]] - lo), -1)
+            window_counts = counts + np.cumsum(delta, axis=0)
+            split = histogram_otsu(window_counts, self.centers[lo:hi]) + lo
+            thresholds[start:start + len(p)] = np.where(window_bins[p] <= split[:, None], windows[p], -np.inf).max(axis=1)
+            counts = window_counts[-1]
+
+        # 최종 상태 = 시퀀스의 마지막 capacity개 값을 push한 링 버퍼
+        self.counts[lo:hi] = counts
+        tail = seq[-self.capacity:]
+        self._size = len(tail)
+        self._head = self._size % self.capacity
+        self._values[:self._size] = tail
+        self._bins[:self._size] = seq_bins[-self._size:]
+        return sizes, thresholds
+
+    def values(self) -> np.ndarray:
+        """
+        윈도우 값 (오래된 것부터).
+        """
+        if self._size < self.capacity:
+            return self._values[:self._size].copy()
+        return np.roll(self._values, -self._head)
+
+    def threshold(self) -> float:
+        """
+        현재 윈도우의 Otsu 임계값: 배경 클래스(분할 bin 이하)의 최댓값 (이하 = 배경). 빈 윈도우면 0.0.
+        """
+        if self._size == 0:
+            return 0.0
+        split = histogram_otsu(self.counts, self.centers)
+        return float(self._values[:self._size][self._bins[:self._size] <= split].max())
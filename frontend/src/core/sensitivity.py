@@ -0,0 +1,51 @@
+import numpy as np
+from typing import Optional, Tuple
+from skimage.filters import threshold_otsu
+
+# --- Sensitivity Index ---
+# 민감도(Otsu 승수) 슬라이더용 사전 계산: 크기를 한 번 정렬하고 Otsu 기준값을 캐시해 두면
+# 임의의 승수 m에 대한 이상징후(임계값 초과 + ON 상태) 집합은 이진 탐색 한 번으로 구해집니다.
+# 같은 방식으로 슬라이더 전체 범위의 (임계값, 이상징후 수) 곡선도 한 번에 얻습니다.
+
+class SensitivityIndex:
+    """
+    Attributes:
+        otsu_base (float): 전체 크기 배열의 Otsu 임계값 (빈/균일 데이터면 0.0).
+        sorted_values (np.ndarray): 후보(ON 상태) 청크 크기의 오름차순 정렬.
+        order (np.ndarray): sorted_values 각 값의 원래 청크 인덱스.
+    """
+
+    def __init__(self, magnitudes: np.ndarray, on_mask: Optional[np.ndarray] = None):
+        magnitudes = np.asarray(magnitudes)
+        try:
+            self.otsu_base = float(threshold_otsu(magnitudes))
+        except:
+            self.otsu_base = 0.0 # 빈 데이터 또는 균일한 데이터 처리
+
+        candidates = np.arange(len(magnitudes)) if on_mask is None else np.flatnonzero(on_mask)
+        order = np.argsort(magnitudes[candidates], kind='stable')
+        self.order = candidates[order]
+        self.sorted_values = magnitudes[self.order]
+
+    def threshold(self, multiplier: float) -> float:
+        return self.otsu_base * multiplier
+
+    def count_above(self, threshold) -> np.ndarray:
+        """
+        임계값(스칼라 또는 배열)을 초과하는 후보 청크 수.
+        """
+        return len(self.sorted_values) - np.searchsorted(self.sorted_values, threshold, side='right')
+
+    def indices_above(self, threshold: float) -> np.ndarray:
+        """
+        임계값을 초과하는 후보 청크의 인덱스 (시간 순).
+        """
+        start = np.searchsorted(self.sorted_values, threshold, side='right')
+        return np.sort(self.order[start:])
+
+    def curve(self, multipliers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        승수 배열에 대한 (임계값, 이상징후 수) 곡선.
+        """
+        thresholds = self.otsu_base * np.asarray(multipliers, dtype=np.float64)
+        return thresholds, self.count_above(thresholds)
@@ -4,7 +4,11 @@ import time
 from typing import Dict, Any, Tuple, Optional, List
 import numpy as np
 import streamlit as st
-from src.core.analysis import process_signal_heavy, detect_anomalies_light
+from src.core.analysis import process_signal_heavy, process_multi_target, detect_anomalies_light, sensitivity_curve
+from src.core.warmup import KernelWarmup
+from src.core.state_machine import ChunkStates
+from src.core.spool import spool_upload
+from src.core.log_store import LogStore
 
 # --- Service Layer ---
 # This layer provides a 1:1 mapping for UI components to fetch their data.
@@ -29,19 +33,59 @@ def get_dashboard_metrics(heavy_proc_time_ms: int, anomaly_count: int) -> Dict[s
         "anomalies_count": anomaly_count
     }
 
-def perform_heavy_analysis(uploaded_file, target_freq: float, bandwidth: float, smart_mode: bool = True) -> Tuple[np.ndarray, np.ndarray, float, Dict[str, Any]]:
+def perform_heavy_analysis(uploaded_file, target_freq: float, bandwidth: float, smart_mode: bool = True, hop_sec: Optional[float] = None, decision_params: Optional[Dict[str, float]] = None, use_freq_grid: bool = False) -> Tuple[np.ndarray, np.ndarray, float, Dict[str, Any]]:
     """
     Service wrapper for heavy signal processing.
     Returns: timestamps, magnitudes, execution_time_ms, analysis_info
     """
     start_time = time.time()
+    # Large uploads are spooled to disk once and analyzed via mmap (cache key becomes the spool path)
+    source = spool_upload(uploaded_file)
     # Updated to receive 3 values from process_signal_heavy
-    timestamps, magnitudes, analysis_info = process_signal_heavy(uploaded_file, target_freq, bandwidth, smart_mode)
+    timestamps, magnitudes, analysis_info = process_signal_heavy(source, target_freq, bandwidth, smart_mode, hop_sec, decision_params, use_freq_grid)
     duration_ms = (time.time() - start_time) * 1000
     return timestamps, magnitudes, duration_ms, analysis_info
 
-def perform_light_analysis(timestamps: np.ndarray, magnitudes: np.ndarray, otsu_multiplier: float, manual_thresh: Optional[float], v5_results: Optional[List[Dict[str, Any]]] = None) -> Tuple[Any, float, List[Dict]]:
+def perform_multi_target_analysis(uploaded_file, target_freqs: List[float], bandwidth: float, smart_mode: bool = True, hop_sec: Optional[float] = None, decision_params: Optional[Dict[str, float]] = None, use_freq_grid: bool = False) -> Tuple[np.ndarray, List[Tuple[np.ndarray, Dict[str, Any]]], float]:
+    """
+    Service wrapper for multi-target analysis (all target bands extracted in one pass).
+    Returns: timestamps, [(magnitudes, analysis_info) per target], execution_time_ms
+    """
+    start_time = time.time()
+    source = spool_upload(uploaded_file)
+    timestamps, per_target = process_multi_target(source, target_freqs, bandwidth, smart_mode, hop_sec, decision_params, use_freq_grid)
+    duration_ms = (time.time() - start_time) * 1000
+    return timestamps, per_target, duration_ms
+
+def perform_light_analysis(timestamps: np.ndarray, magnitudes: np.ndarray, otsu_multiplier: float, manual_thresh: Optional[float], v5_results: Optional[ChunkStates] = None) -> Tuple[Any, float, List[Dict]]:
     """
     Service wrapper for light analysis (thresholding).
     """
     return detect_anomalies_light(timestamps, magnitudes, otsu_multiplier, manual_thresh, v5_results)
+
+def get_sensitivity_curve(magnitudes: np.ndarray, v5_results: Optional[ChunkStates] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Anomaly count and threshold for every sensitivity slider position (computed once per result).
+    """
+    return sensitivity_curve(magnitudes, v5_results)
+
+@st.cache_resource(show_spinner=False)
+def get_log_store() -> LogStore:
+    """
+    Local sound_logs store shared by every session/tab of this server process.
+    """
+    return LogStore()
+
+@st.cache_resource(show_spinner=False)
+def start_kernel_warmup() -> KernelWarmup:
+    """
+    Starts the numba kernel warm-up once per server process (background thread).
+    Subsequent reruns return the same running/finished instance.
+    """
+    return KernelWarmup().start()
+
+def get_kernel_warmup_report() -> Dict[str, Any]:
+    """
+    Retrieves the startup compile report (per-kernel compile time, cache hit/miss).
+    """
+    return start_kernel_warmup().summary()
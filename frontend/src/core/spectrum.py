@@ -0,0 +1,150 @@
+import numpy as np
+from typing import Iterable, Optional, Tuple
+from scipy import fft as sp_fft
+from scipy.signal import ZoomFFT, get_window
+from src.core.multirate import MultistageDecimator, choose_decimation_factor
+
+# --- Zoom Spectrum (Chirp-Z) ---
+# 전체 0~22kHz 대신 사용자가 고른 좁은 대역(예: 50~70Hz)만 고해상도(예: 0.01Hz)로 계산합니다.
+# 1) 대역 상한에 맞춰 데시메이션 -> 2) 1/resolution 초 길이 세그먼트로 나눔
+# -> 3) 세그먼트마다 ZoomFFT(chirp-z)로 해당 대역만 계산 -> 4) 세그먼트 평균 (Welch 방식)
+
+class ZoomSpectrumAccumulator:
+    """
+    모노 샘플 블록을 스트리밍으로 받아 선택 대역의 평균 PSD를 누적합니다.
+    메모리는 세그먼트 1개 분량(데시메이션 후)만 사용합니다.
+    """
+
+    def __init__(self, sample_rate: int, f_start: float, f_stop: float, resolution: float = 0.01, total_samples: int = 0, overlap: float = 0.5):
+        if not 0 <= f_start < f_stop:
+            raise ValueError(f"Invalid zoom band: {f_start}~{f_stop} Hz")
+
+        factor = choose_decimation_factor(sample_rate, f_stop, sample_rate)
+        self.decimator = MultistageDecimator(sample_rate, factor, f_stop)
+        self.sample_rate = sample_rate // factor
+
+        # 해상도 = 1 / 세그먼트 길이(초). 파일이 더 짧으면 전체 길이 1개 세그먼트로 줄임
+        seg_len = int(np.ceil(self.sample_rate / resolution))
+        if total_samples > 0:
+            seg_len = max(16, min(seg_len, total_samples // factor))
+        self.seg_len = seg_len
+        self.hop = max(1, int(seg_len * (1 - overlap)))
+
+        n_points = int(round((f_stop - f_start) / resolution)) + 1
+        self.freqs = np.linspace(f_start, f_stop, n_points)
+        self._zoom = ZoomFFT(seg_len, [f_start, f_stop], m=n_points, fs=self.sample_rate, endpoint=True)
+        self._window = get_window('hann', seg_len)
+        self._scale = 2.0 / (self.sample_rate * np.sum(self._window ** 2))  # one-sided density
+
+        self._pending = np.empty(0, dtype=np.float64)
+        self._psd_sum = np.zeros(n_points, dtype=np.float64)
+        self.n_segments = 0
+
+    @property
+    def resolution(self) -> float:
+        return self.sample_rate / self.seg_len
+
+    def _consume(self, samples: np.ndarray):
+        self._pending = np.concatenate([self._pending, samples])
+        n_ready = (len(self._pending) - self.seg_len) // self.hop + 1 if len(self._pending) >= self.seg_len else 0
+        if n_ready <= 0:
+            return
+
+        frames = np.lib.stride_tricks.sliding_window_view(self._pending, self.seg_len)[::self.hop][:n_ready]
+        frames = frames - frames.mean(axis=1, keepdims=True)  # detrend='constant'
+        spec = self._zoom(frames * self._window, axis=-1)
+        self._psd_sum += np.sum(spec.real ** 2 + spec.imag ** 2, axis=0) * self._scale
+        self.n_segments += n_ready
+        self._pending = self._pending[n_ready * self.hop:]
+
+    def update(self, block: np.ndarray):
+        """
+        원본 샘플레이트의 모노 블록을 추가합니다.
+        """
+        self._consume(self.decimator.process(block))
+
+    def finalize(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        남은 샘플을 처리하고 (freqs, psd)를 반환합니다.
+        """
+        self._consume(self.decimator.flush())
+        if self.n_segments == 0:
+            return self.freqs, np.zeros_like(self.freqs)
+        return self.freqs, self._psd_sum / self.n_segments
+
+def zoom_spectrum(blocks: Iterable[np.ndarray], sample_rate: int, f_start: float, f_stop: float, resolution: float = 0.01, total_samples: int = 0) -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    블록 이터러블에서 선택 대역의 고해상도 평균 PSD를 계산합니다.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, float]: 주파수 축, PSD, 실제 주파수 해상도(Hz).
+    """
+    acc = ZoomSpectrumAccumulator(sample_rate, f_start, f_stop, resolution, total_samples)
+    for block in blocks:
+        acc.update(block)
+    freqs, psd = acc.finalize()
+    return freqs, psd, acc.resolution
+
+# --- Streaming Welch PSD ---
+# scipy.signal.welch(기본값: hann, 50% 겹침, detrend='constant', density)와 같은 결과를
+# 블록 단위 입력으로 계산합니다. 세그먼트가 블록 경계에 걸치면 남은 샘플을 다음 블록으로 이월합니다.
+# 보관하는 상태는 누적 periodogram 합과 이월 샘플(< nperseg)뿐이며, FFT는 WELCH_SEGMENT_BATCH개씩 나눠 수행합니다.
+# dtype=float32이면 창 곱/FFT를 float32(complex64)로 계산하고, 누적 합만 float64로 유지합니다.
+
+WELCH_SEGMENT_BATCH = 16  # 한 번에 FFT하는 세그먼트 수 (65536점 float32 기준 임시 메모리 약 12MB)
+
+class WelchAccumulator:
+    """
+    모노 샘플 블록을 스트리밍으로 받아 Welch 평균 PSD를 누적합니다.
+    메모리는 블록 1개 + 세그먼트 배치 1개 분량만 사용하며, 처리 중에도 finalize()로 중간 스펙트럼을 얻을 수 있습니다.
+    """
+
+    def __init__(self, sample_rate: int, nperseg: int, noverlap: Optional[int] = None, dtype=np.float64):
+        self.sample_rate = sample_rate
+        self.nperseg = nperseg
+        self.hop = nperseg - (nperseg // 2 if noverlap is None else noverlap)
+        self.dtype = np.dtype(dtype)
+        self.freqs = np.fft.rfftfreq(nperseg, 1.0 / sample_rate)
+
+        window = get_window('hann', nperseg)
+        self._window = window.astype(self.dtype)
+        self._scale = np.full(len(self.freqs), 1.0 / (sample_rate * np.sum(window ** 2)))
+        self._scale[1:] *= 2.0  # one-sided: DC 제외 양쪽 합산
+        if nperseg % 2 == 0:
+            self._scale[-1] /= 2.0  # 짝수 길이의 Nyquist 성분은 한 번만
+
+        self._pending = np.empty(0, dtype=self.dtype)
+        self._psd_sum = np.zeros(len(self.freqs), dtype=np.float64)
+        self.n_segments = 0
+        self.n_samples = 0
+
+    def update(self, block: np.ndarray):
+        """
+        모노 블록을 추가하고 완성된 세그먼트를 누적합니다.
+        """
+        block = np.asarray(block, dtype=self.dtype)
+        self.n_samples += len(block)
+        data = np.concatenate([self._pending, block]) if len(self._pending) else block
+        if len(data) < self.nperseg:
+            self._pending = data.copy()
+            return
+        n_ready = (len(data) - self.nperseg) // self.hop + 1
+
+        frames = np.lib.stride_tricks.sliding_window_view(data, self.nperseg)[::self.hop][:n_ready]
+        for start in range(0, n_ready, WELCH_SEGMENT_BATCH):
+            batch = frames[start:start + WELCH_SEGMENT_BATCH]
+            batch = batch - batch.mean(axis=1, keepdims=True, dtype=self.dtype)  # detrend='constant'
+            batch *= self._window
+            spec = sp_fft.rfft(batch, axis=-1)
+            self._psd_sum += np.sum(spec.real ** 2 + spec.imag ** 2, axis=0, dtype=np.float64)
+        self.n_segments += n_ready
+        self._pending = data[n_ready * self.hop:].copy()
+
+    def finalize(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (freqs, psd)를 반환합니다. 세그먼트가 하나도 없으면 PSD는 0입니다.
+        누적 상태를 바꾸지 않으므로 처리 도중 호출하면 지금까지의 중간 스펙트럼이 됩니다.
+        """
+        if self.n_segments == 0:
+            return self.freqs, np.zeros_like(self.freqs)
+        return self.freqs, self._psd_sum * self._scale / self.n_segments
@@ -0,0 +1,154 @@
+import os
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Union
+from src.config import SPOOL_DIR, SPOOL_THRESHOLD_MB, SPOOL_MAX_TOTAL_MB, SPOOL_MAX_AGE_HOURS
+
+# --- Upload Spooling ---
+# 큰 업로드(UploadedFile)는 세션마다 메모리 버퍼로만 존재하여 mmap할 수 없습니다.
+# 임계 크기 이상이면 내용 해시(fingerprint) 이름으로 스풀 디렉터리에 한 번만 기록하고,
+# 이후 분석은 그 파일 경로(mmap)로 수행합니다. 같은 내용의 업로드는 같은 파일을 재사용합니다.
+# 스풀 파일은 수정 시각(mtime) 기준 LRU + 최대 보관 시간으로 정리됩니다.
+#
+# 해시 계산과 기록은 잠금 밖에서 하고, 잠금은 mtime 갱신/정리(prune)/업로드 표 갱신에만 사용합니다.
+# 사용 시각 갱신과 정리가 같은 잠금 아래에서 일어나므로, 방금 반환한 경로는 정리 순서상 가장 최근 파일입니다.
+
+SPOOL_SUFFIX = ".wav"
+MAX_TRACKED_UPLOADS = 256  # file_id -> 경로 표의 최대 항목 수 (LRU)
+
+_lock = threading.Lock()
+_spooled: "OrderedDict[str, str]" = OrderedDict()  # UploadedFile.file_id -> 스풀 경로 (같은 업로드의 재해시 방지)
+
+def content_fingerprint(data: Union[bytes, memoryview]) -> str:
+    """
+    업로드 내용 전체의 해시를 반환합니다 (스풀 파일 이름, 중복 제거 키).
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+def prune_files(directory: str, suffix: str, max_total_mb: float, max_age_hours: Optional[float] = None, keep: Optional[str] = None) -> int:
+    """
+    directory 안의 suffix 파일 중 오래된 파일을 지우고, 전체 크기가 예산을 넘으면
+    가장 오래 사용되지 않은(mtime) 파일부터 지웁니다. 이미 열린(mmap) 파일은 삭제되어도 닫힐 때까지 유효합니다 (POSIX).
+
+    Args:
+        max_age_hours: None이면 보관 시간 제한 없음.
+        keep: 방금 사용한 파일 경로 (예산 초과여도 삭제하지 않음).
+
+    Returns:
+        int: 삭제한 파일 수.
+    """
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(suffix)]
+    except FileNotFoundError:
+        return 0
+
+    entries = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()  # 오래된 것부터
+
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+    budget = max_total_mb * 1024 * 1024
+    removed = 0
+    for mtime, size, path in entries:
+        expired = max_age_hours is not None and now - mtime > max_age_hours * 3600
+        if path != keep and (expired or total > budget):
+            try:
+                os.remove(path)
+                removed += 1
+                total -= size
+            except FileNotFoundError:
+                pass
+    return removed
+
+def cleanup_spool(spool_dir: str = SPOOL_DIR, max_total_mb: float = SPOOL_MAX_TOTAL_MB, max_age_hours: float = SPOOL_MAX_AGE_HOURS, keep: Optional[str] = None) -> int:
+    """
+    스풀 디렉터리를 보관 시간 + LRU 예산으로 정리합니다. 삭제한 파일 수를 반환합니다.
+    삭제된 파일을 가리키던 업로드 표 항목도 함께 지웁니다.
+    """
+    with _lock:
+        removed = prune_files(spool_dir, SPOOL_SUFFIX, max_total_mb, max_age_hours, keep)
+        if removed:
+            for file_id in [k for k, path in _spooled.items() if not os.path.exists(path)]:
+                del _spooled[file_id]
+    return removed
+
+def _touch(path: str, size: Optional[int] = None) -> bool:
+    """
+    스풀 파일이 (size가 주어지면 그 크기로) 있으면 사용 시각을 갱신하고 True. _lock을 잡은 상태에서 호출합니다.
+    """
+    try:
+        if size is not None and os.path.getsize(path) != size:
+            return False
+        os.utime(path)  # LRU 갱신
+        return True
+    except FileNotFoundError:
+        return False
+
+def spool_bytes(data: Union[bytes, memoryview], spool_dir: str = SPOOL_DIR) -> str:
+    """
+    바이트를 내용 해시 이름의 스풀 파일로 기록하고 경로를 반환합니다.
+    이미 같은 파일이 있으면 기록하지 않고 사용 시각만 갱신합니다.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, content_fingerprint(data) + SPOOL_SUFFIX)
+
+    with _lock:
+        reused = _touch(path, len(data))
+    if not reused:
+        # 임시 이름으로 기록 후 원자적 교체 (동시 세션이 같은 파일을 써도 안전)
+        fd, tmp_path = tempfile.mkstemp(dir=spool_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    cleanup_spool(spool_dir, keep=path)
+    return path
+
+def spool_upload(uploaded_file: Any, threshold_mb: float = SPOOL_THRESHOLD_MB) -> Union[str, Any]:
+    """
+    임계 크기 이상의 UploadedFile을 디스크로 스풀하고 파일 경로를 반환합니다.
+    경로, 작은 업로드, 또는 스풀할 수 없는 객체는 그대로 반환합니다.
+    분석 함수는 경로와 버퍼를 모두 받으므로 반환값을 그대로 넘기면 됩니다.
+    """
+    if uploaded_file is None or isinstance(uploaded_file, (str, os.PathLike)):
+        return uploaded_file
+    size = getattr(uploaded_file, "size", None)
+    if size is None or size < threshold_mb * 1024 * 1024 or not hasattr(uploaded_file, "getvalue"):
+        return uploaded_file
+
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id:
+        with _lock:
+            path = _spooled.get(file_id)
+            if path and _touch(path):
+                _spooled.move_to_end(file_id)
+                return path
+
+    # getbuffer()는 BytesIO 내부 버퍼의 memoryview (복사 없음, getvalue()는 복사될 수 있음)
+    if hasattr(uploaded_file, "getbuffer"):
+        with uploaded_file.getbuffer() as data:
+            path = spool_bytes(data)
+    else:
+        path = spool_bytes(uploaded_file.getvalue())
+    if file_id:
+        with _lock:
+            _spooled[file_id] = path
+            _spooled.move_to_end(file_id)
+            while len(_spooled) > MAX_TRACKED_UPLOADS:
+                _spooled.popitem(last=False)
+    return path
@@ -0,0 +1,180 @@
+import io
+import numpy as np
+from typing import Any, Dict, Iterator, Tuple
+
+# --- Vectorized V5.7 State Machine ---
+# 청크별 Python 루프(상태 머신, 갭 병합, 스마트 트리밍, 노이즈 제거)를
+# NumPy 불리언 배열과 run-length 구간 연산으로 바꾼 구현입니다. 결과는 기존 루프와 동일합니다.
+
+# 청크 비고(note) 코드 -> V5.7 라벨
+NOTE_LABELS = ('', 'ID_Wide_Start', 'Startup_Surge_Start', 'ID_Wide_Sustain', 'Hysteresis_Sustain', 'Gap_Filled', 'Trimmed_DropOff', 'Noise_Removed')
+NOTE_NONE, NOTE_ID_START, NOTE_SURGE_START, NOTE_ID_SUSTAIN, NOTE_HYSTERESIS, NOTE_GAP_FILLED, NOTE_TRIMMED, NOTE_NOISE = range(len(NOTE_LABELS))
+
+def run_bounds(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    True 구간들의 (시작 인덱스, 끝 인덱스(미포함)) 배열을 반환합니다.
+    """
+    padded = np.concatenate(([False], mask, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def ranges_mask(n: int, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    [starts[k], ends[k]) 구간들을 True로 표시한 길이 n 마스크 (구간은 겹치지 않아야 함).
+    """
+    marks = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, ends, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+def hysteresis_states(set_mask: np.ndarray, reset_mask: np.ndarray) -> np.ndarray:
+    """
+    OFF에서 시작하는 2-상태 머신: OFF 상태에서 set이면 ON, ON 상태에서 reset이면 OFF.
+
+    set과 reset이 동시에 참인 청크는 이전 상태를 뒤집으므로(토글), 상태는
+    '마지막 단독 set/reset 값'에 '그 이후 토글 횟수의 홀짝'을 XOR한 값이 됩니다 (누적 연산으로 계산).
+    """
+    n = len(set_mask)
+    both = set_mask & reset_mask
+    forced = set_mask ^ reset_mask
+    idx = np.arange(n)
+
+    last_forced = np.maximum.accumulate(np.where(forced, idx, -1)) if n else idx
+    toggles = np.cumsum(both)
+    forced_value = np.where(last_forced >= 0, set_mask[np.maximum(last_forced, 0)], False)
+    toggles_before = np.where(last_forced >= 0, toggles[np.maximum(last_forced, 0)], 0)
+    return forced_value ^ ((toggles - toggles_before) & 1).astype(bool)
+
+def fill_gaps(on: np.ndarray, time_min: np.ndarray, step_min: float, max_gap_min: float) -> np.ndarray:
+    """
+    연속한 ON 청크 사이의 OFF 간격이 0 < gap <= max_gap_min(분)이면 채울 위치 마스크를 반환합니다.
+    """
+    on_idx = np.flatnonzero(on)
+    if len(on_idx) < 2:
+        return np.zeros(len(on), dtype=bool)
+    prev, curr = on_idx[:-1], on_idx[1:]
+    gap = time_min[curr] - time_min[prev] - step_min
+    fill = (gap > 0) & (gap <= max_gap_min)
+    return ranges_mask(len(on), prev[fill] + 1, curr[fill])
+
+def dropoff_trim_mask(on: np.ndarray, energies: np.ndarray, threshold: float, guard: int, lag: int) -> np.ndarray:
+    """
+    스마트 트리밍: 각 ON 구간에서 시작 후 guard 청크가 지난 뒤, 에너지가 lag 청크 전 대비 절반 미만이고
+    임계값의 절반 미만으로 떨어진 첫 청크부터 구간 끝까지 잘라낼 위치 마스크를 반환합니다.
+    """
+    n = len(on)
+    starts, ends = run_bounds(on)
+    if len(starts) == 0:
+        return np.zeros(n, dtype=bool)
+
+    prev = np.empty(n)
+    prev[:lag] = np.nan  # 구간 시작 후 guard(>= lag) 청크 이전은 판단하지 않으므로 사용되지 않음
+    prev[lag:] = energies[:n - lag]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(prev > 0, energies / prev, 1.0)
+    drop = (ratio < 0.5) & (energies < threshold * 0.5)
+
+    run_id = np.cumsum(np.isin(np.arange(n), starts)) - 1
+    run_start = starts[np.maximum(run_id, 0)]
+    eligible = np.flatnonzero(on & drop & (np.arange(n) > run_start + guard))
+    if len(eligible) == 0:
+        return np.zeros(n, dtype=bool)
+
+    runs, first = np.unique(run_id[eligible], return_index=True)
+    return ranges_mask(n, eligible[first], ends[runs])
+
+def short_run_mask(on: np.ndarray, time_min: np.ndarray, min_dur_min: float) -> np.ndarray:
+    """
+    노이즈 제거: 지속 시간이 min_dur_min(분) 미만인 ON 구간 마스크를 반환합니다.
+    지속 시간은 구간 시작부터 다음 OFF 청크까지 (마지막 구간은 마지막 청크까지) 입니다.
+    """
+    n = len(on)
+    starts, ends = run_bounds(on)
+    if len(starts) == 0:
+        return np.zeros(n, dtype=bool)
+    duration = time_min[np.minimum(ends, n - 1)] - time_min[starts]
+    short = duration < min_dur_min
+    return ranges_mask(n, starts[short], ends[short])
+
+# --- Columnar Chunk States ---
+# 청크별 dict 리스트(v5_results) 대신 상태/비고 코드 배열(청크당 2바이트)과 구간(segment) 테이블을 보관합니다.
+# 청크 시각은 등간격이므로 (step_sec, offset_sec)만 저장하고 필요할 때 계산합니다.
+# 덕분에 st.cache_data 피클과 세션 상태 크기가 dict 리스트보다 수십 배 작습니다.
+
+STATE_OFF, STATE_ON = 0, 1
+STATE_LABELS = ('OFF', 'ON')
+
+class ChunkStates:
+    """
+    V5.7 판단 결과의 컬럼형 표현.
+
+    Attributes:
+        states (np.ndarray): STATE_OFF / STATE_ON, uint8.
+        notes (np.ndarray): NOTE_LABELS 인덱스, uint8.
+        step_sec (float): 청크(프레임) 간격(초).
+        offset_sec (float): 첫 청크 시각(초).
+        segments (np.ndarray): ON 구간 (시작 인덱스, 끝 인덱스(미포함)) 테이블, (n_segments, 2) int64.
+
+    기존 호출부 호환을 위해 len(), 인덱싱, 반복 시 청크별 dict
+    ({'id', 'time_min', 'time_sec', 'state', 'note', 'diag'})를 그때그때 만들어 반환합니다.
+    """
+
+    def __init__(self, states: np.ndarray, notes: np.ndarray, step_sec: float, offset_sec: float = 0.0):
+        self.states = np.ascontiguousarray(states, dtype=np.uint8)
+        self.notes = np.ascontiguousarray(notes, dtype=np.uint8)
+        self.step_sec = float(step_sec)
+        self.offset_sec = float(offset_sec)
+        starts, ends = run_bounds(self.states == STATE_ON)
+        self.segments = np.stack([starts, ends], axis=1).astype(np.int64)
+
+    @property
+    def times_sec(self) -> np.ndarray:
+        return np.arange(len(self.states)) * self.step_sec + self.offset_sec
+
+    @property
+    def on_mask(self) -> np.ndarray:
+        return self.states == STATE_ON
+
+    def segment_times(self) -> np.ndarray:
+        """
+        ON 구간의 (시작 초, 끝 초) 배열. 끝 = 마지막 ON 청크 시각 + step_sec.
+        """
+        if len(self.segments) == 0:
+            return np.zeros((0, 2), dtype=np.float64)
+        starts = self.segments[:, 0] * self.step_sec + self.offset_sec
+        ends = (self.segments[:, 1] - 1) * self.step_sec + self.offset_sec + self.step_sec
+        return np.stack([starts, ends], axis=1)
+
+    def to_bytes(self) -> bytes:
+        """
+        압축 없는 .npz 바이트로 직렬화합니다 (구간 테이블은 상태에서 다시 계산되므로 저장하지 않음).
+        """
+        buffer = io.BytesIO()
+        np.savez(buffer, states=self.states, notes=self.notes, timing=np.array([self.step_sec, self.offset_sec]))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'ChunkStates':
+        with np.load(io.BytesIO(data)) as arrays:
+            step_sec, offset_sec = arrays['timing']
+            return cls(arrays['states'], arrays['notes'], step_sec, offset_sec)
+
+    def __reduce__(self):
+        # 피클(st.cache_data 저장)과 st.cache_data 인자 해시 모두 두 배열 + 시각 파라미터만 사용
+        return (ChunkStates, (self.states, self.notes, self.step_sec, self.offset_sec))
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        i = i % len(self)
+        time_sec = i * self.step_sec + self.offset_sec
+        return {
+            'id': i, 'time_min': time_sec / 60.0, 'time_sec': time_sec,
+            'state': STATE_LABELS[self.states[i]], 'note': NOTE_LABELS[self.notes[i]], 'diag': 'NORMAL'
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(len(self)))
@@ -1,21 +1,44 @@
 
 import numpy as np
-from src.core.analysis import calculate_otsu_threshold
+import pandas as pd
+from src.core.rolling_otsu import RollingOtsu
+from src.config import STREAM_HISTORY_SIZE, STREAM_OTSU_BINS, STREAM_OTSU_RANGE
 
 # --- Stream Processor for JSON Data ---
 
+N_FEATURES = 82  # 60Hz band (0-40) + 120Hz band (41-81)
+
+def logs_to_batch(logs):
+    """
+    Stacks sound_logs rows into an (N, 82) feature matrix and a datetime64 (UTC) array.
+    Rows with missing or short features become NaN rows, which process_batch skips
+    exactly like process_features does.
+    """
+    features = np.full((len(logs), N_FEATURES), np.nan)
+    for i, log in enumerate(logs):
+        feat = log.get('features') or []
+        if len(feat) >= N_FEATURES:
+            features[i] = feat[:N_FEATURES]
+    times = pd.to_datetime([log.get('created_at', '') for log in logs], utc=True, format='ISO8601')
+    return features, times.tz_convert(None).to_numpy()
+
 class StreamProcessor:
     """
     Adapts the V5.7 logic to work with streaming JSON data (82 features)
     instead of raw WAV files.
     """
     
-    def __init__(self, history_size=30):
-        # Buffer to store historical magnitude values for dynamic thresholding
-        self.history_buffer = [] 
+    def __init__(self, history_size=STREAM_HISTORY_SIZE):
+        # Ring buffer + incremental histogram of recent magnitudes for dynamic thresholding
+        self.history = RollingOtsu(history_size, STREAM_OTSU_BINS, STREAM_OTSU_RANGE)
         self.history_size = history_size
         self.last_state = "OFF"
     
+    @property
+    def history_buffer(self):
+        """Recent magnitudes, oldest first."""
+        return self.history.values()
+    
     def process_features(self, features_json, sensitivity=1.5):
         """
         Process a single JSON record (82 floats).
@@ -26,7 +49,7 @@ class StreamProcessor:
             - threshold (float)
             - anomaly_score (float)
         """
-        if not features_json or len(features_json) < 82:
+        if not features_json or len(features_json) < N_FEATURES:
             return 0.0, 0.0, "OFF", 0.0, 0.0
             
         # 1. Parse Data (See Latest.md for mapping)
@@ -40,18 +63,16 @@ class StreamProcessor:
         current_mag = np.max(band_60)
         mag_120 = np.max(band_120)
         
-        # 3. Update Buffer
-        self.history_buffer.append(current_mag)
-        if len(self.history_buffer) > self.history_size:
-            self.history_buffer.pop(0)
+        # 3. Update Buffer (oldest value leaves the histogram once the ring is full)
+        self.history.push(current_mag)
             
         # 4. Calculate Dynamic Threshold (Otsu-lite)
-        if len(self.history_buffer) < 5:
+        if len(self.history) < 5:
              # Not enough data, use fallback
              threshold = 0.5 
         else:
-            # We treat the buffer as a mini-histogram
-            threshold = calculate_otsu_threshold(np.array(self.history_buffer), sensitivity)
+            # Otsu over the maintained histogram: O(bins), independent of history_size
+            threshold = self.history.threshold() * sensitivity
             
         # 5. Determine State (Simple Hysteresis)
         if current_mag > threshold:
@@ -65,3 +86,35 @@ class StreamProcessor:
             anomaly_score = (current_mag - threshold) / threshold
             
         return current_mag, mag_120, state, threshold, anomaly_score
+
+    def process_batch(self, features, times=None, sensitivity=1.5):
+        """
+        Process a stacked (N, 82) feature matrix at once, with the same results and
+        final history as calling process_features on each row in time order.
+        Rows containing NaN are treated as invalid records (zeros, 'OFF', not added to history).
+        Returns (all arrays, sorted by times when given): 
+            - times (np.ndarray or None)
+            - 60hz_mag, 120hz_mag, state ('ON'/'OFF'), threshold, anomaly_score
+        """
+        features = np.asarray(features, dtype=np.float64).reshape(-1, N_FEATURES)
+        if times is not None:
+            order = np.argsort(times, kind='stable')
+            times, features = np.asarray(times)[order], features[order]
+        
+        n = len(features)
+        mag_60 = np.zeros(n)
+        mag_120 = np.zeros(n)
+        threshold = np.zeros(n)
+        valid = ~np.isnan(features).any(axis=1)
+        mag_60[valid] = features[valid, :41].max(axis=1)
+        mag_120[valid] = features[valid, 41:].max(axis=1)
+        
+        # Rolling Otsu over every prefix of the valid records (vectorized histogram updates)
+        sizes, otsu = self.history.extend(mag_60[valid])
+        threshold[valid] = np.where(sizes < 5, 0.5, otsu * sensitivity)
+        
+        on = valid & (mag_60 > threshold)
+        anomaly_score = np.zeros(n)
+        anomaly_score[on] = (mag_60[on] - threshold[on]) / threshold[on]
+        state = np.where(on, "ON", "OFF")
+        return times, mag_60, mag_120, state, threshold, anomaly_score
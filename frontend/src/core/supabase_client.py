@@ -1,7 +1,11 @@
 
 import os
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from supabase import create_client, Client
+from src.config import LIVE_POLL_BATCH_ROWS, LIVE_POLL_MAX_BATCHES, LIVE_RANGE_PAGE_ROWS, LIVE_RANGE_SLICE_HOURS, LIVE_RANGE_WORKERS
 
 # --- Configuration from Latest.md ---
 # In production, these should be in st.secrets or environment variables
@@ -9,6 +13,9 @@ SUPABASE_URL = "https://zigwndnmxmxctcayeavx.supabase.co"
 # Note: Publishable key is safe to be here as it is client-side public
 SUPABASE_KEY = "sb_publishable_b8Cotvjt7qt3HOVgVY0KwA_f3h-yOuw"
 
+# Only the columns the dashboard uses (id is the keyset tie-breaker for equal created_at)
+LOG_COLUMNS = "id,created_at,features"
+
 @st.cache_resource
 def init_connection() -> Client:
     """Initialize Supabase connection."""
@@ -30,25 +37,131 @@ def fetch_latest_logs(limit: int = 10):
         st.error(f"Failed to connect to Supabase: {e}")
         return []
 
+def _log_query(client: Client, after: Optional[str] = None, after_id: Optional[int] = None, gte: Optional[str] = None, lt: Optional[str] = None, lte: Optional[str] = None):
+    """
+    sound_logs query in (created_at, id) order, optionally bounded and starting strictly after a keyset position.
+    """
+    query = client.table("sound_logs").select(LOG_COLUMNS)
+    if gte is not None:
+        query = query.gte("created_at", gte)
+    if lt is not None:
+        query = query.lt("created_at", lt)
+    if lte is not None:
+        query = query.lte("created_at", lte)
+    if after is not None:
+        if after_id is None:
+            query = query.gt("created_at", after)
+        else:
+            query = query.or_(f'created_at.gt."{after}",and(created_at.eq."{after}",id.gt.{int(after_id)})')
+    return query.order("created_at").order("id")
+
+def _fetch_slice(client: Client, gte: str, lt: Optional[str], lte: Optional[str], page_rows: int) -> List[List[Dict[str, Any]]]:
+    """
+    All rows of one time slice as keyset pages (oldest first).
+    """
+    pages = []
+    after = after_id = None
+    while True:
+        page = _log_query(client, after, after_id, gte=gte, lt=lt, lte=lte).limit(page_rows).execute().data
+        if page:
+            pages.append(page)
+            after, after_id = page[-1]["created_at"], page[-1].get("id")
+        if len(page) < page_rows:
+            return pages
+
+def _parse_utc(iso: str) -> datetime:
+    # created_at is timestamptz; bounds without an offset are taken as UTC so they compare with aware values
+    dt = datetime.fromisoformat(iso)
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+def _range_slices(start_iso: str, end_iso: Optional[str], slice_hours: float):
+    """
+    Splits [start, end] into consecutive (gte, lt, lte) bounds; the last slice is closed (lte end) or open-ended.
+    """
+    start = _parse_utc(start_iso)
+    stop = _parse_utc(end_iso) if end_iso else datetime.now(timezone.utc)
+    step = timedelta(hours=slice_hours)
+    bounds = [start]
+    while bounds[-1] + step < stop:
+        bounds.append(bounds[-1] + step)
+    slices = [(lo.isoformat(), hi.isoformat(), None) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    slices.append((bounds[-1].isoformat(), None, end_iso))
+    return slices
+
+def iter_logs_by_range(start_iso: str, end_iso: Optional[str] = None, client: Optional[Client] = None, page_rows: int = LIVE_RANGE_PAGE_ROWS, slice_hours: float = LIVE_RANGE_SLICE_HOURS, workers: int = LIVE_RANGE_WORKERS) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yields every log in [start_iso, end_iso] as pages in chronological order (no row cap).
+    The range is cut into time slices that are keyset-paginated concurrently by a bounded
+    worker pool sharing one client (and its HTTP connection pool); each slice is yielded as
+    soon as it and all earlier slices have arrived, so callers can process while later slices load.
+    end_iso=None loads up to now.
+    """
+    client = client if client is not None else init_connection()
+    client.postgrest  # lazily created: build the shared PostgREST (HTTP) client once, before the workers race for it
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = [executor.submit(_fetch_slice, client, gte, lt, lte, page_rows) for gte, lt, lte in _range_slices(start_iso, end_iso, slice_hours)]
+        for future in futures:
+            yield from future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 def fetch_logs_by_range(start_iso: str, end_iso: str = None):
     """
-    Fetch logs within a specific time range.
+    Fetch logs within a specific time range (newest first, complete - see iter_logs_by_range).
     start_iso: ISO 8601 string (e.g. '2023-10-27T10:00:00')
     end_iso: Optional ISO 8601 string
     """
     try:
-        supabase = init_connection()
-        query = supabase.table("sound_logs") \
-            .select("*") \
-            .order("created_at", desc=True) \
-            .gte("created_at", start_iso)
-            
-        if end_iso:
-            query = query.lte("created_at", end_iso)
-            
-        # Limit to 1000 to prevent crash if range is too huge
-        response = query.limit(1000).execute()
-        return response.data
+        rows = [row for page in iter_logs_by_range(start_iso, end_iso) for row in page]
+        return rows[::-1]
     except Exception as e:
         st.error(f"Failed to filter Supabase data: {e}")
         return []
+
+def fetch_logs_after(created_at: Optional[str], row_id: Optional[int] = None, limit: int = LIVE_POLL_BATCH_ROWS) -> List[Dict[str, Any]]:
+    """
+    Fetch up to `limit` logs strictly after the (created_at, id) keyset position, oldest first.
+    created_at=None starts from the beginning of the table.
+    Raises on connection errors so the caller keeps its cursor and retries.
+    """
+    response = _log_query(init_connection(), created_at, row_id).limit(limit).execute()
+    return response.data
+
+class LogCursor:
+    """
+    Incremental ingestion cursor over sound_logs.
+    Each poll returns every row after the last one seen (batched), so rows posted by several
+    devices within one poll interval, or during a stall, are not lost.
+    """
+    
+    def __init__(self, created_at: Optional[str] = None, row_id: Optional[int] = None, fetch: Callable[..., List[Dict[str, Any]]] = fetch_logs_after):
+        self.created_at = created_at
+        self.row_id = row_id
+        self._fetch = fetch
+    
+    @staticmethod
+    def _position(created_at: Optional[str], row_id: Optional[int]):
+        # PostgREST returns created_at in one fixed ISO format, so string order == time order
+        return (created_at or "", -1 if row_id is None else row_id)
+    
+    def advance(self, rows: List[Dict[str, Any]]) -> None:
+        """Move the cursor to the newest of `rows` (any order)."""
+        if rows:
+            last = max(rows, key=lambda r: self._position(r["created_at"], r.get("id")))
+            if self._position(last["created_at"], last.get("id")) > self._position(self.created_at, self.row_id):
+                self.created_at, self.row_id = last["created_at"], last.get("id")
+    
+    def poll(self, batch_rows: int = LIVE_POLL_BATCH_ROWS, max_batches: int = LIVE_POLL_MAX_BATCHES) -> List[Dict[str, Any]]:
+        """
+        Fetch new rows oldest first. Keeps fetching full batches (catch-up after a stall) up to
+        max_batches; the rest is picked up by the next poll.
+        """
+        rows = []
+        for _ in range(max_batches):
+            batch = self._fetch(self.created_at, self.row_id, limit=batch_rows)
+            rows.extend(batch)
+            self.advance(batch)
+            if len(batch) < batch_rows:
+                break
+        return rows
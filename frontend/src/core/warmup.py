@@ -0,0 +1,154 @@
+import os
+import time
+import tempfile
+import threading
+from typing import Any, Dict, List, Tuple
+
+# --- Numba Kernel Warm-up ---
+# 새 컨테이너에서 첫 분석이 numba JIT 컴파일(5~10초)을 떠안지 않도록,
+# 앱 시작 시 백그라운드 스레드에서 지원 dtype별 시그니처를 미리 컴파일(또는 캐시 로드)합니다.
+# 시그니처는 실제 호출부(analysis / extraction)가 넘기는 인자 타입과 정확히 일치해야 재사용됩니다.
+#
+# 주의: configure_numba_cache()는 src.core.magi가 import되기 전에 호출해야 하므로
+# 이 모듈은 최상위에서 magi/numba를 import하지 않습니다.
+
+# 커널이 직접 읽는 원본 PCM dtype (데시메이션 출력은 float32)
+SUPPORTED_SAMPLE_DTYPES = ("float32", "int16", "int32", "uint8", "float64")
+
+_CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+FALLBACK_CACHE_DIR = os.path.join(tempfile.gettempdir(), "soundlab-numba-cache")
+
+def _is_writable_dir(path: str) -> bool:
+    try:
+        os.makedirs(path, exist_ok=True)
+        with tempfile.TemporaryFile(dir=path):
+            pass
+        return True
+    except OSError:
+        return False
+
+def configure_numba_cache() -> str:
+    """
+    numba cache=True가 쓸 수 있는 디렉터리를 보장합니다.
+    NUMBA_CACHE_DIR이 지정되어 있으면 그대로 사용하고, 소스 옆 __pycache__에 쓸 수 없으면
+    임시 디렉터리로 대체합니다. magi 모듈 import 전에 호출해야 적용됩니다.
+
+    Returns:
+        str: 실제 사용되는 캐시 디렉터리.
+    """
+    import numba
+
+    if numba.config.CACHE_DIR:
+        os.makedirs(numba.config.CACHE_DIR, exist_ok=True)
+        return numba.config.CACHE_DIR
+
+    in_tree = os.path.join(_CORE_DIR, "__pycache__")
+    if _is_writable_dir(in_tree):
+        return in_tree
+
+    numba.config.CACHE_DIR = FALLBACK_CACHE_DIR
+    os.makedirs(FALLBACK_CACHE_DIR, exist_ok=True)
+    return FALLBACK_CACHE_DIR
+
+def kernel_signatures() -> List[Tuple[str, Any, Tuple]]:
+    """
+    미리 컴파일할 (커널 이름, dispatcher, 인자 타입) 목록을 반환합니다.
+    자주 쓰이는 경로(데시메이션된 float32 모노)가 먼저 오도록 정렬되어 있습니다.
+    """
+    from numba import types
+    from src.core import magi
+
+    i64, f64 = types.int64, types.float64
+    table = types.Array(f64, 2, 'C')
+    freqs = types.Array(f64, 1, 'C')
+
+    sigs = [("band_scan_freqs", magi.band_scan_freqs, (table,))]
+    for name in SUPPORTED_SAMPLE_DTYPES:
+        dtype = getattr(types, name)
+        for ndim in (1, 2):
+            samples = types.Array(dtype, ndim, 'C')
+            sigs.append(("sliding_band_magnitudes", magi.sliding_band_magnitudes, (samples, i64, i64, i64, freqs, i64, f64, i64)))
+            sigs.append(("calculate_chunk_energies", magi.calculate_chunk_energies, (samples, i64, i64, table, i64, f64)))
+            sigs.append(("calculate_chunk_energies_parallel", magi.calculate_chunk_energies_parallel, (samples, i64, i64, table, i64, f64)))
+            sigs.append(("calculate_band_energies", magi.calculate_band_energies, (samples, i64, table, i64, f64)))
+
+    # 레거시 단일 대역 커널 (float 모노 입력)
+    for name in ("float64", "float32"):
+        samples = types.Array(getattr(types, name), 1, 'C')
+        sigs.append(("robust_goertzel_magi", magi.robust_goertzel_magi, (samples, i64, f64, f64)))
+        sigs.append(("calculate_band_energy", magi.calculate_band_energy, (samples, i64, f64, f64, f64)))
+    return sigs
+
+def _format_signature(argtypes: Tuple) -> str:
+    return "(" + ", ".join(str(t) for t in argtypes) + ")"
+
+class KernelWarmup:
+    """
+    커널 시그니처를 순서대로 컴파일하고 시그니처별 소요 시간과 캐시 적중 여부를 기록합니다.
+    start()로 백그라운드 스레드에서 실행하거나 run()으로 동기 실행합니다.
+    """
+
+    def __init__(self):
+        self.cache_dir = ""
+        self.records: List[Dict[str, Any]] = []
+        self.total_sec = 0.0
+        self.error = None
+        self.done = threading.Event()
+        self._thread = None
+
+    def _compile_one(self, name: str, dispatcher, argtypes: Tuple) -> Dict[str, Any]:
+        hits_before = dispatcher.stats.cache_hits[argtypes]
+        misses_before = dispatcher.stats.cache_misses[argtypes]
+        already = argtypes in dispatcher.overloads
+
+        start = time.perf_counter()
+        dispatcher.compile(argtypes)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if already:
+            cache = "loaded"
+        elif dispatcher.stats.cache_hits[argtypes] > hits_before:
+            cache = "hit"
+        elif dispatcher.stats.cache_misses[argtypes] > misses_before:
+            cache = "miss"
+        else:
+            cache = "off"
+        return {"kernel": name, "signature": _format_signature(argtypes), "compile_ms": elapsed_ms, "cache": cache}
+
+    def run(self) -> "KernelWarmup":
+        start = time.perf_counter()
+        try:
+            self.cache_dir = configure_numba_cache()
+            for name, dispatcher, argtypes in kernel_signatures():
+                self.records.append(self._compile_one(name, dispatcher, argtypes))
+        except Exception as e:  # 워밍업 실패는 분석을 막지 않음 (호출 시 지연 컴파일로 대체)
+            self.error = str(e)
+        finally:
+            self.total_sec = time.perf_counter() - start
+            self.done.set()
+        return self
+
+    def start(self) -> "KernelWarmup":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="numba-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        커널별로 합산한 리포트를 반환합니다 (UI 표시용).
+        """
+        per_kernel: Dict[str, Dict[str, Any]] = {}
+        for rec in list(self.records):
+            row = per_kernel.setdefault(rec["kernel"], {"kernel": rec["kernel"], "signatures": 0, "compile_ms": 0.0, "hit": 0, "miss": 0})
+            row["signatures"] += 1
+            row["compile_ms"] += rec["compile_ms"]
+            if rec["cache"] in ("hit", "miss"):
+                row[rec["cache"]] += 1
+        return {
+            "done": self.done.is_set(),
+            "total_sec": self.total_sec,
+            "cache_dir": self.cache_dir,
+            "error": self.error,
+            "kernels": list(per_kernel.values()),
+        }
@@ -0,0 +1,87 @@
+import numpy as np
+from functools import lru_cache
+from typing import Tuple
+
+# --- Matrix-batched Zoom-DFT Engine ---
+# 녹음 전체를 (num_chunks, chunk_len) 행렬로 보고, 스캔 주파수에 대한
+# DFT 기저(basis)와의 행렬곱 한 번으로 모든 청크의 크기(magnitude)를 구합니다.
+# 청크별 Python 루프와 반복적인 삼각함수 계산이 사라지고, 행렬곱은 NumPy의 BLAS가
+# 멀티코어로 처리합니다.
+
+# 블록당 최대 샘플 수 (float64 임시 행렬 기준 약 64MB)
+BLOCK_SAMPLES = 2 ** 23
+
+@lru_cache(maxsize=16)
+def _cached_basis(sample_rate: int, chunk_len: int, stride: int, freqs: Tuple[float, ...]) -> np.ndarray:
+    n_taps = len(range(0, chunk_len, stride))
+    positions = np.arange(n_taps, dtype=np.float64) * stride
+    omegas = (2 * np.pi * np.asarray(freqs)) / sample_rate
+    angles = np.outer(positions, omegas)
+
+    # 실수 신호이므로 복소 기저 대신 [cos | sin] 실수 행렬 하나로 실수부/허수부를 함께 계산
+    basis = np.hstack([np.cos(angles), np.sin(angles)])
+    basis.setflags(write=False)
+    return basis
+
+def get_zoom_basis(sample_rate: int, chunk_len: int, freqs: np.ndarray, stride: int = 8) -> np.ndarray:
+    """
+    스캔 주파수에 대한 DFT 기저 행렬을 반환합니다 (동일 파라미터는 캐시 재사용).
+
+    Returns:
+        np.ndarray: (ceil(chunk_len / stride), 2 * num_freqs) 크기의 [cos | sin] 행렬.
+    """
+    return _cached_basis(int(sample_rate), int(chunk_len), int(stride), tuple(float(f) for f in freqs))
+
+def chunk_magnitude_matrix(signal: np.ndarray, sample_rate: int, chunk_len: int, freqs: np.ndarray, stride: int = 8, offset: float = 0.0) -> np.ndarray:
+    """
+    신호를 복사 없이 (num_chunks, chunk_len) 뷰로 재구성하고,
+    캐시된 기저와의 행렬곱으로 모든 청크 x 주파수의 크기를 계산합니다.
+    정규화는 calculate_band_energy와 동일합니다.
+
+    signal은 원본 dtype의 1D 또는 (n, channels) 배열이며, 다운믹스와 offset 보정은
+    블록 단위로만 수행합니다. PCM 정규화 배율은 호출 측에서 결과에 곱합니다.
+
+    Returns:
+        np.ndarray: (num_chunks, num_freqs) 크기 행렬.
+    """
+    num_chunks = len(signal) // chunk_len
+    n_freqs = len(freqs)
+    mags = np.empty((num_chunks, n_freqs), dtype=np.float64)
+    if num_chunks == 0 or n_freqs == 0:
+        return mags
+
+    basis = get_zoom_basis(sample_rate, chunk_len, freqs, stride)
+    frames = signal[:num_chunks * chunk_len].reshape((num_chunks, chunk_len) + signal.shape[1:])[:, ::stride]
+    norm = chunk_len / stride / 2
+
+    # 메모리 상한을 위해 청크 묶음 단위로 행렬곱 (stride 뷰 -> 연속 float64 블록)
+    block_chunks = max(1, BLOCK_SAMPLES // frames.shape[1])
+    for start in range(0, num_chunks, block_chunks):
+        end = min(start + block_chunks, num_chunks)
+        if frames.ndim == 3:
+            block = frames[start:end].mean(axis=2, dtype=np.float64)
+        else:
+            block = np.ascontiguousarray(frames[start:end], dtype=np.float64)
+        if offset:
+            block -= offset
+        proj = block @ basis
+        real = proj[:, :n_freqs]
+        imag = proj[:, n_freqs:]
+        mags[start:end] = np.sqrt(real * real + imag * imag) / norm
+
+    return mags
+
+def band_energies_from_matrix(mags: np.ndarray, band_of: np.ndarray, n_bands: int) -> np.ndarray:
+    """
+    (num_chunks, num_freqs) 크기 행렬에서 대역별 에너지(스캔 주파수 크기의 합)를 구합니다.
+
+    Args:
+        band_of: band_scan_freqs가 반환한 주파수별 대역 인덱스.
+
+    Returns:
+        np.ndarray: (num_chunks, n_bands) 크기 행렬.
+    """
+    energies = np.zeros((mags.shape[0], n_bands), dtype=np.float64)
+    for b in range(n_bands):
+        energies[:, b] = mags[:, band_of == b].sum(axis=1)
+    return energies
@@ -4,6 +4,10 @@ import os
 # Add project root to sys.path to allow 'src' imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# numba 캐시 디렉터리는 커널 모듈(src.core.magi) import 전에 결정되어야 함
+from src.core.warmup import configure_numba_cache
+configure_numba_cache()
+
 from src.ui.layout import render_app
 
 if __name__ == "__main__":
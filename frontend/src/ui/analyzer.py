@@ -1,12 +1,16 @@
+import time
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
-from src.core.analysis import calculate_spectral_stats
+from src.core.analysis import calculate_spectral_stats, calculate_zoom_spectrum, find_spectral_peaks
+from src.core.spool import spool_upload
 
 @st.dialog("🔍 주파수 스펙트럼 분석 (Frequency Explorer)", width="large")
-def show_spectral_analysis_dialog(uploaded_file):
+def show_spectral_analysis_dialog(uploaded_file, prefetch_targets=None, bandwidth=0.0, hop_sec=None):
     """
     Dialog content for spectral analysis.
+    With prefetch_targets, the same file read also extracts (and caches) the band energies
+    for those targets, so starting the analysis afterwards does not read the audio again.
     """
     st.markdown("""
     **전체 오디오 파일의 주파수 대역을 분석합니다.**
@@ -17,9 +21,14 @@ def show_spectral_analysis_dialog(uploaded_file):
     if hasattr(uploaded_file, 'seek'):
         uploaded_file.seek(0)
         
-    # Analysis
+    # Analysis (interim peaks are shown while the file is still being read)
+    progress_slot = st.empty()
     with st.spinner("스펙트럼 분석 중... (Calculating PSD)"):
-        freqs, psd, top_peaks = calculate_spectral_stats(uploaded_file)
+        freqs, psd, top_peaks = calculate_spectral_stats(
+            spool_upload(uploaded_file), prefetch_targets=tuple(prefetch_targets) if prefetch_targets else None, bandwidth=bandwidth, hop_sec=hop_sec,
+            on_progress=make_spectrum_progress(progress_slot)
+        )
+    progress_slot.empty()
     
     if len(freqs) > 0:
         # 1. Plot Spectrum (Large View)
@@ -77,9 +86,93 @@ def show_spectral_analysis_dialog(uploaded_file):
                     st.session_state["target_freq_input"] = float(f"{freq:.1f}")
                     st.toast(f"✅ 타겟 주파수가 {freq:.1f}Hz로 설정되었습니다! 재분석을 시작합니다.", icon="🔄")
                     st.rerun() # Closes the dialog and reruns the app
+        
+        # 3. High-resolution zoom around a selected band
+        render_zoom_spectrum(uploaded_file, top_peaks[0]['freq'] if top_peaks else 60.0)
     else:
         st.error("분석 데이터를 추출할 수 없습니다.")
 
+def make_spectrum_progress(slot, interval_sec: float = 0.5):
+    """
+    Returns a progress callback that shows the read progress and the current top peaks
+    of the running PSD in the given placeholder (throttled to one update per interval).
+    """
+    last_update = [0.0]
+
+    def on_progress(fraction, freqs, psd):
+        now = time.monotonic()
+        if now - last_update[0] < interval_sec and fraction < 1.0:
+            return
+        last_update[0] = now
+        peaks = find_spectral_peaks(freqs, psd, freqs[1] - freqs[0] if len(freqs) > 1 else 1.0, top_n=5)
+        with slot.container():
+            st.progress(fraction, text=f"파일 읽는 중... {fraction * 100:.0f}%")
+            if peaks:
+                st.caption("현재까지의 상위 피크: " + ", ".join(f"{p['freq']:.1f} Hz" for p in peaks))
+
+    return on_progress
+
+def render_zoom_spectrum(uploaded_file, center_freq: float):
+    """
+    Zoom spectrum (chirp-z) section: computes only the selected band at high resolution.
+    """
+    with st.expander("🔬 정밀 줌 스펙트럼 (Zoom Spectrum)", expanded=False):
+        st.caption("선택한 대역만 고해상도로 계산합니다. 59.8Hz vs 60.1Hz 같은 미세한 주파수 드리프트를 확인할 수 있습니다.")
+        c1, c2, c3 = st.columns(3)
+        default_lo = max(0.0, float(round(center_freq)) - 10.0)
+        f_start = c1.number_input("시작 주파수 (Hz)", min_value=0.0, value=default_lo, step=1.0, key="zoom_f_start")
+        f_stop = c2.number_input("종료 주파수 (Hz)", min_value=0.1, value=default_lo + 20.0, step=1.0, key="zoom_f_stop")
+        resolution = c3.selectbox("해상도 (Hz)", [0.1, 0.05, 0.01], index=2, key="zoom_resolution")
+        
+        if f_stop <= f_start:
+            st.warning("종료 주파수는 시작 주파수보다 커야 합니다.")
+            return
+        
+        if st.button("🔬 줌 분석 실행", key="zoom_run", use_container_width=True):
+            st.session_state["zoom_request"] = (f_start, f_stop, resolution)
+        
+        if st.session_state.get("zoom_request") != (f_start, f_stop, resolution):
+            return
+        
+        if hasattr(uploaded_file, 'seek'):
+            uploaded_file.seek(0)
+        freqs, psd, zoom_peaks, actual_res = calculate_zoom_spectrum(spool_upload(uploaded_file), f_start, f_stop, resolution)
+        if len(freqs) == 0:
+            st.error("분석 데이터를 추출할 수 없습니다.")
+            return
+        
+        psd_db = 10 * np.log10(psd + 1e-12)
+        fig = go.Figure()
+        fig.add_trace(go.Scattergl(x=freqs, y=psd_db, mode='lines', name='Zoom PSD (dB/Hz)', line=dict(color='#00CC96', width=1.5)))
+        fig.add_trace(go.Scatter(
+            x=[p['freq'] for p in zoom_peaks],
+            y=[10 * np.log10(p['power'] + 1e-12) for p in zoom_peaks],
+            mode='markers', name='Peaks',
+            marker=dict(color='#FF4B4B', size=10, symbol='x')
+        ))
+        fig.update_layout(
+            title=f"Zoom PSD {f_start:.1f}~{f_stop:.1f} Hz (해상도 {actual_res:.3f} Hz)",
+            xaxis_title="Frequency (Hz)",
+            yaxis_title="Power (dB/Hz)",
+            template="plotly_dark",
+            height=400,
+            hovermode="x unified"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if actual_res > resolution * 1.01:
+            st.info(f"파일 길이가 짧아 실제 해상도는 {actual_res:.3f} Hz 입니다.")
+        
+        if zoom_peaks:
+            cols = st.columns(len(zoom_peaks))
+            for i, peak in enumerate(zoom_peaks):
+                with cols[i]:
+                    st.metric(f"Peak #{i+1}", f"{peak['freq']:.2f} Hz")
+                    if st.button("적용하기", key=f"apply_zoom_peak_{i}"):
+                        st.session_state["target_freq_input"] = float(f"{peak['freq']:.2f}")
+                        st.toast(f"✅ 타겟 주파수가 {peak['freq']:.2f}Hz로 설정되었습니다!", icon="🔄")
+                        st.rerun()
+
 def render_frequency_explorer(uploaded_file):
     """
     Renders the trigger button in the sidebar.
@@ -2,27 +2,44 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import src.core.services as services
-from src.ui.plots import plot_analysis_results
+from src.ui.plots import plot_analysis_results, plot_sensitivity_curve, plot_peak_drift
 from src.ui.components import render_metrics
 from src.ui.timeline import render_timeline_section
 from src.ui.analyzer import show_spectral_analysis_dialog
 from src.config import DEFAULT_BANDWIDTH
 
-def render_file_tab(uploaded_file, target_freq, otsu_multiplier, smart_mode):
+def render_file_tab(uploaded_file, target_freq, otsu_multiplier, smart_mode, hop_sec=None, decision_params=None, use_freq_grid=False, extra_targets=None):
     """
     Renders the File Upload analysis tab.
     """
     if uploaded_file:
+        extra_targets = [f for f in (extra_targets or []) if f != target_freq]
+        
         # Auto-open Modal if flag is set
         if st.session_state.get("show_auto_modal", False):
             st.session_state["show_auto_modal"] = False
-            show_spectral_analysis_dialog(uploaded_file)
+            # One read feeds both the spectrum and the band extraction for the current targets
+            # (grid mode extracts from its own frequency grid instead)
+            prefetch_targets = None if use_freq_grid else [target_freq] + extra_targets
+            show_spectral_analysis_dialog(uploaded_file, prefetch_targets, DEFAULT_BANDWIDTH, hop_sec)
             
         if st.session_state.get("analysis_triggered", False):
+            extra_results = []
             with st.spinner("🔄 신호 분석 및 데이터 처리 중..."):
-                timestamps, magnitudes, heavy_proc_time, analysis_info = services.perform_heavy_analysis(
-                    uploaded_file, target_freq, DEFAULT_BANDWIDTH, smart_mode
-                )
+                if extra_targets:
+                    # All target bands come out of the same read; the main view shows the primary target
+                    timestamps, per_target, heavy_proc_time = services.perform_multi_target_analysis(
+                        uploaded_file, [target_freq] + extra_targets, DEFAULT_BANDWIDTH, smart_mode, hop_sec, decision_params, use_freq_grid
+                    )
+                    (magnitudes, analysis_info), extra_results = per_target[0], per_target[1:]
+                else:
+                    timestamps, magnitudes, heavy_proc_time, analysis_info = services.perform_heavy_analysis(
+                        uploaded_file, target_freq, DEFAULT_BANDWIDTH, smart_mode, hop_sec, decision_params, use_freq_grid
+                    )
+            if analysis_info.get("from_freq_grid"):
+                st.caption(f"🗂️ 주파수 그리드에서 계산됨 (타겟 {analysis_info['grid_target_freq']:.1f} Hz, 0.5Hz 격자 정렬)")
+            elif use_freq_grid:
+                st.caption("🗂️ 타겟이 그리드 범위 밖이거나 그리드가 크기 상한을 넘어 대역을 직접 추출했습니다 (Hop을 늘리면 그리드 사용 가능)")
                 
             if smart_mode:
                 with st.expander("📊 스마트 분석 결과 요약", expanded=True):
@@ -45,6 +62,13 @@ def render_file_tab(uploaded_file, target_freq, otsu_multiplier, smart_mode):
                 
                 render_timeline_section(analysis_info)
             
+            if extra_results:
+                st.subheader("🎯 추가 타겟별 타임라인 (Per-Target Timelines)")
+                tabs = st.tabs([f"{info['target_freq']:g} Hz" for _, info in extra_results])
+                for tab, (_, info) in zip(tabs, extra_results):
+                    with tab:
+                        render_timeline_section(info)
+            
             v5_results = analysis_info.get("v5_results")
             anomalies_mask, final_thresh, anomaly_list = services.perform_light_analysis(
                 timestamps, magnitudes, otsu_multiplier, None, v5_results
@@ -53,6 +77,15 @@ def render_file_tab(uploaded_file, target_freq, otsu_multiplier, smart_mode):
             metrics_data = services.get_dashboard_metrics(heavy_proc_time, len(anomaly_list))
             render_metrics(metrics_data)
             
+            with st.expander("🎚️ 민감도별 이상징후 수 (Sensitivity Curve)", expanded=False):
+                multipliers, _, counts = services.get_sensitivity_curve(magnitudes, v5_results)
+                st.plotly_chart(plot_sensitivity_curve(multipliers, counts, otsu_multiplier), use_container_width=True)
+            
+            if analysis_info.get("peak_freqs") is not None:
+                with st.expander("〰️ 대역별 피크 주파수 추적 (Frequency Drift)", expanded=False):
+                    labels = [f"ID {analysis_info['target_freq']:g}Hz", "60Hz", "120Hz", "180Hz"]
+                    st.plotly_chart(plot_peak_drift(timestamps, analysis_info["peak_freqs"], labels), use_container_width=True)
+            
             plot_placeholder = st.empty()
             st.subheader("🎧 오디오 재생 및 구간 확인")
             st.audio(uploaded_file)
@@ -3,6 +3,8 @@ from src.ui.styles import inject_custom_css
 from src.ui.sidebar import render_sidebar
 from src.ui.live_tab import render_live_tab
 from src.ui.file_tab import render_file_tab
+from src.core.services import start_kernel_warmup
+from src.config import WARMUP_KERNELS_ON_STARTUP
 
 def render_app():
     """
@@ -12,9 +14,11 @@ def render_app():
     # 1. Setup & Style Injection
     st.set_page_config(page_title="SignalCraft Lab", layout="wide", page_icon="📡")
     inject_custom_css()
+    if WARMUP_KERNELS_ON_STARTUP:
+        start_kernel_warmup() # 첫 분석 전에 JIT 컴파일을 백그라운드에서 끝내둠
     
     # 2. Sidebar Controls
-    is_live_mode, uploaded_file, target_freq, otsu_multiplier, smart_mode = render_sidebar()
+    is_live_mode, uploaded_file, target_freq, otsu_multiplier, smart_mode, hop_sec, decision_params, use_freq_grid, extra_targets = render_sidebar()
 
     # 3. Main Content Rendering (Delegated to Tab Components)
     if is_live_mode:
@@ -22,4 +26,4 @@ def render_app():
         render_live_tab(otsu_multiplier)
     else:
         st.subheader("📁 파일 분석 (File Analysis)")
-        render_file_tab(uploaded_file, target_freq, otsu_multiplier, smart_mode)
+        render_file_tab(uploaded_file, target_freq, otsu_multiplier, smart_mode, hop_sec, decision_params, use_freq_grid, extra_targets)
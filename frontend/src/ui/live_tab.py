@@ -1,11 +1,45 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import time
-from datetime import datetime, timedelta
-from src.core.supabase_client import fetch_latest_logs, fetch_logs_by_range
-from src.core.stream_processor import StreamProcessor
+from datetime import datetime, timedelta, timezone
+from src.core.supabase_client import iter_logs_by_range, LogCursor
+from src.core.stream_processor import StreamProcessor, logs_to_batch
+from src.core.log_store import to_epoch
+import src.core.services as services
 from src.ui.plots import plot_live_trend
-from src.config import COLOR_PRIMARY, COLOR_ACCENT_CYAN, COLOR_ANOMALY_RED
+from src.config import COLOR_PRIMARY, COLOR_ACCENT_CYAN, COLOR_ANOMALY_RED, LIVE_POLL_INTERVAL_SEC, LIVE_HISTORY_MAX_POINTS, LOG_STORE_ENABLED
+
+def as_utc(dt):
+    """Treats a naive datetime as UTC and converts an aware one to UTC."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+def ingest_batch(processor, features, times, sensitivity):
+    """
+    Runs an (N, 82) feature matrix through the processor in one batch and appends it to the live history.
+    Returns (mag, threshold, state, score, time_label) of the newest row, or None if there are no rows.
+    """
+    if len(features) == 0:
+        return None
+    # Same results as one process_features call per row
+    times, mags, _, states, thresholds, scores = processor.process_batch(features, times, sensitivity=sensitivity)
+    ts_index = pd.DatetimeIndex(times)
+    older = ts_index.normalize() < pd.Timestamp.now(tz="UTC").tz_localize(None).normalize()  # times are naive UTC
+    t_labels = np.where(older, ts_index.strftime("%m/%d %H:%M:%S"), ts_index.strftime("%H:%M:%S"))
+    
+    st.session_state["live_history_mag_60"].extend(mags.tolist())
+    st.session_state["live_history_time"].extend(t_labels.tolist())
+    st.session_state["live_history_state"].extend(states.tolist())
+    st.session_state["live_last_threshold"] = float(thresholds[-1])
+    return float(mags[-1]), float(thresholds[-1]), str(states[-1]), float(scores[-1]), str(t_labels[-1])
+
+def ingest_logs(processor, logs, sensitivity):
+    """
+    ingest_batch for sound_logs rows (oldest first).
+    """
+    if not logs:
+        return None
+    return ingest_batch(processor, *logs_to_batch(logs), sensitivity)
 
 def render_live_tab(otsu_multiplier):
     """
@@ -67,9 +101,9 @@ def render_live_tab(otsu_multiplier):
     if interval_mode == "📅 지정 기간 (Custom)":
         c1, c2 = st.columns(2)
         with c1:
-            custom_start = st.text_input("시작 시간 (YYYY-MM-DD HH:MM:SS)", value=(datetime.now() - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"))
+            custom_start = st.text_input("시작 시간 (UTC, YYYY-MM-DD HH:MM:SS)", value=(datetime.now(timezone.utc) - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"))
         with c2:
-            custom_end = st.text_input("종료 시간 (YYYY-MM-DD HH:MM:SS)", value=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            custom_end = st.text_input("종료 시간 (UTC, YYYY-MM-DD HH:MM:SS)", value=datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
 
     if st.toggle("🔴 모니터링 시작 (Start Stream)", value=False):
         current_mode_id = f"{interval_mode}_{custom_start}_{custom_end}"
@@ -80,33 +114,43 @@ def render_live_tab(otsu_multiplier):
             st.session_state["live_mode_id"] = current_mode_id
             
             with st.spinner("⏳ 초기 데이터 로딩 중 (Fetching History)..."):
-                initial_logs = []
+                start_time = None
+                end_iso = None
                 if interval_mode == "🕒 최근 30분 (Recent 30m)":
-                     start_time = datetime.utcnow() - timedelta(minutes=30)
-                     initial_logs = fetch_logs_by_range(start_time.isoformat())
+                     start_time = datetime.now(timezone.utc) - timedelta(minutes=30)
                 elif interval_mode == "📅 최근 24시간 (Recent 24h)":
-                     start_time = datetime.utcnow() - timedelta(hours=24)
-                     initial_logs = fetch_logs_by_range(start_time.isoformat())
+                     start_time = datetime.now(timezone.utc) - timedelta(hours=24)
                 else:
                     try:
-                        initial_logs = fetch_logs_by_range(
-                            custom_start.replace(" ", "T"), 
-                            custom_end.replace(" ", "T")
-                        )
+                        # Inputs are UTC; an explicit offset (e.g. +09:00) is honoured
+                        end_iso = as_utc(datetime.fromisoformat(custom_end.replace(" ", "T"))).isoformat()
+                        start_time = as_utc(datetime.fromisoformat(custom_start.replace(" ", "T")))
                     except:
                         st.error("날짜 형식이 올바르지 않습니다.")
                 
-                for log in reversed(initial_logs):
-                    feat = log.get('features', [])
-                    raw_ts = log.get('created_at', '')
-                    ts_dt = datetime.fromisoformat(raw_ts.replace('Z', '+00:00'))
-                    t_label = ts_dt.strftime("%m/%d %H:%M:%S") if ts_dt.date() < datetime.utcnow().date() else ts_dt.strftime("%H:%M:%S")
-                    
-                    mag, _, stt, _, thres = processor.process_features(feat, sensitivity=otsu_multiplier)
-                    st.session_state["live_history_mag_60"].append(mag)
-                    st.session_state["live_history_time"].append(t_label)
-                    st.session_state["live_history_state"].append(stt)
-                    st.session_state["live_last_threshold"] = thres
+                cursor = LogCursor(start_time.isoformat() if start_time is not None else None)
+                st.session_state["live_range_start"] = None  # set once the range is completely loaded
+                if start_time is not None:
+                    try:
+                        if LOG_STORE_ENABLED:
+                            # Only the missing part (usually the recent tail) comes from Supabase; the range is read locally
+                            store = services.get_log_store()
+                            store.sync(start_time.isoformat(), end_iso)
+                            features, times, ids, created_at = store.query(start_time.isoformat(), end_iso)
+                            ingest_batch(processor, features, times, otsu_multiplier)
+                            if len(ids):
+                                cursor.advance([{"created_at": created_at[-1], "id": int(ids[-1])}])
+                            st.session_state["live_range_start"] = start_time.isoformat()
+                        else:
+                            # Complete range, processed page by page while later pages are still loading
+                            for page in iter_logs_by_range(start_time.isoformat(), end_iso):
+                                ingest_logs(processor, page, otsu_multiplier)
+                                cursor.advance(page)
+                    except Exception as e:
+                        st.error(f"Failed to filter Supabase data: {e}")
+                
+                # Polling resumes right after the newest loaded row (or the range start)
+                st.session_state["live_cursor"] = cursor
 
                 if st.session_state["live_history_mag_60"]:
                     render_dashboard(
@@ -130,36 +174,35 @@ def render_live_tab(otsu_multiplier):
                      st.warning("해당 기간에 데이터가 없습니다.")
                  break 
             
-            logs = fetch_latest_logs(limit=1)
-            if logs and len(logs) > 0:
-                latest_entry = logs[0]
-                features = latest_entry.get('features', [])
-                raw_ts = latest_entry.get('created_at', '')
-                time_str = raw_ts[11:19] 
-                
-                last_time_label = st.session_state["live_history_time"][-1] if st.session_state["live_history_time"] else ""
-                
-                if time_str not in last_time_label: 
-                    mag, m120, stt, thres, score = processor.process_features(features, sensitivity=otsu_multiplier)
-                    
-                    st.session_state["live_history_mag_60"].append(mag)
-                    st.session_state["live_history_time"].append(time_str)
-                    st.session_state["live_history_state"].append(stt)
-                    st.session_state["live_last_threshold"] = thres 
-                    
-                    if len(st.session_state["live_history_mag_60"]) > 500:
-                        st.session_state["live_history_mag_60"] = st.session_state["live_history_mag_60"][-500:]
-                        st.session_state["live_history_time"] = st.session_state["live_history_time"][-500:]
-                        st.session_state["live_history_state"] = st.session_state["live_history_state"][-500:]
+            # Every row after the last one seen, in order (no gaps when several devices post or the app stalls)
+            try:
+                new_logs = st.session_state["live_cursor"].poll()
+            except Exception as e:
+                st.error(f"Failed to connect to Supabase: {e}")
+                new_logs = []
+            
+            if LOG_STORE_ENABLED and new_logs and st.session_state.get("live_range_start"):
+                # Complete up to the newest row the cursor delivered (a capped catch-up poll stops short of now)
+                store = services.get_log_store()
+                store.insert(new_logs)
+                store.mark_covered(to_epoch(st.session_state["live_range_start"]), store.polled_until(st.session_state["live_cursor"].created_at))
+            
+            latest = ingest_logs(processor, new_logs, otsu_multiplier)
+            if latest is not None:
+                mag, thres, stt, score, time_str = latest
+                if len(st.session_state["live_history_mag_60"]) > LIVE_HISTORY_MAX_POINTS:
+                    st.session_state["live_history_mag_60"] = st.session_state["live_history_mag_60"][-LIVE_HISTORY_MAX_POINTS:]
+                    st.session_state["live_history_time"] = st.session_state["live_history_time"][-LIVE_HISTORY_MAX_POINTS:]
+                    st.session_state["live_history_state"] = st.session_state["live_history_state"][-LIVE_HISTORY_MAX_POINTS:]
 
-                    render_dashboard(mag, thres, stt, score, time_str)
-                    
-                    if stt == "ON":
-                        live_log.error(f"⚠️ [{time_str}] 가동 탐지!")
-                    else:
-                        live_log.success(f"✅ [{time_str}] 대기 중")
+                render_dashboard(mag, thres, stt, score, time_str)
+                
+                if stt == "ON":
+                    live_log.error(f"⚠️ [{time_str}] 가동 탐지!")
+                else:
+                    live_log.success(f"✅ [{time_str}] 대기 중")
             
-            time.sleep(2)
+            time.sleep(LIVE_POLL_INTERVAL_SEC)
     else:
         if "live_history_mag_60" in st.session_state and st.session_state["live_history_mag_60"]:
             st.warning("⏱️ 모니터링이 중지되었습니다. 마지막 데이터가 표시됩니다.")
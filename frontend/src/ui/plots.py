@@ -1,3 +1,4 @@
+import numpy as np
 import plotly.graph_objects as go
 from src.config import COLOR_PRIMARY, COLOR_ANOMALY_RED, COLOR_ACCENT_CYAN
 
@@ -245,3 +246,55 @@ def plot_live_trend(time_labels, magnitudes, threshold, state_history=None):
     )
     
     return fig
+
+def plot_sensitivity_curve(multipliers, counts, current_multiplier):
+    """
+    Anomaly count vs. sensitivity multiplier, with the current slider position marked.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=multipliers,
+        y=counts,
+        mode='lines+markers',
+        name='Anomaly Count',
+        line=dict(color=COLOR_PRIMARY, width=2, shape='hv'),
+        marker=dict(size=4),
+        hovertemplate="민감도 %{x:.1f}<br>이상징후 %{y}건<extra></extra>"
+    ))
+    fig.add_vline(x=current_multiplier, line=dict(color=COLOR_ANOMALY_RED, width=1.5, dash="dash"))
+    fig.update_layout(
+        xaxis_title="민감도 (Otsu 승수)",
+        yaxis_title="이상징후 수",
+        height=220,
+        margin=dict(l=20, r=20, t=20, b=20),
+        plot_bgcolor='rgba(0,0,0,0)',
+        showlegend=False
+    )
+    return fig
+
+def plot_peak_drift(timestamps, peak_freqs, labels):
+    """
+    Per-chunk tracked peak frequency of each band, as deviation from the band median.
+    """
+    colors = [COLOR_PRIMARY, COLOR_ANOMALY_RED, COLOR_ACCENT_CYAN, "#FFD93D"]
+    fig = go.Figure()
+    for b, label in enumerate(labels):
+        median = float(np.median(peak_freqs[:, b])) if len(peak_freqs) else 0.0
+        fig.add_trace(go.Scatter(
+            x=timestamps,
+            y=peak_freqs[:, b] - median,
+            mode='lines',
+            name=f"{label} ({median:.2f} Hz)",
+            line=dict(color=colors[b % len(colors)], width=1.5),
+            hovertemplate=f"{label}<br>%{{customdata:.3f}} Hz<extra></extra>",
+            customdata=peak_freqs[:, b]
+        ))
+    fig.update_layout(
+        xaxis_title="시간 (초)",
+        yaxis_title="피크 주파수 편차 (Hz)",
+        height=260,
+        margin=dict(l=20, r=20, t=20, b=20),
+        plot_bgcolor='rgba(0,0,0,0)',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1, bgcolor='rgba(0,0,0,0)')
+    )
+    return fig
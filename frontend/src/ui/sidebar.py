@@ -1,7 +1,9 @@
 import streamlit as st
 from src.ui.components import render_header
 from src.ui.analyzer import render_frequency_explorer
-from src.config import DEFAULT_TARGET_FREQ, DEFAULT_OTSU_MULTIPLIER
+from src.config import DEFAULT_TARGET_FREQ, DEFAULT_OTSU_MULTIPLIER, SENSITIVITY_RANGE, SENSITIVITY_STEP, DEFAULT_HOP_SEC, WARMUP_KERNELS_ON_STARTUP, FREQ_GRID_RANGE
+from src.core.services import get_kernel_warmup_report
+from src.core.analysis import CONF_ID
 
 def render_sidebar():
     """
@@ -48,13 +50,89 @@ def render_sidebar():
         # Global Settings
         st.subheader("🎛️ 분석 설정 (Analysis Settings)")
         target_freq = st.number_input("타겟 주파수 (Hz)", value=DEFAULT_TARGET_FREQ, step=10.0, key="target_freq_input")
-        otsu_multiplier = st.slider("민감도 (Sensitivity)", 0.5, 3.0, DEFAULT_OTSU_MULTIPLIER, 0.1)
+        otsu_multiplier = st.slider("민감도 (Sensitivity)", SENSITIVITY_RANGE[0], SENSITIVITY_RANGE[1], DEFAULT_OTSU_MULTIPLIER, SENSITIVITY_STEP)
         
         smart_mode = True
+        hop_sec = DEFAULT_HOP_SEC
+        decision_params = {'gap_min': CONF_ID['gap_min'], 'min_dur_min': CONF_ID['min_dur_min']}
+        use_freq_grid = False
+        extra_targets = []
         with st.expander("⚙️ 고급 설정", expanded=False):
             st.caption("대역폭은 내부적으로 최적화된 값(2.0Hz)을 사용합니다.")
             smart_mode = st.toggle("🧠 스마트 분석 모드", value=True)
+            hop_sec = st.select_slider(
+                "⏱️ 시간 해상도 (Hop)",
+                options=[5.0, 2.5, 1.0, 0.5],
+                value=DEFAULT_HOP_SEC,
+                format_func=lambda v: f"{v:g}초",
+                help="5초 분석 윈도우를 얼마 간격으로 이동할지 정합니다. 값이 작을수록 가동 시작/종료 시각을 더 정밀하게 찾습니다 (겹침 분석)."
+            )
+            use_freq_grid = st.toggle(
+                "🗂️ 주파수 그리드 모드",
+                value=False,
+                help=f"파일당 한 번 {FREQ_GRID_RANGE[0]:g}~{FREQ_GRID_RANGE[1]:g}Hz 전체를 0.5Hz 간격으로 계산해 두고, 타겟 주파수를 바꿀 때 오디오를 다시 읽지 않습니다. 타겟은 0.5Hz 격자에 맞춰집니다."
+            )
+            extra_targets = parse_target_list(st.text_input(
+                "🎯 추가 타겟 주파수 (Hz)",
+                value="",
+                placeholder="예: 410, 780",
+                help="여러 기계의 ID 톤을 쉼표로 입력하면 파일을 한 번만 읽어 모든 타겟을 함께 추출하고, 타겟마다 가동 타임라인을 따로 보여줍니다."
+            ))
+            # Decision-only parameters: re-run on cached band energies (no audio re-read)
+            col_gap, col_dur = st.columns(2)
+            decision_params['gap_min'] = col_gap.number_input(
+                "갭 병합 (분)", min_value=0.0, max_value=30.0, value=CONF_ID['gap_min'], step=0.5,
+                help="이 시간 이하로 끊긴 가동(ON) 구간은 하나로 합칩니다."
+            )
+            decision_params['min_dur_min'] = col_dur.number_input(
+                "최소 가동 (분)", min_value=0.0, max_value=30.0, value=CONF_ID['min_dur_min'], step=0.5,
+                help="이보다 짧은 가동(ON) 구간은 노이즈로 보고 제거합니다."
+            )
+            if WARMUP_KERNELS_ON_STARTUP:
+                render_warmup_report()
             
         st.markdown("---")
         
-    return is_live_mode, uploaded_file, target_freq, otsu_multiplier, smart_mode
+    return is_live_mode, uploaded_file, target_freq, otsu_multiplier, smart_mode, hop_sec, decision_params, use_freq_grid, extra_targets
+
+def parse_target_list(text):
+    """
+    Parses a comma/space separated list of frequencies (Hz), ignoring invalid or duplicate entries.
+    """
+    targets = []
+    for token in text.replace(",", " ").split():
+        try:
+            freq = float(token)
+        except ValueError:
+            st.warning(f"주파수로 읽을 수 없는 값을 건너뜁니다: {token}")
+            continue
+        if freq > 0 and freq not in targets:
+            targets.append(freq)
+    return targets
+
+def render_warmup_report():
+    """
+    Shows the numba startup warm-up report (compile time per kernel, cache hit/miss).
+    """
+    report = get_kernel_warmup_report()
+    st.markdown("**⚡ 커널 워밍업 (JIT)**")
+    if report["error"]:
+        st.warning(f"워밍업 실패 (분석 시 지연 컴파일): {report['error']}")
+    elif not report["done"]:
+        n_done = sum(k["signatures"] for k in report["kernels"])
+        st.caption(f"백그라운드 컴파일 중... ({n_done}개 시그니처 완료)")
+    else:
+        st.caption(f"완료: {report['total_sec']:.1f}초 · 캐시 위치 `{report['cache_dir']}`")
+
+    if report["kernels"]:
+        st.dataframe(
+            [{
+                "커널": k["kernel"],
+                "시그니처": k["signatures"],
+                "컴파일(ms)": round(k["compile_ms"], 1),
+                "캐시 hit": k["hit"],
+                "캐시 miss": k["miss"],
+            } for k in report["kernels"]],
+            hide_index=True,
+            use_container_width=True
+        )
@@ -7,44 +7,19 @@ def render_timeline_section(analysis_info: Dict[str, Any]):
     """
     Renders the Machine ON/OFF Timeline based on V5.7 segments.
     """
-    v5_results = analysis_info.get("v5_results", [])
+    v5_results = analysis_info.get("v5_results")
     
     # 1. Start/End Safety Check
-    if not v5_results:
+    if v5_results is None or len(v5_results) == 0:
         return
 
     st.markdown("---")
     st.subheader("📊 신호 감지 타임라인 (Signal Detection Timeline)")
     
-    # 2. Aggregate Segments (Consecutive ON chunks)
-    segments = []
-    current_segment = None
-    
-    # Chunk duration from results if possible, usually 5s
-    # We can infer it from the first two items if available, or assume 5.0
-    # In analysis.py we used CHUNK_DURATION_SEC = 5.0
-    chunk_dur = 5.0 
-    if len(v5_results) > 1:
-        chunk_dur = v5_results[1]['time_sec'] - v5_results[0]['time_sec']
-    
-    for r in v5_results:
-        state = r.get('state', 'OFF')
-        # Time in result is the START of the chunk
-        time_sec = r.get('time_sec', 0.0)
-        
-        if state == 'ON':
-            if current_segment is None:
-                current_segment = {'start': time_sec, 'end': time_sec + chunk_dur}
-            else:
-                # Extend segment
-                current_segment['end'] = time_sec + chunk_dur
-        else:
-            if current_segment is not None:
-                segments.append(current_segment)
-                current_segment = None
-                
-    if current_segment is not None:
-        segments.append(current_segment)
+    # 2. Segments (Consecutive ON chunks) come precomputed in the columnar result
+    # Each segment ends one chunk step after its last ON chunk (5s, or the hop in overlap mode)
+    chunk_dur = v5_results.step_sec
+    segments = [{'start': start, 'end': end} for start, end in v5_results.segment_times().tolist()]
         
     if not segments:
         st.info("⚠️ 유효 신호가 감지되지 않았습니다. (No Valid Signals Detected)")
@@ -56,6 +31,9 @@ def render_timeline_section(analysis_info: Dict[str, Any]):
     
     # Format Helpers
     def fmt_time(s):
+        # Sub-second hop (overlap mode): show tenths of a second
+        if chunk_dur < 1.0:
+            return f"{int(s//60):02d}:{s%60:04.1f}"
         return f"{int(s//60):02d}:{int(s%60):02d}"
     
     def fmt_dur(s):
@@ -1,11 +1,35 @@
 import sys
 import os
+import io
+import time
+import struct
+import pickle
+import tempfile
 import numpy as np
+from scipy.io import wavfile
+from scipy.signal import find_peaks, welch
 
 # Add src to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.magi import robust_goertzel_magi
+from src.core.magi import robust_goertzel_magi, calculate_band_energy, calculate_band_energies, build_band_table, band_scan_freqs
+from src.core.zoom_dft import chunk_magnitude_matrix, band_energies_from_matrix
+from src.core.extraction import extract_chunk_band_energies, extract_sliding_band_energies, stream_band_energies, stream_band_features
+from src.core.multirate import MultistageDecimator, decimate_blocks, choose_decimation_factor
+from src.core.spectrum import zoom_spectrum, WelchAccumulator
+from src.core.audio import read_wav_info, iter_wav_blocks
+from src.core.spool import spool_bytes, cleanup_spool
+from src.core.feature_cache import source_fingerprint, feature_key, load_features, save_features
+from src.core.warmup import KernelWarmup, kernel_signatures
+from src.core.peak_tracking import tracking_freqs
+from src.core.rolling_otsu import RollingOtsu, bin_index
+from src.core.stream_processor import StreamProcessor, logs_to_batch
+from src.core.supabase_client import LogCursor, iter_logs_by_range
+from src.core.analysis import decide_states, detect_anomalies_light, process_signal_heavy, process_multi_target, extract_spectrum_and_bands, extract_multi_band_features, calculate_spectral_stats, find_spectral_peaks, extract_freq_grid, freq_grid_fits
+from src.core.state_machine import ChunkStates
+from src.core.sensitivity import SensitivityIndex
+from skimage.filters import threshold_otsu
+from src.core.freq_grid import grid_frequencies, stream_freq_grid, band_energies_from_grid, snap_bands_to_grid
 
 def test_magi_pure_sine():
     """
@@ -33,5 +57,979 @@ def test_magi_pure_sine():
     
     print("Backend Verification Passed! ✅")
 
+def test_band_energies_match_single_band():
+    """
+    Verifies that the single-pass filterbank matches per-band calculate_band_energy calls.
+    """
+    fs = 44100
+    rng = np.random.default_rng(0)
+    t = np.arange(int(5.0 * fs)) / fs
+    chunk = (np.sin(2 * np.pi * 535.0 * t) + 0.5 * np.sin(2 * np.pi * 60.2 * t) + 0.1 * rng.standard_normal(len(t))).astype(np.float32)
+    
+    bands = build_band_table([(535.0, 10.0), (60.0, 2.0), (120.0, 2.0), (180.0, 2.0, 1.0)])
+    energies = calculate_band_energies(chunk, fs, bands)
+    expected = [calculate_band_energy(chunk, fs, c, bw, step) for c, bw, step in bands]
+    
+    assert np.allclose(energies, expected, rtol=1e-9)
+
+def test_zoom_dft_matrix_matches_per_chunk_kernel():
+    """
+    Verifies that the batched zoom-DFT engine gives the same band energies as the per-chunk kernel.
+    """
+    fs = 8000
+    chunk_len = 4000
+    rng = np.random.default_rng(1)
+    signal = rng.standard_normal(chunk_len * 6 + 123).astype(np.float32)
+    
+    bands = build_band_table([(535.0, 10.0), (60.0, 2.0)])
+    freqs, band_of = band_scan_freqs(bands)
+    mags = chunk_magnitude_matrix(signal, fs, chunk_len, freqs)
+    energies = band_energies_from_matrix(mags, band_of, len(bands))
+    
+    assert mags.shape == (6, len(freqs))
+    for i in range(6):
+        expected = calculate_band_energies(signal[i * chunk_len:(i + 1) * chunk_len], fs, bands)
+        assert np.allclose(energies[i], expected, rtol=1e-9)
+
+def test_parallel_extraction_is_bit_identical():
+    """
+    Verifies that the prange extraction path gives bit-identical results to the serial path.
+    """
+    fs = 8000
+    chunk_len = 4000
+    rng = np.random.default_rng(2)
+    signal = rng.standard_normal(chunk_len * 9).astype(np.float32)
+    bands = build_band_table([(535.0, 10.0), (60.0, 2.0), (120.0, 2.0)])
+    
+    serial = extract_chunk_band_energies(signal, fs, chunk_len, bands, backend="numba", workers=1)
+    parallel = extract_chunk_band_energies(signal, fs, chunk_len, bands, backend="numba", workers=0)
+    blas = extract_chunk_band_energies(signal, fs, chunk_len, bands, backend="blas")
+    
+    assert np.array_equal(serial, parallel)
+    assert np.allclose(serial, blas, rtol=1e-9)
+
+def test_sliding_dft_matches_direct_windows():
+    """
+    Verifies that the recursive sliding-DFT frames equal a full recomputation of every overlapping window.
+    """
+    fs = 8000
+    window_len = 4000
+    hop_len = 400
+    rng = np.random.default_rng(3)
+    signal = rng.standard_normal(window_len * 5).astype(np.float32)
+    bands = build_band_table([(535.0, 10.0), (60.0, 2.0)])
+    
+    sliding = extract_sliding_band_energies(signal, fs, window_len, hop_len, bands)
+    assert sliding.shape[0] == (len(signal) - window_len) // hop_len + 1
+    
+    for k in range(sliding.shape[0]):
+        start = k * hop_len
+        expected = calculate_band_energies(signal[start:start + window_len], fs, bands)
+        assert np.allclose(sliding[k], expected, rtol=1e-8)
+
+def test_decimation_streaming_and_antialias():
+    """
+    Verifies that block-wise decimation equals one-shot decimation (also across
+    WAV reader block boundaries), and that an out-of-band tone no longer aliases
+    into the 535Hz ID band.
+    """
+    fs = 44100
+    rng = np.random.default_rng(4)
+    noise = rng.standard_normal(fs * 2)
+    
+    one_shot = MultistageDecimator(fs, 30, 545.0)
+    expected = np.concatenate([one_shot.process(noise), one_shot.flush()])
+    streamed = MultistageDecimator(fs, 30, 545.0)
+    blocks = [streamed.process(noise[i:i + 4097]) for i in range(0, len(noise), 4097)]
+    assert np.allclose(np.concatenate(blocks + [streamed.flush()]), expected, atol=1e-12)
+    
+    # 4975Hz folds onto 537.5Hz with a bare stride of 8 (5512.5Hz effective rate)
+    t = np.arange(fs * 5) / fs
+    tone = np.sin(2 * np.pi * 4975.0 * t) * 0.5
+    pcm = np.stack([tone, tone], axis=1)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, (pcm * 32767).astype(np.int16))
+    bands = build_band_table([(535.0, 10.0)])
+    aliased = calculate_band_energies(tone.astype(np.float32), fs, bands)[0]
+
+    # Production path: native PCM blocks from the WAV reader -> decimate_blocks (state carried across blocks)
+    factor = choose_decimation_factor(fs, 545.0, fs * 5)
+    n_out = len(tone) // factor
+    decimated = np.concatenate(list(decimate_blocks(iter_wav_blocks(buffer, 40000), fs, factor, 545.0, n_out=n_out)))
+    reference = MultistageDecimator(fs, factor, 545.0)
+    mono = np.concatenate(list(iter_wav_blocks(buffer, len(tone), mono=True)))
+    expected = np.concatenate([reference.process(mono), reference.flush()])[:n_out]
+    assert factor > 1 and decimated.dtype == np.float32 and len(decimated) == n_out
+    assert np.allclose(decimated, expected, atol=1e-6)
+    clean = calculate_band_energies(decimated, fs // factor, bands, 1)[0]
+    assert clean < aliased * 0.01
+
+def test_zoom_spectrum_resolves_close_tones():
+    """
+    Verifies that the chirp-z zoom spectrum separates 59.8Hz and 60.1Hz tones,
+    which Welch at 0.67Hz bins cannot resolve.
+    """
+    fs = 8000
+    t = np.arange(fs * 60) / fs
+    signal = np.sin(2 * np.pi * 59.8 * t) + 0.5 * np.sin(2 * np.pi * 60.1 * t)
+    blocks = (signal[i:i + 10000] for i in range(0, len(signal), 10000))
+    
+    freqs, psd, resolution = zoom_spectrum(blocks, fs, 55.0, 65.0, 0.05, len(signal))
+    
+    assert abs(resolution - 0.05) < 1e-9
+    peaks, _ = find_peaks(psd)
+    top_two = np.sort(freqs[peaks[np.argsort(psd[peaks])[::-1][:2]]])
+    assert np.allclose(top_two, [59.8, 60.1], atol=0.011)
+
+def test_native_pcm_dtypes_are_scaled_in_kernel():
+    """
+    Verifies that int16 stereo, int32 (24-bit style) and uint8 input give the same
+    band energies as a normalized float mono signal, without converting the whole array.
+    """
+    fs = 8000
+    chunk_len = 4000
+    rng = np.random.default_rng(5)
+    t = np.arange(chunk_len * 4) / fs
+    mono = 0.5 * np.sin(2 * np.pi * 60.0 * t) + 0.05 * rng.standard_normal(len(t))
+    bands = build_band_table([(60.0, 2.0), (120.0, 2.0)])
+    
+    stereo_i16 = np.round(np.stack([mono, mono], axis=1) * 32767).astype(np.int16)
+    pcm24_i32 = (np.round(mono * 8388607).astype(np.int32) << 8)
+    pcm_u8 = np.round(mono * 127 + 128).astype(np.uint8)
+    
+    for backend in ("blas", "numba"):
+        expected = extract_chunk_band_energies(mono, fs, chunk_len, bands, backend=backend)
+        for native, tol in ((stereo_i16, 1e-3), (pcm24_i32, 1e-5), (pcm_u8, 5e-2)):
+            energies = extract_chunk_band_energies(native, fs, chunk_len, bands, backend=backend)
+            assert np.allclose(energies, expected, rtol=tol), (backend, native.dtype)
+
+def test_streaming_wav_reader_matches_wavfile():
+    """
+    Verifies that the streaming reader parses PCM/float/extensible headers and
+    that its blocks concatenate to what wavfile.read returns.
+    """
+    rng = np.random.default_rng(3)
+    fs = 8000
+    cases = {
+        "int16 stereo": (rng.integers(-30000, 30000, (fs * 3 + 17, 2))).astype(np.int16),
+        "uint8 mono": rng.integers(0, 255, fs * 2).astype(np.uint8),
+        "float32 mono": rng.standard_normal(fs * 2).astype(np.float32),
+    }
+    for name, data in cases.items():
+        buf = io.BytesIO()
+        wavfile.write(buf, fs, data)
+        info = read_wav_info(buf)
+        assert (info.sample_rate, info.n_frames) == (fs, len(data)), name
+        blocks = list(iter_wav_blocks(buf, 5000))
+        assert all(len(b) == 5000 for b in blocks[:-1]), name
+        assert np.array_equal(np.concatenate(blocks), data), name
+
+    # 24-bit WAVE_FORMAT_EXTENSIBLE with an extra chunk before 'data'
+    samples = rng.integers(-2 ** 23, 2 ** 23, (1001, 2)).astype(np.int32)
+    raw = samples.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    fmt = struct.pack('<HHIIHHHHI', 0xFFFE, 2, fs, fs * 6, 6, 24, 22, 24, 3) + struct.pack('<H', 1) + b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+    body = b'WAVE' + b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'LIST' + struct.pack('<I', 3) + b'abc\0' + b'data' + struct.pack('<I', len(raw)) + raw
+    buf = io.BytesIO(b'RIFF' + struct.pack('<I', len(body)) + body)
+    expected = wavfile.read(buf)[1]
+    assert np.array_equal(expected, samples << 8)
+    assert np.array_equal(np.concatenate(list(iter_wav_blocks(buf, 300))), expected)
+    mono = np.concatenate(list(iter_wav_blocks(buf, 300, mono=True)))
+    assert np.allclose(mono, (samples << 8).mean(axis=1) / 2 ** 31)
+
+def test_streaming_welch_and_band_energies_match_full_signal():
+    """
+    Verifies that block-wise Welch and block-wise band extraction (chunk and
+    sliding mode) match the whole-signal computations.
+    """
+    rng = np.random.default_rng(4)
+    fs = 2000
+    t = np.arange(fs * 47) / fs
+    signal = (np.sin(2 * np.pi * 60 * t) * (t > 12) + 0.3 * rng.standard_normal(len(t))).astype(np.float32)
+    blocks = [signal[i:i + 7777] for i in range(0, len(signal), 7777)]
+
+    acc = WelchAccumulator(fs, 4096)
+    for block in blocks:
+        acc.update(block)
+    freqs, psd = acc.finalize()
+    ref_freqs, ref_psd = welch(signal.astype(np.float64), fs=fs, nperseg=4096)
+    assert np.allclose(freqs, ref_freqs) and np.allclose(psd, ref_psd, rtol=1e-9, atol=0)
+
+    bands = build_band_table([(60.0, 2.0), (120.0, 2.0)])
+    chunk = fs * 5
+    ref = extract_chunk_band_energies(signal, fs, chunk, bands, 8)
+    out = stream_band_energies(iter(blocks), fs, chunk, chunk, bands, 8)
+    assert out.shape == ref.shape and np.allclose(out, ref, rtol=1e-9)
+
+    ref = extract_sliding_band_energies(signal, fs, chunk, 1000, bands, 8)
+    out = stream_band_energies(iter(blocks), fs, chunk, 1000, bands, 8, sliding=True)
+    assert out.shape == ref.shape and np.allclose(out, ref, rtol=1e-7)
+
+    # Heavy analysis reads multi-minute files in blocks of many chunks (one BLAS call / parallel kernel per block)
+    import src.core.extraction as extraction
+    import src.core.feature_cache as feature_cache
+    from src.config import STREAM_BLOCK_MIN_CHUNKS
+    long_signal = (np.sin(2 * np.pi * 535 * np.arange(fs * 360) / fs) + 0.1 * rng.standard_normal(fs * 360)) * 8000
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, long_signal.astype(np.int16))
+    rows_per_call = []
+    extract_chunks = extraction.extract_chunk_band_energies
+    extraction.extract_chunk_band_energies = lambda span, rate, window_len, *args, **kwargs: rows_per_call.append(len(span) // window_len) or extract_chunks(span, rate, window_len, *args, **kwargs)
+    enabled, feature_cache.FEATURE_CACHE_ENABLED = feature_cache.FEATURE_CACHE_ENABLED, False
+    try:
+        energies, _, _ = extract_multi_band_features(buffer, (535.0,), 2.0, None)
+    finally:
+        extraction.extract_chunk_band_energies = extract_chunks
+        feature_cache.FEATURE_CACHE_ENABLED = enabled
+    assert len(energies) == 72 and sum(rows_per_call) == 72
+    assert rows_per_call[0] >= min(72, STREAM_BLOCK_MIN_CHUNKS)
+
+def test_spool_dedupes_and_evicts():
+    """
+    Verifies that identical uploads share one spool file, that the spooled file
+    streams like the buffer, and that cleanup evicts by age and LRU budget.
+    """
+    buf = io.BytesIO()
+    wavfile.write(buf, 8000, (np.random.default_rng(5).standard_normal((8000, 2)) * 1000).astype(np.int16))
+    data = buf.getvalue()
+    with tempfile.TemporaryDirectory() as spool_dir:
+        path = spool_bytes(data, spool_dir)
+        assert spool_bytes(bytes(data), spool_dir) == path
+        assert spool_bytes(buf.getbuffer(), spool_dir) == path  # zero-copy view of the upload buffer
+        assert len(os.listdir(spool_dir)) == 1
+        assert np.array_equal(np.concatenate(list(iter_wav_blocks(path, 3000))), np.concatenate(list(iter_wav_blocks(buf, 3000))))
+
+        other = spool_bytes(data + b"\0", spool_dir)
+        os.utime(path, (time.time() - 7200, time.time() - 7200))
+        assert cleanup_spool(spool_dir, max_total_mb=1024, max_age_hours=1) == 1
+        assert not os.path.exists(path) and os.path.exists(other)
+
+        newest = spool_bytes(data, spool_dir)
+        os.utime(other, (time.time() - 60, time.time() - 60))
+        assert cleanup_spool(spool_dir, max_total_mb=len(data) * 1.5 / 2 ** 20, max_age_hours=1) == 1
+        assert os.listdir(spool_dir) == [os.path.basename(newest)]
+
+def test_feature_cache_roundtrip_and_keys():
+    """
+    Verifies fingerprint stability across path/buffer, parameter-sensitive keys,
+    and that stored features come back memory-mapped.
+    """
+    buf = io.BytesIO()
+    wavfile.write(buf, 8000, np.zeros(8000 * 30, dtype=np.int16))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        path = os.path.join(cache_dir, "rec.wav")
+        with open(path, "wb") as fp:
+            fp.write(buf.getvalue())
+        fp_path = source_fingerprint(path)
+        assert fp_path == source_fingerprint(buf) and buf.tell() == 0
+
+        changed = bytearray(buf.getvalue())
+        changed[44] ^= 1  # first sample lies inside the first sampled block
+        assert source_fingerprint(io.BytesIO(bytes(changed))) != fp_path
+
+        key = feature_key(fp_path, chunk_len=40000, sliding=False)
+        assert key != feature_key(fp_path, chunk_len=40000, sliding=True)
+        assert load_features(key, cache_dir) is None
+
+        energies = np.random.default_rng(6).random((120, 4))
+        save_features(key, energies, cache_dir)
+        cached = load_features(key, cache_dir)
+        assert isinstance(cached, np.memmap) and np.array_equal(cached, energies)
+
+def test_decision_stage_reruns_on_energies_only():
+    """
+    Verifies that the decision stage works from band energies alone and that
+    gap/min-duration overrides change the segmentation.
+    """
+    energies = np.full((120, 4), 1.0)
+    energies[20:40, 0] = 10.0    # 100 s ON
+    energies[50:53, 0] = 10.0    # 15 s blip after a 50 s gap
+    timestamps, magnitudes, info = decide_states(energies, 5.0, smart_mode=False)
+    states = np.array([r['state'] == 'ON' for r in info['v5_results']])
+    assert states[20:53].all() and states.sum() == 33  # gap (<= 2 min) filled
+    assert np.array_equal(timestamps, np.arange(120) * 5.0)
+
+    _, _, info = decide_states(energies, 5.0, smart_mode=False, decision_params={'gap_min': 0.5})
+    states = np.array([r['state'] == 'ON' for r in info['v5_results']])
+    assert states[20:40].all() and not states[50:53].any()  # blip removed as noise
+
+    _, _, info = decide_states(energies, 5.0, smart_mode=False, decision_params={'min_dur_min': 5.0})
+    assert not any(r['state'] == 'ON' for r in info['v5_results'])
+
+def _v57_reference_states(e_id, e60, e120, thr, step_sec, gap_max, min_dur, smart_mode):
+    """Per-chunk V5.7 loops (steps 3-6) used as the reference for the vectorized state machine."""
+    n = len(e_id)
+    tm = [(i * step_sec + (5.0 - step_sec) / 2) / 60.0 for i in range(n)]
+    st_, nt = ['OFF'] * n, [''] * n
+    s60, s120 = np.median(e60) * 2.0, np.median(e120) * 2.0
+    cur = 'OFF'
+    for i in range(n):
+        active = e_id[i] > thr
+        surge = e60[i] > s60 and e120[i] > s120
+        if cur == 'OFF':
+            if active or surge:
+                cur, st_[i], nt[i] = 'ON', 'ON', 'ID_Wide_Start' if active else 'Startup_Surge_Start'
+        elif active:
+            st_[i], nt[i] = 'ON', 'ID_Wide_Sustain'
+        elif e_id[i] < thr * 0.8:
+            cur = 'OFF'
+        else:
+            st_[i], nt[i] = 'ON', 'Hysteresis_Sustain'
+    last = -1
+    for i in range(n):
+        if st_[i] == 'ON':
+            if last != -1 and 0 < tm[i] - tm[last] - step_sec / 60.0 <= gap_max:
+                for k in range(last + 1, i):
+                    st_[k], nt[k] = 'ON', 'Gap_Filled'
+            last = i
+    if smart_mode:
+        guard, lag, seg = int(60 / step_sec), max(1, int(round(5.0 / step_sec))), -1
+        for i in range(n):
+            if st_[i] != 'ON':
+                seg = -1
+                continue
+            if seg == -1:
+                seg = i
+            if i > seg + guard:
+                ratio = e_id[i] / e_id[i - lag] if e_id[i - lag] > 0 else 1.0
+                if ratio < 0.5 and e_id[i] < thr * 0.5:
+                    k = i
+                    while k < n and st_[k] == 'ON':
+                        st_[k], nt[k] = 'OFF', 'Trimmed_DropOff'
+                        k += 1
+                    seg = -1
+    start = -1
+    for i in range(n + 1):
+        if i < n and st_[i] == 'ON':
+            start = i if start == -1 else start
+        elif start != -1:
+            if tm[min(i, n - 1)] - tm[start] < min_dur:
+                for k in range(start, i):
+                    st_[k], nt[k] = 'OFF', 'Noise_Removed'
+            start = -1
+    return st_, nt
+
+def test_vectorized_state_machine_matches_reference_loops():
+    """
+    Verifies that the vectorized V5.7 state machine and post-processing reproduce
+    the per-chunk loops (states and notes) on randomized energies and parameters.
+    """
+    rng = np.random.default_rng(14)
+    for trial in range(40):
+        n = int(rng.integers(1, 400))
+        step_sec = float(rng.choice([5.0, 1.0, 0.5]))
+        # Piecewise on/off levels with noise, drop-offs and sparse surges
+        levels = np.repeat(rng.choice([0.2, 1.0, 3.0, 8.0], size=n // 10 + 1), 10)[:n]
+        energies = np.abs(rng.normal(1.0, 0.4, (n, 4))) * levels[:, None]
+        energies[rng.random(n) < 0.05, 1:3] *= 6.0
+        energies[rng.random(n) < 0.02, 0] = 0.0
+        params = {'gap_min': float(rng.uniform(0.0, 3.0)), 'min_dur_min': float(rng.uniform(0.0, 2.0))}
+        smart_mode = bool(trial % 2)
+
+        _, magnitudes, info = decide_states(energies, step_sec, smart_mode=smart_mode, decision_params=params)
+        states, notes = _v57_reference_states(
+            energies[:, 0], energies[:, 1], energies[:, 2], info['active_threshold'], step_sec,
+            params['gap_min'], params['min_dur_min'], smart_mode
+        )
+        assert [r['state'] for r in info['v5_results']] == states, f"state mismatch in trial {trial}"
+        assert [r['note'] for r in info['v5_results']] == notes, f"note mismatch in trial {trial}"
+        assert np.all((magnitudes == 0) | np.array([s == 'ON' for s in states]))
+
+def test_chunk_states_columnar_roundtrip_and_compat_view():
+    """
+    Verifies the columnar decision result: segment table, legacy dict view,
+    cheap serialization and its size relative to the per-chunk dict list.
+    """
+    energies = np.full((2000, 4), 1.0)
+    energies[100:200, 0] = 10.0
+    energies[1500:1700, 0] = 10.0
+    timestamps, _, info = decide_states(energies, 5.0, smart_mode=False)
+    states = info['v5_results']
+
+    assert isinstance(states, ChunkStates) and len(states) == 2000
+    assert states.segments.tolist() == [[100, 200], [1500, 1700]]
+    assert np.allclose(states.segment_times(), [[500.0, 1000.0], [7500.0, 8500.0]])
+    assert np.array_equal(states.times_sec, timestamps)
+    assert states[150] == {'id': 150, 'time_min': 12.5, 'time_sec': 750.0, 'state': 'ON', 'note': 'ID_Wide_Sustain', 'diag': 'NORMAL'}
+    assert states[-1]['state'] == 'OFF'
+
+    legacy = list(states)
+    restored = ChunkStates.from_bytes(states.to_bytes())
+    assert list(restored) == legacy and list(pickle.loads(pickle.dumps(states))) == legacy
+    assert len(pickle.dumps(states)) * 10 < len(pickle.dumps(legacy))
+
+    magnitudes = np.linspace(0, 100, 2000)
+    mask_columnar, _, _ = detect_anomalies_light(timestamps, magnitudes, 0.5, None, states)
+    mask_legacy, _, _ = detect_anomalies_light(timestamps, magnitudes, 0.5, None, legacy)
+    assert np.array_equal(mask_columnar, mask_legacy) and not mask_columnar[:100].any()
+
+def test_sensitivity_index_matches_direct_thresholding():
+    """
+    Verifies that the sorted sensitivity index reproduces direct Otsu thresholding
+    for every slider multiplier, within ON chunks only.
+    """
+    rng = np.random.default_rng(16)
+    magnitudes = np.abs(rng.normal(20, 15, 3000))
+    magnitudes[rng.random(3000) < 0.3] = 0.0
+    on_mask = magnitudes > 0
+    index = SensitivityIndex(magnitudes, on_mask)
+
+    multipliers = np.arange(0.5, 3.05, 0.1)
+    thresholds, counts = index.curve(multipliers)
+    for m, thr, count in zip(multipliers, thresholds, counts):
+        expected = np.flatnonzero((magnitudes > threshold_otsu(magnitudes) * m) & on_mask)
+        assert np.isclose(thr, threshold_otsu(magnitudes) * m)
+        assert np.array_equal(index.indices_above(thr), expected) and count == len(expected)
+    assert np.all(np.diff(counts) <= 0)
+
+    timestamps = np.arange(3000) * 5.0
+    anomalies, thresh, events = detect_anomalies_light(timestamps, magnitudes, 1.3, None)
+    assert np.array_equal(anomalies, magnitudes > threshold_otsu(magnitudes) * 1.3)
+    assert [e['timestamp'] for e in events] == timestamps[anomalies].tolist()
+    assert SensitivityIndex(np.array([])).otsu_base == 0.0  # empty data fallback
+
+def test_multi_target_matches_single_target_runs():
+    """
+    Verifies that one multi-target pass gives each target the same energies and
+    V5.7 decisions as a separate single-target analysis.
+    """
+    import src.core.feature_cache as feature_cache
+    fs = 8000
+    t = np.arange(fs * 240) / fs
+    signal = 0.05 * np.random.default_rng(17).standard_normal(len(t))
+    signal += np.where(t < 120, 0.5, 0.0) * np.sin(2 * np.pi * 535.0 * t)
+    signal += np.where(t >= 90, 0.5, 0.0) * np.sin(2 * np.pi * 410.0 * t)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, (signal * 20000).astype(np.int16))
+
+    enabled, feature_cache.FEATURE_CACHE_ENABLED = feature_cache.FEATURE_CACHE_ENABLED, False
+    try:
+        params = {'gap_min': 0.5, 'min_dur_min': 0.0}
+        timestamps, per_target = process_multi_target(buffer, [535.0, 410.0], 2.0, smart_mode=False, decision_params=params)
+        assert len(per_target) == 2
+        for target_freq, (magnitudes, info) in zip([535.0, 410.0], per_target):
+            single_ts, single_mag, single_info = process_signal_heavy(buffer, target_freq, 2.0, smart_mode=False, decision_params=params)
+            assert info['target_freq'] == target_freq
+            assert np.array_equal(timestamps, single_ts)
+            # Decimation rate follows the highest band of the pass, so lower targets differ by filter ripple only
+            assert np.allclose(magnitudes, single_mag, rtol=1e-4, atol=1e-3)
+            assert np.array_equal(info['v5_results'].states, single_info['v5_results'].states)
+    finally:
+        feature_cache.FEATURE_CACHE_ENABLED = enabled
+
+    on_535, on_410 = (info['v5_results'].on_mask for _, info in per_target)
+    assert on_535[:20].all() and not on_535[26:].any()
+    assert not on_410[:17].any() and on_410[19:].all()
+
+def test_fused_spectrum_and_band_pass_matches_separate_passes():
+    """
+    Verifies that the single-read fused stage returns the same Welch PSD and
+    band energies as the separate spectrum and extraction passes.
+    """
+    import src.core.feature_cache as feature_cache
+    fs = 8000
+    t = np.arange(fs * 30) / fs
+    signal = np.sin(2 * np.pi * 535.0 * t) + 0.3 * np.sin(2 * np.pi * 60.0 * t) + 0.05 * np.random.default_rng(18).standard_normal(len(t))
+    stereo = (np.stack([signal, 0.5 * signal], axis=1) * 10000).astype(np.int16)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, stereo)
+
+    import src.core.analysis as analysis
+    reads = []
+    iter_blocks = analysis.iter_wav_blocks
+    analysis.iter_wav_blocks = lambda *args: reads.append(args) or iter_blocks(*args)
+    enabled, feature_cache.FEATURE_CACHE_ENABLED = feature_cache.FEATURE_CACHE_ENABLED, False
+    try:
+        ref_freqs, ref_psd, peaks = calculate_spectral_stats(buffer)
+        ref_energies, ref_step, ref_tracks = extract_multi_band_features(buffer, (535.0, 60.0), 2.0, None)
+        freqs, psd, band_energies, step_sec, peak_tracks = extract_spectrum_and_bands(buffer, (535.0, 60.0), 2.0, None)
+
+        # With the disk cache off, the fused read still hands its bands to the extraction stage
+        n_reads = len(reads)
+        _, fused_psd, fused_peaks = calculate_spectral_stats(buffer, prefetch_targets=(535.0, 2000.0), bandwidth=2.0)
+        assert len(reads) == n_reads + 1
+        handed_off = extract_multi_band_features(buffer, (535.0, 2000.0), 2.0, None)
+        assert len(reads) == n_reads + 1 and handed_off[0].shape == (len(ref_energies), 5)
+    finally:
+        feature_cache.FEATURE_CACHE_ENABLED = enabled
+        analysis.iter_wav_blocks = iter_blocks
+
+    assert np.array_equal(freqs, ref_freqs) and np.allclose(psd, ref_psd, rtol=1e-10)
+    assert np.array_equal(band_energies, ref_energies) and step_sec == ref_step
+    assert np.array_equal(peak_tracks, ref_tracks)
+    assert np.allclose(fused_psd, ref_psd, rtol=1e-10) and fused_peaks == peaks
+    assert abs(peaks[0]['freq'] - 535.0) < 1.0
+
+def test_float32_welch_reports_progress_and_interim_spectrum():
+    """
+    Verifies the float32 Welch accumulator against scipy and that interim
+    spectra are available (with progress callbacks) while blocks stream in.
+    """
+    rng = np.random.default_rng(19)
+    fs = 4000
+    t = np.arange(fs * 60) / fs
+    signal = (np.sin(2 * np.pi * 535.0 * t) + 0.2 * rng.standard_normal(len(t))) * 8000
+    acc = WelchAccumulator(fs, 8192, dtype=np.float32)
+    half = len(signal) // 2
+    acc.update(signal[:half])
+    _, interim = acc.finalize()
+    assert np.allclose(interim, welch(signal[:half], fs=fs, nperseg=8192)[1], rtol=1e-4, atol=0)
+    acc.update(signal[half:])
+    freqs, psd = acc.finalize()
+    assert np.allclose(psd, welch(signal, fs=fs, nperseg=8192)[1], rtol=1e-4, atol=0)
+    assert acc._pending.dtype == np.float32 and len(acc._pending) < 8192
+
+    # Long enough for several read blocks (nperseg 65536 x 16 samples each)
+    long_signal = np.tile(signal, 12)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, long_signal.astype(np.int16))
+    updates = []
+    _, final_psd, peaks = calculate_spectral_stats(buffer, 3, on_progress=lambda frac, f, p: updates.append((frac, find_spectral_peaks(f, p, f[1] - f[0], 1))))
+    fractions = [u[0] for u in updates]
+    assert len(updates) > 1 and fractions == sorted(fractions) and fractions[-1] == 1.0
+    assert abs(updates[0][1][0]['freq'] - 535.0) < 1.0 and abs(peaks[0]['freq'] - 535.0) < 1.0
+
+def test_spectrum_progress_placeholder_survives_cache_hit():
+    """
+    Verifies that the Frequency Explorer pattern (progress callback drawing into
+    an outside placeholder) reruns cleanly when the spectrum comes from the cache.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    def app(path):
+        import streamlit as st
+        from src.core.analysis import calculate_spectral_stats
+        from src.ui.analyzer import make_spectrum_progress
+        st.session_state.setdefault("progress_calls", 0)
+        slot = st.empty()
+        draw = make_spectrum_progress(slot, interval_sec=0.0)
+
+        def on_progress(fraction, freqs, psd):
+            st.session_state["progress_calls"] += 1
+            draw(fraction, freqs, psd)
+
+        for prefetch in (None, (535.0,)):
+            _, _, peaks = calculate_spectral_stats(path, 3, prefetch, 2.0, None, on_progress)
+            st.write(f"{peaks[0]['freq']:.0f}")
+        slot.empty()
+
+    fs = 8000
+    t = np.arange(fs * 20) / fs
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rec.wav")
+        wavfile.write(path, fs, (np.sin(2 * np.pi * 535.0 * t) * 8000 + np.random.default_rng(20).standard_normal(len(t)) * 500).astype(np.int16))
+        at = AppTest.from_function(app, args=(path,), default_timeout=60)
+        at.run()
+        assert not at.exception and [m.value for m in at.markdown] == ["535", "535"]
+        first_calls = at.session_state["progress_calls"]
+        at.run()  # both spectra are cache hits now
+        assert not at.exception, at.exception
+        assert [m.value for m in at.markdown] == ["535", "535"] and at.session_state["progress_calls"] == first_calls > 0
+
+def test_peak_tracking_follows_frequency_drift():
+    """
+    Verifies per-chunk peak frequency tracking on a 60 Hz tone that drifts
+    from 59.6 to 60.2 Hz, and that band energies are unchanged by tracking.
+    """
+    import src.core.feature_cache as feature_cache
+    fs = 8000
+    chunk = 5 * fs
+    drift = np.repeat([59.6, 59.6, 59.75, 59.9, 60.05, 60.2, 60.2, 60.2], chunk)
+    phase = 2 * np.pi * np.cumsum(drift) / fs
+    t = np.arange(len(drift)) / fs
+    signal = np.sin(2 * np.pi * 535.13 * t) + 0.4 * np.sin(phase) + 0.01 * np.random.default_rng(20).standard_normal(len(t))
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, (signal * 10000).astype(np.int16))
+
+    enabled, feature_cache.FEATURE_CACHE_ENABLED = feature_cache.FEATURE_CACHE_ENABLED, False
+    try:
+        band_energies, _, peak_tracks = extract_multi_band_features(buffer, (535.13,), 0.0, None)
+        _, per_target = process_multi_target(buffer, [535.13], 0.0, smart_mode=False)
+    finally:
+        feature_cache.FEATURE_CACHE_ENABLED = enabled
+
+    info = per_target[0][1]
+    assert peak_tracks.shape == (2,) + band_energies.shape
+    assert info["peak_freqs"].shape == (8, 4) and info["peak_amps"].shape == (8, 4)
+    assert np.all(np.abs(info["peak_freqs"][:, 0] - 535.13) < 0.02)
+    assert np.all(np.abs(info["peak_freqs"][:, 1] - drift[::chunk]) < 0.03)
+    assert np.allclose(info["peak_amps"][:, 1], 0.4 * 10000 / 32768, rtol=0.05)
+
+    bands = build_band_table([(535.13, 10.0), (60.0, 2.0)])
+    track_freqs, _ = tracking_freqs(bands)
+    blocks = [(signal[i:i + chunk * 3] * 10000).astype(np.int16) for i in range(0, len(signal), chunk * 3)]
+    energies, track_mags = stream_band_features(iter(blocks), fs, chunk, chunk, bands, 8, track_freqs=track_freqs)
+    assert np.array_equal(energies, stream_band_energies(iter(blocks), fs, chunk, chunk, bands, 8))
+    assert track_mags.shape == (8, len(track_freqs))
+
+def test_rolling_otsu_ring_buffer_matches_full_window():
+    """
+    Verifies that the ring buffer histogram equals a fresh histogram of the
+    last N values, that the threshold is the exact Otsu background maximum,
+    and its parity with per-window skimage Otsu on realistic live windows.
+    """
+    def exact_background_max(window):
+        ordered = np.sort(window)
+        n1 = np.arange(1, len(ordered))
+        s1 = np.cumsum(ordered)[:-1]
+        mean1, mean2 = s1 / n1, (ordered.sum() - s1) / (len(ordered) - n1)
+        return ordered[np.argmax(n1 * (len(ordered) - n1) * (mean1 - mean2) ** 2)]
+
+    rng = np.random.default_rng(21)
+    values = np.concatenate([rng.normal(0.02, 0.003, 300), rng.normal(0.4, 0.05, 200), rng.normal(0.02, 0.003, 100)])
+    rolling = RollingOtsu(256)
+    for i, v in enumerate(values):
+        rolling.push(v)
+        window = values[max(0, i - 255):i + 1]
+        if i % 50 == 0 or i == len(values) - 1:
+            assert np.array_equal(rolling.values(), window)
+            assert np.array_equal(rolling.counts, np.bincount(bin_index(rolling.edges, window), minlength=len(rolling.counts)))
+            if np.ptp(window) > 0.1:
+                # Threshold is the largest background value of the exact Otsu split (no bin-edge offset)
+                assert rolling.threshold() == exact_background_max(window)
+                assert abs(rolling.threshold() - threshold_otsu(window)) <= np.ptp(window) / 256
+
+    uniform = RollingOtsu(10)
+    for _ in range(10):
+        uniform.push(0.3)
+    assert uniform.threshold() == 0.3
+
+    # Parity on realistic 30-record live windows (OFF ~0.02, ON ~0.4, lognormal spread) against the
+    # exact Otsu split of the raw values and against the former per-record skimage threshold
+    same_split = same_state = within_bin = total = 0
+    for seed in range(3):
+        rng = np.random.default_rng(100 + seed)
+        on = (np.cumsum(rng.random(2000) < 0.05) % 2).astype(bool)
+        mags = np.where(on, rng.lognormal(np.log(0.4), 0.15, 2000), rng.lognormal(np.log(0.02), 0.3, 2000))
+        _, thresholds = RollingOtsu(30).extend(mags)
+        for i in range(29, len(mags)):
+            window, ours, ref = mags[i - 29:i + 1], thresholds[i], threshold_otsu(mags[i - 29:i + 1])
+            total += 1
+            same_split += np.array_equal(window <= ours, window <= exact_background_max(window))
+            same_state += (mags[i] > 1.5 * ours) == (mags[i] > 1.5 * ref)
+            within_bin += abs(ours - ref) <= np.ptp(window) / 256
+    # Log-bin quantization moves the split by one value in a few percent of windows; skimage's threshold
+    # is a 256-bin center anywhere in an empty gap between classes, so values differ beyond its bin there
+    assert same_split / total >= 0.95
+    assert within_bin / total >= 0.9 and same_state / total >= 0.995
+
+    processor = StreamProcessor(history_size=10000)
+    states = [processor.process_features([0.01 + 0.001 * (i % 3)] * 82)[2] for i in range(20)]
+    mag, mag_120, state, threshold, _ = processor.process_features([0.5] * 41 + [0.1] * 41)
+    assert states[-1] == "OFF" and (mag, mag_120, state) == (0.5, 0.1, "ON") and threshold < 0.5
+    assert len(processor.history_buffer) == 21
+
+def test_stream_batch_matches_per_record_processing():
+    """
+    Verifies that process_batch over an (N, 82) matrix gives exactly the
+    per-record results and leaves the same history behind.
+    """
+    rng = np.random.default_rng(22)
+    n = 3000
+    level = np.where((np.arange(n) // 200) % 2 == 0, 0.02, 0.5)
+    features = rng.random((n, 82)) * level[:, None]
+    features[[7, 1500]] = np.nan  # missing / short records
+    start = np.datetime64("2024-05-01T00:00:00")
+    times = start + np.arange(n) * np.timedelta64(10, "s")
+    logs = [
+        {"created_at": str(t) + "+00:00", "features": [] if np.isnan(row).any() else row.tolist()}
+        for t, row in zip(times[::-1], features[::-1])
+    ]
+
+    sequential = StreamProcessor(history_size=500)
+    sequential.process_features(features[0].tolist())
+    expected = [sequential.process_features([] if np.isnan(row).any() else row.tolist(), sensitivity=1.2) for row in features[1:]]
+
+    batch = StreamProcessor(history_size=500)
+    batch.process_features(features[0].tolist())
+    batch_features, batch_times = logs_to_batch(logs[:-1])
+    out_times, mag_60, mag_120, state, threshold, score = batch.process_batch(batch_features, batch_times, sensitivity=1.2)
+
+    assert np.array_equal(out_times, times[1:])
+    for column, values in zip(zip(*expected), (mag_60, mag_120, state, threshold, score)):
+        assert list(column) == values.tolist()
+    assert np.array_equal(batch.history_buffer, sequential.history_buffer)
+    assert np.array_equal(batch.history.counts, sequential.history.counts)
+    assert batch.process_features(features[5].tolist()) == sequential.process_features(features[5].tolist())
+
+def test_log_cursor_polls_without_gaps():
+    """
+    Verifies that the keyset cursor returns every new row exactly once,
+    including rows sharing a created_at and a backlog after a stall.
+    """
+    table = []
+    calls = []
+
+    def fetch(created_at, row_id, limit):
+        calls.append(limit)
+        after = [r for r in table if created_at is None or (r["created_at"], r["id"]) > (created_at, row_id if row_id is not None else -1)]
+        return sorted(after, key=lambda r: (r["created_at"], r["id"]))[:limit]
+
+    def post(n, second):
+        for _ in range(n):
+            table.append({"id": len(table) + 1, "created_at": f"2024-05-01T10:{second // 60:02d}:{second % 60:02d}+00:00", "features": [0.0] * 82})
+
+    post(3, 0)
+    cursor = LogCursor(fetch=fetch)
+    cursor.advance(list(reversed(table)))  # initial history arrives newest first
+    assert cursor.poll() == [] and (cursor.created_at, cursor.row_id) == (table[-1]["created_at"], 3)
+
+    post(2, 10)  # two devices, same second
+    assert [r["id"] for r in cursor.poll()] == [4, 5]
+
+    post(1200, 20)  # stall: large backlog
+    calls.clear()
+    rows = cursor.poll(batch_rows=500, max_batches=20)
+    assert [r["id"] for r in rows] == list(range(6, 1206)) and calls == [500, 500, 500]
+    post(1, 30)
+    assert [r["id"] for r in cursor.poll(batch_rows=500, max_batches=1)] == [1206]
+
+def _postgrest_stand_in(rows, delay_sec=0.0):
+    """
+    Minimal local HTTP stand-in for the PostgREST sound_logs endpoint (gte/lt/lte, keyset or=, order, limit).
+    Returns (server, stats); stats["max_inflight"] records request concurrency.
+    """
+    import json
+    import re
+    import threading
+    import time
+    from datetime import datetime, timezone
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlparse, parse_qs
+
+    def ts(value):
+        t = datetime.fromisoformat(value.strip('"'))
+        return t if t.tzinfo else t.replace(tzinfo=timezone.utc)
+
+    indexed = [(ts(r["created_at"]), r["id"], r) for r in rows]
+    stats = {"requests": 0, "inflight": 0, "max_inflight": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                stats["requests"] += 1
+                stats["inflight"] += 1
+                stats["max_inflight"] = max(stats["max_inflight"], stats["inflight"])
+            time.sleep(delay_sec)
+            query = parse_qs(urlparse(self.path).query)
+            selected = indexed
+            for cond in query.get("created_at", []):
+                op, value = cond.split(".", 1)
+                bound = ts(value)
+                compare = {"gte": lambda t: t >= bound, "lt": lambda t: t < bound, "lte": lambda t: t <= bound}[op]
+                selected = [r for r in selected if compare(r[0])]
+            if "or" in query:
+                after, after_id = re.fullmatch(r'\(created_at\.gt\.("[^"]+"),and\(created_at\.eq\.\1,id\.gt\.(\d+)\)\)', query["or"][0]).groups()
+                selected = [r for r in selected if r[:2] > (ts(after), int(after_id))]
+            selected = [r[2] for r in sorted(selected, key=lambda r: r[:2])[:int(query.get("limit", ["1000"])[0])]]
+            columns = query["select"][0].split(",")
+            body = json.dumps([{c: r[c] for c in columns} for r in selected]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                stats["inflight"] -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+def test_range_fetch_pages_concurrently_without_row_cap():
+    """
+    Verifies that the sliced keyset range loader returns a complete multi-day
+    range in order (no 1000-row cap, no duplicates) against a local PostgREST stand-in.
+    """
+    from supabase import create_client
+    start = np.datetime64("2024-05-01T00:00:00")
+    rows = [
+        {"id": i + 1, "created_at": str(start + np.timedelta64(20 * (i - i % 2), "s")) + "+00:00", "device_id": "d", "features": [float(i)] * 82}
+        for i in range(8640)  # 2 days, two devices posting in the same second
+    ]
+    server, stats = _postgrest_stand_in(rows, delay_sec=0.002)
+    try:
+        client = create_client(f"http://127.0.0.1:{server.server_address[1]}", "sb_publishable_test")
+        # Naive start (taken as UTC) with an offset-aware end
+        pages = list(iter_logs_by_range("2024-05-01T00:00:00", "2024-05-03T00:00:00+00:00", client=client, page_rows=100, slice_hours=6, workers=4))
+    finally:
+        server.shutdown()
+
+    loaded = [r for page in pages for r in page]
+    assert [r["id"] for r in loaded] == [r["id"] for r in rows]
+    assert set(loaded[0]) == {"id", "created_at", "features"}
+    assert max(len(page) for page in pages) == 100 and stats["max_inflight"] > 1
+
+def test_log_store_syncs_only_missing_ranges():
+    """
+    Verifies that the local store answers range queries locally, fetches
+    only uncovered intervals (e.g. the recent tail) and round-trips features.
+    """
+    import tempfile
+    import time
+    from src.core.log_store import LogStore, to_epoch, to_epochs, to_iso
+
+    now = time.time()
+    rows = []
+    for i, t in enumerate(np.concatenate([np.arange(now - 2 * 86400, now - 86400, 60.0), np.arange(now - 600, now - 5, 10.0)])):
+        features = [] if i == 3 else (np.random.default_rng(i).random(82)).tolist()
+        rows.append({"id": i + 1, "created_at": to_iso(t), "features": features})
+    epochs = to_epochs(r["created_at"] for r in rows)
+    calls = []
+
+    def fetch_range(start_iso, end_iso=None):
+        lo, hi = to_epoch(start_iso), np.inf if end_iso is None else to_epoch(end_iso)
+        calls.append((lo, None if end_iso is None else hi))
+        yield [r for r, t in zip(rows, epochs) if lo <= t <= hi]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LogStore(os.path.join(tmp, "logs.sqlite"), fetch_range=fetch_range, settle_sec=60)
+        day_start, day_end = to_iso(now - 2 * 86400 + 3600), to_iso(now - 86400)
+        assert store.sync(day_start, day_end) > 0 and len(calls) == 1
+        assert store.sync(day_start, day_end) == 0 and len(calls) == 1  # reopening the view is a local read
+
+        features, times, ids, created_at = store.query(day_start, day_end)
+        lo, hi = to_epoch(day_start), to_epoch(day_end)
+        expected = [r for r, t in zip(rows, epochs) if lo <= t <= hi]
+        assert ids.tolist() == [r["id"] for r in expected] and list(created_at) == [r["created_at"] for r in expected]
+        assert np.allclose(features[0], np.float32(expected[0]["features"]), rtol=0, atol=0)
+        assert abs(times[0].astype("datetime64[us]").astype(np.int64) / 1e6 - to_epoch(expected[0]["created_at"])) < 1e-5
+
+        store.sync(to_iso(now - 2 * 86400), day_end)  # earlier start: only the missing head is fetched
+        assert calls[-1] == (to_epoch(to_iso(now - 2 * 86400)), to_epoch(day_start))
+        assert np.isnan(store.query(to_iso(now - 2 * 86400))[0][3]).all()
+
+        store.sync(to_iso(now - 900))  # open-ended: fetches up to now
+        assert calls[-1][1] is None
+        store.sync(to_iso(now - 900))  # only the unsettled tail again
+        assert calls[-1][0] >= now - 60 - 1 and calls[-1][1] is None
+        assert len(store.query(to_iso(now - 900))[2]) == np.sum(epochs >= to_epoch(to_iso(now - 900)))
+
+def test_log_store_coverage_stops_at_polled_rows():
+    """
+    Verifies that coverage recorded after a live poll ends at the newest row
+    the cursor delivered when the batch cap cuts the catch-up short.
+    """
+    from src.core.log_store import LogStore, to_epoch, to_iso
+
+    now = int(time.time())
+    table = [{"id": i + 1, "created_at": to_iso(now - 3600 + 2 * i), "features": [0.0] * 82} for i in range(1200)]
+
+    def fetch(created_at, row_id, limit):
+        return [r for r in table if (r["created_at"], r["id"]) > (created_at, row_id if row_id is not None else -1)][:limit]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LogStore(os.path.join(tmp, "logs.sqlite"), fetch_range=lambda *args: iter(()), settle_sec=60)
+        range_start = now - 3601
+        cursor = LogCursor(to_iso(range_start), fetch=fetch)
+
+        rows = cursor.poll(batch_rows=500, max_batches=2)  # cap hit: 200 rows remain on the server
+        assert len(rows) == 1000 and cursor.created_at == table[999]["created_at"]
+        store.insert(rows)
+        store.mark_covered(range_start, store.polled_until(cursor.created_at))
+        assert store.covered() == [(range_start, to_epoch(table[999]["created_at"]))]
+
+        rows = cursor.poll(batch_rows=500, max_batches=2)
+        assert len(rows) == 200
+        store.mark_covered(range_start, store.polled_until(cursor.created_at))
+        assert store.covered()[0][1] == to_epoch(table[-1]["created_at"])
+
+def test_freq_grid_slices_match_direct_extraction():
+    """
+    Verifies that the folded-FFT frequency grid equals the direct DFT at grid
+    frequencies, so band energies sliced from it match direct extraction.
+    """
+    fs = 3000
+    t = np.arange(fs * 33) / fs
+    signal = np.sin(2 * np.pi * 60.0 * t) + 0.5 * np.sin(2 * np.pi * 535.2 * t) + 0.1 * np.random.default_rng(7).standard_normal(len(t))
+    freqs = grid_frequencies(20.0, 1000.0, 0.5)
+    blocks = [signal[i:i + 20000] for i in range(0, len(signal), 20000)]
+    window = fs * 5
+
+    grid = stream_freq_grid(iter(blocks), fs, window, window, freqs, 0.5, dtype=np.float64)
+    assert grid.shape == (6, len(freqs))
+    assert np.allclose(grid, chunk_magnitude_matrix(signal, fs, window, freqs, stride=1), rtol=1e-9, atol=1e-12)
+
+    bands = build_band_table([(535.0, 10.0), (60.0, 2.0)])
+    direct = extract_chunk_band_energies(signal, fs, window, bands, stride=1)
+    assert np.allclose(band_energies_from_grid(grid, freqs, bands), direct, rtol=1e-9)
+
+    snapped = snap_bands_to_grid(build_band_table([(61.3, 2.0)]))
+    assert snapped[0, 0] == 61.5
+    sliding = stream_freq_grid(iter(blocks), fs, window, 1500, freqs, 0.5)
+    assert sliding.dtype == np.float32 and len(sliding) == (len(signal) - window) // 1500 + 1
+
+    # Grids above FREQ_GRID_MAX_MB are refused up front and analysis falls back to direct extraction
+    import src.core.analysis as analysis
+    buffer = io.BytesIO()
+    wavfile.write(buffer, fs, (signal * 10000).astype(np.int16))
+    assert freq_grid_fits(buffer, 0.5)
+    limit, analysis.FREQ_GRID_MAX_MB = analysis.FREQ_GRID_MAX_MB, 0.1
+    try:
+        assert not freq_grid_fits(buffer, 0.5)
+        _, per_target = process_multi_target(buffer, [60.0], 2.0, hop_sec=0.5, use_freq_grid=True)
+        assert per_target[0][1]["from_freq_grid"] is False
+        try:
+            extract_freq_grid(buffer, 0.5)
+            assert False, "oversized grid was computed"
+        except ValueError:
+            pass
+    finally:
+        analysis.FREQ_GRID_MAX_MB = limit
+
+def test_warmup_signatures_cover_extraction_calls():
+    """
+    Verifies that the warm-up compiles every declared signature and that the
+    production extraction call then dispatches to a pre-compiled overload.
+    """
+    from src.core import magi
+    warmup = KernelWarmup().run()
+    assert warmup.error is None, warmup.error
+    assert warmup.done.is_set()
+    assert len(warmup.records) == len(kernel_signatures())
+    assert all(r["cache"] in ("hit", "miss", "loaded", "off") for r in warmup.records)
+
+    n_before = len(magi.sliding_band_magnitudes.overloads)
+    fs = 1600
+    signal = (np.random.default_rng(2).standard_normal(fs * 12) * 1000).astype(np.int16)
+    bands = build_band_table([(60.0, 2.0)])
+    extract_sliding_band_energies(signal, fs, fs * 5, 800, bands)
+    extract_sliding_band_energies(signal.astype(np.float32), fs, fs * 5, 800, bands, stride=1)
+    assert len(magi.sliding_band_magnitudes.overloads) == n_before, "call signature not covered by warm-up"
+
+    summary = warmup.summary()
+    assert {k["kernel"] for k in summary["kernels"]} >= {"sliding_band_magnitudes", "calculate_chunk_energies"}
+
 if __name__ == "__main__":
     test_magi_pure_sine()
+    test_band_energies_match_single_band()
+    test_zoom_dft_matrix_matches_per_chunk_kernel()
+    test_parallel_extraction_is_bit_identical()
+    test_sliding_dft_matches_direct_windows()
+    test_decimation_streaming_and_antialias()
+    test_zoom_spectrum_resolves_close_tones()
+    test_native_pcm_dtypes_are_scaled_in_kernel()
+    test_streaming_wav_reader_matches_wavfile()
+    test_streaming_welch_and_band_energies_match_full_signal()
+    test_spool_dedupes_and_evicts()
+    test_feature_cache_roundtrip_and_keys()
+    test_decision_stage_reruns_on_energies_only()
+    test_vectorized_state_machine_matches_reference_loops()
+    test_chunk_states_columnar_roundtrip_and_compat_view()
+    test_sensitivity_index_matches_direct_thresholding()
+    test_multi_target_matches_single_target_runs()
+    test_fused_spectrum_and_band_pass_matches_separate_passes()
+    test_float32_welch_reports_progress_and_interim_spectrum()
+    test_spectrum_progress_placeholder_survives_cache_hit()
+    test_peak_tracking_follows_frequency_drift()
+    test_rolling_otsu_ring_buffer_matches_full_window()
+    test_stream_batch_matches_per_record_processing()
+    test_log_cursor_polls_without_gaps()
+    test_range_fetch_pages_concurrently_without_row_cap()
+    test_log_store_syncs_only_missing_ranges()
+    test_log_store_coverage_stops_at_polled_rows()
+    test_freq_grid_slices_match_direct_extraction()
+    test_warmup_signatures_cover_extraction_calls()